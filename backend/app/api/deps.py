@@ -2,9 +2,9 @@
 API Dependencies - Authentication and authorization.
 """
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.firebase import verify_firebase_token
@@ -42,8 +42,8 @@ async def get_current_user(
         # Auto-create user on first login
         user = await user_service.create_from_firebase(decoded_token)
     
-    # Update last login
-    await user_service.update_last_login(user.id)
+    # Update last login (coalesced, written in the background)
+    user_service.record_login(user)
     
     return user
 
@@ -86,3 +86,6 @@ async def get_current_admin_user(
 CurrentUser = Annotated[User, Depends(get_current_user)]
 ActiveUser = Annotated[User, Depends(get_current_active_user)]
 AdminUser = Annotated[User, Depends(get_current_admin_user)]
+
+# Optional `Idempotency-Key` header of retry-safe POST endpoints
+IdempotencyKey = Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)]
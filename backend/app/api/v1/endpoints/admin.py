@@ -2,15 +2,18 @@
 Admin endpoints - User management and global statistics.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel
 
 from app.api.deps import AdminUser
+from app.core import firebase
 from app.models.user import UserRole
+from app.services.idempotency_service import idempotency_service
 from app.services.user_service import user_service
 from app.services.admin_service import admin_service
+from app.storage import get_store
 
 router = APIRouter()
 
@@ -28,6 +31,12 @@ class AdminUserResponse(BaseModel):
     last_login: Optional[str] = None
 
 
+class AdminUserPage(BaseModel):
+    """Page of users for admin."""
+    items: List[AdminUserResponse]
+    next_cursor: Optional[str] = None
+
+
 class AdminUserUpdate(BaseModel):
     """Update user by admin."""
     is_active: Optional[bool] = None
@@ -48,6 +57,14 @@ class GlobalStats(BaseModel):
     avg_discipline_score: float
 
 
+class TopSaver(BaseModel):
+    """Leaderboard entry."""
+    user_id: str
+    email: str
+    full_name: str
+    total_saved: float
+
+
 class UserStatsDetail(BaseModel):
     """Detailed user stats for admin."""
     user_id: str
@@ -66,23 +83,50 @@ async def get_global_stats(admin: AdminUser) -> GlobalStats:
     return GlobalStats(**stats)
 
 
-@router.get("/users", response_model=List[AdminUserResponse])
+@router.get("/metrics")
+async def get_metrics(admin: AdminUser) -> Dict[str, Any]:
+    """Get in-process cache and transaction metrics for this instance."""
+    return {
+        "user_cache": user_service.cache_stats(),
+        "token_cache": firebase.token_cache_stats(),
+        "idempotency_cache": idempotency_service.cache_stats(),
+        "transactions": get_store().transaction_metrics.stats(),
+    }
+
+
+@router.get("/top-savers", response_model=List[TopSaver])
+async def get_top_savers(
+    admin: AdminUser,
+    limit: int = Query(10, ge=1, le=100),
+) -> List[TopSaver]:
+    """Get the users with the highest savings."""
+    savers = await admin_service.get_top_savers(limit)
+    return [TopSaver(**s) for s in savers]
+
+
+@router.get("/users", response_model=AdminUserPage)
 async def list_users(
     admin: AdminUser,
-    skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
-) -> List[AdminUserResponse]:
-    """List all users with filters."""
-    users = await admin_service.list_users(
-        skip=skip,
-        limit=limit,
-        role=role,
-        is_active=is_active,
-    )
+    cursor: Optional[str] = None,
+) -> AdminUserPage:
+    """List all users with filters, newest first (pass `next_cursor` to page)."""
+    try:
+        users, next_cursor = await admin_service.list_users(
+            limit=limit,
+            role=role,
+            is_active=is_active,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
-    return [
+    items = [
         AdminUserResponse(
             id=u.id,
             email=u.email,
@@ -96,6 +140,8 @@ async def list_users(
         )
         for u in users
     ]
+    
+    return AdminUserPage(items=items, next_cursor=next_cursor)
 
 
 @router.get("/users/{user_id}", response_model=AdminUserResponse)
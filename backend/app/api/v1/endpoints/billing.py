@@ -8,6 +8,7 @@ import stripe
 
 from app.api.deps import ActiveUser
 from app.core.config import settings
+from app.services.user_service import user_service
 
 router = APIRouter()
 
@@ -32,24 +33,10 @@ async def create_checkout_session(
 ):
     """Create a Stripe checkout session for premium subscription."""
     try:
-        stripe.api_key = settings.STRIPE_SECRET_KEY
+        stripe.api_key = settings.STRIPE_API_KEY
         
-        # Get or create Stripe customer
-        customer_id = current_user.stripe_customer_id if hasattr(current_user, 'stripe_customer_id') else None
-        
-        if not customer_id:
-            # Create Stripe customer
-            customer = stripe.Customer.create(
-                email=current_user.email,
-                name=current_user.full_name,
-                metadata={
-                    "user_id": current_user.id,
-                }
-            )
-            customer_id = customer.id
-            
-            # Save customer ID to user (in a real app)
-            # await user_service.update(current_user.id, {"stripe_customer_id": customer_id})
+        # Reuse the user's Stripe customer (created and recorded on first checkout)
+        customer_id = await user_service.get_or_create_stripe_customer(current_user)
         
         # Create checkout session
         session = stripe.checkout.Session.create(
@@ -87,9 +74,9 @@ async def create_checkout_session(
 async def create_portal_session(current_user: ActiveUser):
     """Create a Stripe billing portal session for subscription management."""
     try:
-        stripe.api_key = settings.STRIPE_SECRET_KEY
+        stripe.api_key = settings.STRIPE_API_KEY
         
-        customer_id = current_user.stripe_customer_id if hasattr(current_user, 'stripe_customer_id') else None
+        customer_id = current_user.stripe_customer_id
         
         if not customer_id:
             raise HTTPException(status_code=400, detail="No subscription found")
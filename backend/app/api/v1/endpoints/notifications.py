@@ -39,13 +39,13 @@ async def get_notifications(
     
     return [
         NotificationResponse(
-            id=n["id"],
-            title=n["title"],
-            body=n["body"],
-            type=n["type"],
-            action_url=n.get("action_url"),
-            is_read=n["is_read"],
-            created_at=n["created_at"],
+            id=n.id,
+            title=n.title,
+            body=n.body,
+            type=n.type,
+            action_url=n.action_url,
+            is_read=n.is_read,
+            created_at=n.created_at.isoformat(),
         )
         for n in notifications
     ]
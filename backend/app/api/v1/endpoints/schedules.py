@@ -0,0 +1,114 @@
+"""
+Recurring deposit schedule endpoints.
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+
+from app.api.deps import ActiveUser
+from app.models.schedule import DepositSchedule, ScheduleFrequency
+from app.services.schedule_service import schedule_service
+from app.services.vault_service import vault_service
+
+router = APIRouter()
+
+
+class ScheduleCreate(BaseModel):
+    """Create schedule request."""
+    vault_id: str
+    amount: float = Field(..., gt=0)
+    frequency: ScheduleFrequency
+    start_date: Optional[date] = None
+
+
+class ScheduleResponse(BaseModel):
+    """Schedule response schema."""
+    id: str
+    vault_id: str
+    amount: float
+    frequency: str
+    next_run_at: str
+    last_run_at: Optional[str] = None
+    created_at: str
+
+
+def schedule_to_response(schedule: DepositSchedule) -> ScheduleResponse:
+    """Convert schedule model to response."""
+    return ScheduleResponse(
+        id=schedule.id,
+        vault_id=schedule.vault_id,
+        amount=schedule.amount,
+        frequency=schedule.frequency.value,
+        next_run_at=schedule.next_run_at.isoformat(),
+        last_run_at=schedule.last_run_at.isoformat() if schedule.last_run_at else None,
+        created_at=schedule.created_at.isoformat(),
+    )
+
+
+@router.get("/", response_model=List[ScheduleResponse])
+async def list_schedules(current_user: ActiveUser) -> List[ScheduleResponse]:
+    """List the user's active recurring deposits."""
+    schedules = await schedule_service.get_user_schedules(current_user.id)
+    return [schedule_to_response(s) for s in schedules]
+
+
+@router.post("/", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
+async def create_schedule(
+    request: ScheduleCreate,
+    current_user: ActiveUser,
+) -> ScheduleResponse:
+    """Schedule a weekly or monthly deposit into a vault."""
+    vault = await vault_service.get_by_id(request.vault_id)
+    
+    if not vault:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vault not found"
+        )
+    
+    if vault.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized"
+        )
+    
+    try:
+        schedule = await schedule_service.create(
+            vault,
+            amount=request.amount,
+            frequency=request.frequency,
+            start_date=request.start_date,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return schedule_to_response(schedule)
+
+
+@router.delete("/{schedule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_schedule(
+    schedule_id: str,
+    current_user: ActiveUser,
+) -> None:
+    """Stop a recurring deposit."""
+    schedule = await schedule_service.get_by_id(schedule_id)
+    
+    if not schedule or not schedule.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found"
+        )
+    
+    if schedule.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized"
+        )
+    
+    await schedule_service.cancel(schedule)
@@ -3,13 +3,15 @@ Transactions endpoint for all transaction history.
 """
 
 from typing import List, Optional
-from datetime import datetime
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel
 
 from app.api.deps import ActiveUser
-from app.core.firebase import get_firestore_client
+from app.models.deposit import Deposit
+from app.models.withdrawal import Withdrawal
+from app.services.history_service import history_service, occurred_at
+from app.services.vault_service import vault_service
 
 router = APIRouter()
 
@@ -17,7 +19,7 @@ router = APIRouter()
 class TransactionResponse(BaseModel):
     """Transaction response."""
     id: str
-    type: str  # 'deposit', 'withdrawal', 'vault_created'
+    type: str  # 'deposit', 'withdrawal', 'vault_created', 'vault_unlocked', 'vault_closed'
     vault_id: Optional[str] = None
     vault_name: Optional[str] = None
     amount: Optional[float] = None
@@ -25,46 +27,56 @@ class TransactionResponse(BaseModel):
     created_at: str
 
 
-@router.get("/", response_model=List[TransactionResponse])
+class TransactionPage(BaseModel):
+    """Page of transactions."""
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+
+@router.get("/", response_model=TransactionPage)
 async def get_transactions(
     current_user: ActiveUser,
     limit: int = Query(50, ge=1, le=100),
-) -> List[TransactionResponse]:
-    """Get user's transaction history."""
-    db = get_firestore_client()
-    transactions = []
-    
-    # Get withdrawals
-    withdrawals = db.collection("withdrawals")\
-        .where("user_id", "==", current_user.id)\
-        .order_by("created_at", direction="DESCENDING")\
-        .limit(limit)\
-        .stream()
-    
-    for w in withdrawals:
-        data = w.to_dict()
-        # Get vault name
-        vault_name = None
-        vault_id = data.get("vault_id")
-        if vault_id:
-            vault_doc = db.collection("vaults").document(vault_id).get()
-            if vault_doc.exists:
-                vault_name = vault_doc.to_dict().get("name")
-        
-        transactions.append(TransactionResponse(
-            id=w.id,
-            type="withdrawal",
-            vault_id=vault_id,
-            vault_name=vault_name,
-            amount=data.get("amount"),
-            fee=data.get("fee"),
-            created_at=data.get("created_at", ""),
-        ))
+    cursor: Optional[str] = None,
+) -> TransactionPage:
+    """Get user's transaction history, newest first (pass `next_cursor` to page)."""
+    try:
+        entries, next_cursor = await history_service.get_history(
+            current_user.id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
-    # We could also track deposits in a separate collection
-    # For now, return withdrawals
+    # Resolve every vault name with one batched read
+    vaults = await vault_service.get_many(
+        item.vault_id for _, item in entries if isinstance(item, (Deposit, Withdrawal))
+    )
     
-    # Sort by date
-    transactions.sort(key=lambda x: x.created_at, reverse=True)
+    items = []
+    for kind, item in entries:
+        if isinstance(item, (Deposit, Withdrawal)):
+            vault = vaults.get(item.vault_id)
+            items.append(TransactionResponse(
+                id=item.id,
+                type=kind,
+                vault_id=item.vault_id or None,
+                vault_name=vault.name if vault else None,
+                amount=item.amount,
+                fee=item.fee if isinstance(item, Withdrawal) else None,
+                created_at=item.created_at.isoformat(),
+            ))
+        else:
+            items.append(TransactionResponse(
+                id=item.id,
+                type=kind,
+                vault_id=item.id,
+                vault_name=item.name,
+                created_at=occurred_at(kind, item).isoformat(),
+            ))
     
-    return transactions[:limit]
+    return TransactionPage(items=items, next_cursor=next_cursor)
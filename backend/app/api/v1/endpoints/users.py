@@ -2,7 +2,7 @@
 User management endpoints.
 """
 
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter
 from pydantic import BaseModel, EmailStr
@@ -21,12 +21,14 @@ class UserResponse(BaseModel):
     discipline_score: float
     is_premium: bool
     notification_enabled: bool
+    locale: str
 
 
 class UserUpdate(BaseModel):
     """User update schema."""
     full_name: Optional[str] = None
     notification_enabled: Optional[bool] = None
+    locale: Optional[Literal["fr", "en"]] = None
 
 
 class UserStats(BaseModel):
@@ -48,6 +50,7 @@ async def get_current_user(current_user: ActiveUser) -> UserResponse:
         discipline_score=current_user.discipline_score,
         is_premium=current_user.is_premium,
         notification_enabled=current_user.notification_enabled,
+        locale=current_user.locale,
     )
 
 
@@ -71,6 +74,7 @@ async def update_current_user(
         discipline_score=current_user.discipline_score,
         is_premium=current_user.is_premium,
         notification_enabled=current_user.notification_enabled,
+        locale=current_user.locale,
     )
 
 
@@ -3,13 +3,25 @@ Vault (savings box) endpoints.
 """
 
 from datetime import date
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
-from app.api.deps import ActiveUser
-from app.services.vault_service import vault_service
+from app.api.deps import ActiveUser, IdempotencyKey
+from app.models.vault import Vault
+from app.services.idempotency_service import (
+    IdempotencyKeyReusedError,
+    IdempotentRequest,
+    idempotency_service,
+)
+from app.services.vault_service import (
+    MAX_BATCH_DEPOSITS,
+    VaultAccessError,
+    VaultNotFoundError,
+    vault_service,
+)
+from app.storage import DocumentExistsError
 
 router = APIRouter()
 
@@ -43,6 +55,17 @@ class DepositRequest(BaseModel):
     amount: float = Field(..., gt=0)
 
 
+class DepositAllocation(BaseModel):
+    """One vault's share of a batch deposit."""
+    vault_id: str
+    amount: float = Field(..., gt=0)
+
+
+class BatchDepositRequest(BaseModel):
+    """Batch deposit request."""
+    deposits: List[DepositAllocation] = Field(..., min_length=1, max_length=MAX_BATCH_DEPOSITS)
+
+
 def vault_to_response(vault) -> VaultResponse:
     """Convert vault model to response."""
     return VaultResponse(
@@ -61,6 +84,17 @@ def vault_to_response(vault) -> VaultResponse:
     )
 
 
+async def _replay(idempotent: IdempotentRequest) -> Optional[Vault]:
+    """The response recorded under an Idempotency-Key (422 if reused for another request)."""
+    try:
+        return await idempotency_service.lookup(idempotent, Vault)
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e)
+        )
+
+
 @router.get("/", response_model=List[VaultResponse])
 async def list_vaults(
     current_user: ActiveUser,
@@ -95,6 +129,42 @@ async def create_vault(
     return vault_to_response(new_vault)
 
 
+@router.post("/deposits:batch", response_model=List[VaultResponse])
+async def deposit_to_vaults(
+    request: BatchDepositRequest,
+    current_user: ActiveUser,
+) -> List[VaultResponse]:
+    """
+    Deposit into several vaults at once (e.g. splitting a paycheck).
+    
+    The vaults are read with one batched read and every deposit is
+    committed together, all or nothing. The discipline reward is applied
+    once for the whole batch.
+    """
+    vaults = await vault_service.get_many(d.vault_id for d in request.deposits)
+    
+    for allocation in request.deposits:
+        vault = vaults.get(allocation.vault_id)
+        if not vault:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vault {allocation.vault_id} not found"
+            )
+        
+        if vault.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized"
+            )
+    
+    updated_vaults = await vault_service.deposit_many(
+        [(vaults[d.vault_id], d.amount) for d in request.deposits],
+        depositor=current_user,
+    )
+    
+    return [vault_to_response(v) for v in updated_vaults]
+
+
 @router.get("/{vault_id}", response_model=VaultResponse)
 async def get_vault(
     vault_id: str,
@@ -123,8 +193,22 @@ async def deposit_to_vault(
     vault_id: str,
     deposit: DepositRequest,
     current_user: ActiveUser,
+    idempotency_key: IdempotencyKey = None,
 ) -> VaultResponse:
-    """Deposit money into a vault."""
+    """
+    Deposit money into a vault.
+    
+    A retry sent with the same `Idempotency-Key` gets the original response
+    back without depositing again.
+    """
+    idempotent = idempotency_service.request(
+        current_user.id, idempotency_key, "deposit", vault_id=vault_id, amount=deposit.amount
+    )
+    if idempotent:
+        replayed = await _replay(idempotent)
+        if replayed:
+            return vault_to_response(replayed)
+    
     vault = await vault_service.get_by_id(vault_id)
     
     if not vault:
@@ -139,11 +223,21 @@ async def deposit_to_vault(
             detail="Not authorized"
         )
     
-    updated_vault = await vault_service.deposit(vault_id, deposit.amount)
-    
-    # Reward discipline
-    from app.services.user_service import user_service
-    await user_service.update_discipline_score(current_user.id, +1)
+    try:
+        # The discipline reward and notifications are staged in the outbox, in the same write
+        updated_vault = await vault_service.deposit(
+            vault, deposit.amount, idempotency=idempotent, depositor=current_user
+        )
+    except DocumentExistsError:
+        # A concurrent retry with the same key deposited first
+        replayed = await _replay(idempotent)
+        if not replayed:
+            # Its record is not readable yet (or already expired)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Request in progress"
+            )
+        return vault_to_response(replayed)
     
     return vault_to_response(updated_vault)
 
@@ -154,22 +248,20 @@ async def close_vault(
     current_user: ActiveUser,
 ) -> None:
     """Close a vault (only if unlocked and empty)."""
-    vault = await vault_service.get_by_id(vault_id)
-    
-    if not vault:
+    # Existence and ownership are checked by the service, in the transaction
+    # that reads the vault
+    try:
+        await vault_service.close_vault(current_user.id, vault_id)
+    except VaultNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vault not found"
+            detail=str(e)
         )
-    
-    if vault.user_id != current_user.id:
+    except VaultAccessError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
+            detail=str(e)
         )
-    
-    try:
-        await vault_service.close_vault(vault_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
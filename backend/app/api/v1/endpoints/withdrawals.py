@@ -7,9 +7,16 @@ from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
-from app.api.deps import ActiveUser
+from app.api.deps import ActiveUser, IdempotencyKey
+from app.models.withdrawal import Withdrawal
+from app.services.idempotency_service import (
+    IdempotencyKeyReusedError,
+    IdempotentRequest,
+    idempotency_service,
+)
 from app.services.withdrawal_service import withdrawal_service
-from app.services.vault_service import vault_service
+from app.services.vault_service import VaultAccessError, VaultNotFoundError, vault_service
+from app.storage import DocumentExistsError
 
 router = APIRouter()
 
@@ -59,13 +66,24 @@ def withdrawal_to_response(w) -> WithdrawalResponse:
     )
 
 
+async def _replay(idempotent: IdempotentRequest) -> Optional[Withdrawal]:
+    """The response recorded under an Idempotency-Key (422 if reused for another request)."""
+    try:
+        return await idempotency_service.lookup(idempotent, Withdrawal)
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e)
+        )
+
+
 @router.post("/preview", response_model=WithdrawalPreview)
 async def preview_withdrawal(
     request: WithdrawalRequest,
     current_user: ActiveUser,
 ) -> WithdrawalPreview:
     """Preview withdrawal with fee calculation."""
-    # Verify ownership
+    # Verify ownership (the loaded vault is reused for the preview)
     vault = await vault_service.get_by_id(request.vault_id)
     if not vault:
         raise HTTPException(
@@ -80,7 +98,7 @@ async def preview_withdrawal(
         )
     
     preview = await withdrawal_service.preview(
-        vault_id=request.vault_id,
+        vault,
         amount=request.amount,
         is_early=request.is_early_withdrawal,
     )
@@ -92,30 +110,58 @@ async def preview_withdrawal(
 async def create_withdrawal(
     request: WithdrawalRequest,
     current_user: ActiveUser,
+    idempotency_key: IdempotencyKey = None,
 ) -> WithdrawalResponse:
-    """Create a withdrawal request."""
-    # Verify ownership
-    vault = await vault_service.get_by_id(request.vault_id)
-    if not vault:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vault not found"
-        )
+    """
+    Create a withdrawal request.
     
-    if vault.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
+    A retry sent with the same `Idempotency-Key` gets the original response
+    back without withdrawing again.
+    """
+    idempotent = idempotency_service.request(
+        current_user.id,
+        idempotency_key,
+        "withdrawal",
+        vault_id=request.vault_id,
+        amount=request.amount,
+        is_early=request.is_early_withdrawal,
+    )
+    if idempotent:
+        replayed = await _replay(idempotent)
+        if replayed:
+            return withdrawal_to_response(replayed)
     
+    # Existence and ownership are checked by the service, in the transaction
+    # that reads the vault
     try:
         withdrawal = await withdrawal_service.create(
             user_id=current_user.id,
             vault_id=request.vault_id,
             amount=request.amount,
             is_early=request.is_early_withdrawal,
+            idempotency=idempotent,
         )
         return withdrawal_to_response(withdrawal)
+    except DocumentExistsError:
+        # A concurrent retry with the same key withdrew first
+        replayed = await _replay(idempotent)
+        if not replayed:
+            # Its record is not readable yet (or already expired)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Request in progress"
+            )
+        return withdrawal_to_response(replayed)
+    except VaultNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except VaultAccessError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
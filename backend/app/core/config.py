@@ -30,10 +30,106 @@ class Settings(BaseSettings):
     # Firebase
     FIREBASE_PROJECT_ID: str = ""
     FIREBASE_SERVICE_ACCOUNT_PATH: str = ""
+    
+    # ID token verification cache (entries expire at the token's `exp`)
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    # Check for revoked tokens; cached tokens are then re-checked this often
+    AUTH_CHECK_REVOKED: bool = False
+    AUTH_REVOCATION_CHECK_SECONDS: int = 60
+    
+    # Per-instance user cache; the TTL bounds how stale a user (e.g. a
+    # disabled account) can be on instances that did not make the change
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 30
+    # Per-instance Stripe customer ID -> user ID cache (the mapping never changes)
+    STRIPE_CUSTOMER_CACHE_SIZE: int = 10000
+    
+    # last_login is persisted at most once per granularity per user, in
+    # batched writes flushed in the background every LAST_LOGIN_FLUSH_SECONDS
+    LAST_LOGIN_GRANULARITY_SECONDS: int = 300
+    LAST_LOGIN_FLUSH_SECONDS: int = 30
+    
+    # Idempotency-Key records: how long a key replays its result, and the
+    # per-instance cache of recent records in front of Firestore
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    
+    # Storage backend: "firestore" (production) or "sqlite" (local load testing)
+    STORAGE_BACKEND: str = "firestore"
+    SQLITE_PATH: str = "flexsave.db"
+    
+    # Platform stats: number of counter shards (spreads counter writes)
+    STATS_COUNTER_SHARDS: int = 10
+    
+    # Admin top savers leaderboard: seconds a computed snapshot is served
+    LEADERBOARD_REFRESH_SECONDS: int = 300
+    
+    # Recurring deposits: how often each instance runs the due schedules
+    # (0 disables), schedules read per page and deposits run concurrently
+    SCHEDULER_INTERVAL_SECONDS: int = 300
+    SCHEDULER_PAGE_SIZE: int = 500
+    SCHEDULER_CONCURRENCY: int = 20
+
+    # Vault unlock announcements: how often each instance sweeps the
+    # unlocked vaults (0 disables), how many days back it looks and
+    # vaults read per page
+    UNLOCK_SWEEP_INTERVAL_SECONDS: int = 3600
+    UNLOCK_SWEEP_LOOKBACK_DAYS: int = 7
+    UNLOCK_SWEEP_PAGE_SIZE: int = 500
+
+    # Encouragement campaign: how often each instance starts or resumes
+    # the day's run (0 disables), days without a deposit before a user is
+    # encouraged, minimum days between two encouragements, users per page
+    ENCOURAGEMENT_INTERVAL_SECONDS: int = 3600
+    ENCOURAGEMENT_INACTIVE_DAYS: int = 14
+    ENCOURAGEMENT_MIN_INTERVAL_DAYS: int = 7
+    ENCOURAGEMENT_PAGE_SIZE: int = 500
+
+    # Outbox (side effects of deposits, withdrawals and webhooks): seconds
+    # between two drains on each instance (0 disables), entries claimed
+    # per batch, users processed concurrently, how long a claimed entry is
+    # leased; attempts before an entry is dead-lettered, retry n waiting
+    # BASE * 2^(n-1) s
+    OUTBOX_INTERVAL_SECONDS: float = 2.0
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_CONCURRENCY: int = 20
+    OUTBOX_LEASE_SECONDS: int = 60
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BASE_SECONDS: int = 30
+
+    # Email delivery: SMTP server (no host: emails stay queued) and sender
+    SMTP_HOST: str = ""
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = True
+    EMAIL_FROM: str = "FlexSave <no-reply@flexsave.app>"
+    # Senders (and pooled SMTP connections) per instance, emails sent per
+    # connection checkout, in-process queue bound, seconds between polls
+    # of the email_queue collection and how long a claimed email is leased
+    EMAIL_WORKERS: int = 4
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_QUEUE_SIZE: int = 200
+    EMAIL_POLL_SECONDS: float = 5.0
+    EMAIL_LEASE_SECONDS: int = 300
+    # Attempts before an email is dead-lettered; retry n waits BASE * 2^(n-1) s
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 30
 
     # Stripe
     STRIPE_API_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
+    # Webhook events are stored on receipt and processed in the background:
+    # workers per instance (0: events stay stored), in-process queue bound
+    # per worker, seconds between polls of stripe_events and how long a
+    # claimed event is leased; attempts before an event is marked failed,
+    # retry n waiting BASE * 2^(n-1) s
+    WEBHOOK_WORKERS: int = 4
+    WEBHOOK_QUEUE_SIZE: int = 50
+    WEBHOOK_POLL_SECONDS: float = 1.0
+    WEBHOOK_LEASE_SECONDS: int = 120
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: int = 30
     STRIPE_TREASURY_FINANCIAL_ACCOUNT: str = ""
 
     # CORS
@@ -2,15 +2,25 @@
 Firebase initialization and utilities.
 """
 
+import asyncio
+import hashlib
+import time
 from typing import Any, Dict, Optional
 
 import firebase_admin
-from firebase_admin import auth, credentials, firestore
+from firebase_admin import auth, credentials
+from google.cloud import firestore
 
+from app.core.cache import LRUCache
 from app.core.config import settings
 
 _app: firebase_admin.App | None = None
-_db: firestore.Client | None = None
+_db: firestore.AsyncClient | None = None
+
+# Verified ID token claims by token hash, each expiring at the token's `exp`
+_token_cache: LRUCache[Dict[str, Any]] = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE)
+# In-flight verifications, so concurrent requests with one token verify it once
+_pending_tokens: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
 
 
 def get_firebase_app() -> firebase_admin.App:
@@ -34,31 +44,47 @@ def get_firebase_app() -> firebase_admin.App:
     return _app
 
 
-def get_firestore_client() -> firestore.Client:
-    """Get Firestore client."""
+def get_firestore_client() -> firestore.AsyncClient:
+    """
+    Get the async Firestore client.
+    
+    The client is created lazily and shared by every service; its
+    lifecycle is owned by the application lifespan (see `app.main`).
+    """
     global _db
     
     if _db is None:
-        get_firebase_app()
-        _db = firestore.client()
+        app = get_firebase_app()
+        _db = firestore.AsyncClient(
+            credentials=app.credential.get_credential(),
+            project=app.project_id,
+        )
     
     return _db
 
 
-async def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
-    """
-    Verify a Firebase ID token.
+async def close_firestore_client() -> None:
+    """Close the async Firestore client and its gRPC channel."""
+    global _db
     
-    Args:
-        token: The Firebase ID token to verify.
-        
-    Returns:
-        Decoded token claims if valid, None otherwise.
-    """
+    if _db is None:
+        return
+    
+    _db.close()
+    # AsyncClient.close() only closes the HTTP session: the gRPC channel of
+    # its API client stays open. Close it too, if the client opened one and
+    # this client version still keeps it there (private attribute).
+    api = getattr(_db, "_firestore_api_internal", None)
+    if api is not None:
+        await api.transport.close()
+    _db = None
+
+
+def _verify_id_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify a token with the Admin SDK (blocking: signature check, cert fetch)."""
     try:
         get_firebase_app()
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
+        return auth.verify_id_token(token, check_revoked=settings.AUTH_CHECK_REVOKED)
     except auth.InvalidIdTokenError:
         return None
     except auth.ExpiredIdTokenError:
@@ -69,6 +95,56 @@ async def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+async def _verify_and_cache(key: str, token: str) -> Optional[Dict[str, Any]]:
+    decoded_token = await asyncio.to_thread(_verify_id_token, token)
+    if decoded_token is None:
+        return None
+    
+    expires_at = float(decoded_token.get("exp", 0))
+    if settings.AUTH_CHECK_REVOKED:
+        # Re-check revocation periodically rather than trusting the token until `exp`
+        expires_at = min(expires_at, time.time() + settings.AUTH_REVOCATION_CHECK_SECONDS)
+    
+    _token_cache.set(key, decoded_token, expires_at=expires_at)
+    return decoded_token
+
+
+async def verify_firebase_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a Firebase ID token.
+    
+    Verified claims are cached (keyed by a SHA-256 of the token) until the
+    token's `exp`, or for at most `AUTH_REVOCATION_CHECK_SECONDS` when
+    `AUTH_CHECK_REVOKED` is set. Verification runs in a worker thread so the
+    event loop never blocks on RSA checks or certificate fetches.
+    
+    Args:
+        token: The Firebase ID token to verify.
+        
+    Returns:
+        Decoded token claims if valid, None otherwise.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    
+    decoded_token = _token_cache.get(key)
+    if decoded_token is not None:
+        return decoded_token
+    
+    pending = _pending_tokens.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_verify_and_cache(key, token))
+        _pending_tokens[key] = pending
+        pending.add_done_callback(lambda _: _pending_tokens.pop(key, None))
+    
+    # Shielded: a cancelled request must not cancel the shared verification
+    return await asyncio.shield(pending)
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    """Verified token cache size and hit/miss counters."""
+    return _token_cache.stats()
+
+
 async def get_user_by_email(email: str) -> Optional[auth.UserRecord]:
     """Get Firebase user by email."""
     try:
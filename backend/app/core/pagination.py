@@ -0,0 +1,41 @@
+"""
+Opaque cursor tokens for keyset pagination.
+
+A cursor wraps the `start_after` values of the last document of a page (its
+sort fields followed by its ID) into a URL-safe string, so clients can pass
+it back without knowing what it contains.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode `start_after` values into an opaque cursor token."""
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """
+    Decode a cursor token back into `start_after` values.
+
+    Args:
+        token: Token returned by `encode_cursor`
+        size: Expected number of values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+
+    return values
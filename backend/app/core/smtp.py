@@ -0,0 +1,134 @@
+"""
+Pooled SMTP connections.
+
+`smtplib` is blocking, so connections are opened and used in worker
+threads; each is returned to the pool after use and reused for the next
+messages instead of paying a connect, EHLO, STARTTLS and login per email.
+"""
+
+import asyncio
+import smtplib
+import time
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+
+
+class SMTPPool:
+    """
+    At most `size` SMTP connections to one server, reused across messages.
+
+    A connection idle for more than `idle_check` seconds is checked with a
+    NOOP before reuse (servers drop idle clients). A connection that fails
+    while sending is closed rather than returned.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: str = "",
+        password: str = "",
+        starttls: bool = True,
+        size: int = 4,
+        timeout: float = 30.0,
+        idle_check: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self.connects = 0
+        self.reuses = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    @staticmethod
+    def _alive(connection: smtplib.SMTP) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _quit(connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    async def _acquire(self) -> smtplib.SMTP:
+        """An idle connection still alive, or a new one (hold a slot)."""
+        while self._idle:
+            connection, idle_since = self._idle.pop()
+            stale = time.monotonic() - idle_since > self.idle_check
+            if not stale or await asyncio.to_thread(self._alive, connection):
+                self.reuses += 1
+                return connection
+            await asyncio.to_thread(self._quit, connection)
+        connection = await asyncio.to_thread(self._connect)
+        self.connects += 1
+        return connection
+
+    async def send(self, messages: List[EmailMessage]) -> List[Optional[Exception]]:
+        """
+        Send messages over one pooled connection.
+
+        If the connection fails mid-way, it is discarded and the messages
+        not sent yet fail with the connection error.
+
+        Returns:
+            Per message, None if the server accepted it, else the error
+
+        Raises:
+            SMTPException, OSError: If no connection could be opened
+        """
+        async with self._slots:
+            connection = await self._acquire()
+            results, broken = await asyncio.to_thread(self._send_all, connection, messages)
+            if broken:
+                await asyncio.to_thread(self._quit, connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            return results
+
+    @staticmethod
+    def _send_all(
+        connection: smtplib.SMTP, messages: List[EmailMessage]
+    ) -> Tuple[List[Optional[Exception]], bool]:
+        results: List[Optional[Exception]] = []
+        for message in messages:
+            try:
+                connection.send_message(message)
+                results.append(None)
+            except smtplib.SMTPServerDisconnected as e:
+                return results + [e] * (len(messages) - len(results)), True
+            except smtplib.SMTPException as e:
+                results.append(e)
+            except OSError as e:  # Socket error (SMTPException is an OSError too)
+                return results + [e] * (len(messages) - len(results)), True
+        return results, False
+
+    async def close(self) -> None:
+        """Close the idle connections."""
+        idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            await asyncio.to_thread(self._quit, connection)
+
+    def stats(self) -> Dict[str, int]:
+        """Connections opened and reused, and idle now."""
+        return {"connects": self.connects, "reuses": self.reuses, "idle": len(self._idle)}
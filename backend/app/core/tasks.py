@@ -0,0 +1,62 @@
+"""
+Background tasks run for the lifetime of the application.
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Call a coroutine function every `interval` seconds in the background.
+
+    Started and stopped by the application lifespan (see `app.main`).
+    Stopping cancels the loop, then (if `final_run`) runs the function one
+    last time so pending work is not lost on shutdown.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any]],
+        interval: float,
+        final_run: bool = True,
+    ):
+        self.name = name
+        self._fn = fn
+        self._interval = interval
+        self._final_run = final_run
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self._fn()
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+
+    def start(self) -> None:
+        """Start the loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the loop and run the function a final time (if `final_run`)."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        if not self._final_run:
+            return
+
+        try:
+            await self._fn()
+        except Exception:
+            logger.exception("Background task %s failed on shutdown", self.name)
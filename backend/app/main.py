@@ -9,8 +9,17 @@ from typing import AsyncGenerator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.router import api_router
+from app.api.v1.router import router as api_router
 from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.services.campaign_service import campaign_service
+from app.services.email_dispatcher import EmailDispatcher
+from app.services.outbox_service import outbox_service
+from app.services.schedule_service import schedule_service
+from app.services.unlock_service import unlock_service
+from app.services.user_service import user_service
+from app.services.webhook_processor import WebhookProcessor
+from app.storage import close_store
 
 
 @asynccontextmanager
@@ -18,9 +27,48 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan handler."""
     # Startup
     print(f"🚀 Starting {settings.APP_NAME}...")
+    tasks = [
+        PeriodicTask("flush-logins", user_service.flush_logins, settings.LAST_LOGIN_FLUSH_SECONDS),
+    ]
+    if settings.SCHEDULER_INTERVAL_SECONDS > 0:
+        tasks.append(PeriodicTask(
+            "recurring-deposits",
+            schedule_service.run_scheduled,
+            settings.SCHEDULER_INTERVAL_SECONDS,
+            final_run=False,
+        ))
+    if settings.UNLOCK_SWEEP_INTERVAL_SECONDS > 0:
+        tasks.append(PeriodicTask(
+            "vault-unlocks",
+            unlock_service.run_scheduled,
+            settings.UNLOCK_SWEEP_INTERVAL_SECONDS,
+            final_run=False,
+        ))
+    if settings.ENCOURAGEMENT_INTERVAL_SECONDS > 0:
+        tasks.append(PeriodicTask(
+            "encouragement-campaign",
+            campaign_service.run_scheduled,
+            settings.ENCOURAGEMENT_INTERVAL_SECONDS,
+            final_run=False,
+        ))
+    if settings.OUTBOX_INTERVAL_SECONDS > 0:
+        tasks.append(PeriodicTask(
+            "outbox",
+            outbox_service.run_scheduled,
+            settings.OUTBOX_INTERVAL_SECONDS,
+        ))
+    if settings.SMTP_HOST:
+        tasks.append(EmailDispatcher())
+    if settings.WEBHOOK_WORKERS > 0:
+        tasks.append(WebhookProcessor())
+    for task in tasks:
+        task.start()
     yield
     # Shutdown
     print(f"👋 Shutting down {settings.APP_NAME}...")
+    for task in tasks:
+        await task.stop()
+    await close_store()
 
 
 app = FastAPI(
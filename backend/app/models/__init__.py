@@ -1,7 +1,32 @@
 """Models module."""
 
+from app.models.campaign import CampaignRun
+from app.models.deposit import Deposit, DepositSource
+from app.models.notification import Notification
+from app.models.outbox import OutboxEntry
+from app.models.queued_email import EmailStatus, QueuedEmail
+from app.models.schedule import DepositSchedule, ScheduleFrequency
+from app.models.stripe_customer import StripeCustomer
+from app.models.stripe_event import StripeEvent, StripeEventStatus
 from app.models.user import User
 from app.models.vault import Vault
 from app.models.withdrawal import Withdrawal, WithdrawalStatus
 
-__all__ = ["User", "Vault", "Withdrawal", "WithdrawalStatus"]
+__all__ = [
+    "CampaignRun",
+    "Deposit",
+    "DepositSchedule",
+    "DepositSource",
+    "EmailStatus",
+    "Notification",
+    "OutboxEntry",
+    "QueuedEmail",
+    "ScheduleFrequency",
+    "StripeCustomer",
+    "StripeEvent",
+    "StripeEventStatus",
+    "User",
+    "Vault",
+    "Withdrawal",
+    "WithdrawalStatus",
+]
@@ -0,0 +1,55 @@
+"""
+Notification campaign run model.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass
+class CampaignRun:
+    """
+    Progress checkpoint of one campaign run over the user base.
+
+    `cursor` is the `(sort field, id)` of the last user processed, so an
+    interrupted run resumes after it.
+    """
+
+    id: str = ""
+    campaign: str = ""
+    cutoff: datetime = field(default_factory=datetime.utcnow)
+    cursor: Optional[List[str]] = None
+    encouraged: int = 0
+    muted: int = 0
+    rate_limited: int = 0
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "campaign": self.campaign,
+            "cutoff": self.cutoff.isoformat(),
+            "cursor": self.cursor,
+            "encouraged": self.encouraged,
+            "muted": self.muted,
+            "rate_limited": self.rate_limited,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "CampaignRun":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            campaign=data.get("campaign", ""),
+            cutoff=datetime.fromisoformat(data["cutoff"]) if data.get("cutoff") else datetime.utcnow(),
+            cursor=data.get("cursor"),
+            encouraged=data.get("encouraged", 0),
+            muted=data.get("muted", 0),
+            rate_limited=data.get("rate_limited", 0),
+            started_at=datetime.fromisoformat(data.get("started_at", datetime.utcnow().isoformat())),
+            finished_at=datetime.fromisoformat(data["finished_at"]) if data.get("finished_at") else None,
+        )
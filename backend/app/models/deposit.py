@@ -4,6 +4,14 @@ Deposits model and tracking.
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from enum import Enum
+
+
+class DepositSource(str, Enum):
+    """Where a deposit came from."""
+    MANUAL = "manual"
+    SCHEDULED = "scheduled"  # Recurring deposit schedule
+    BACKFILL = "backfill"  # Reconstructed from vault balances
 
 
 @dataclass
@@ -15,6 +23,7 @@ class Deposit:
     vault_id: str = ""
     amount: float = 0.0
     status: str = "completed"  # pending, completed, failed
+    source: DepositSource = DepositSource.MANUAL
     created_at: datetime = field(default_factory=datetime.utcnow)
     
     def to_dict(self) -> dict:
@@ -24,6 +33,7 @@ class Deposit:
             "vault_id": self.vault_id,
             "amount": self.amount,
             "status": self.status,
+            "source": self.source.value,
             "created_at": self.created_at.isoformat(),
         }
     
@@ -36,5 +46,6 @@ class Deposit:
             vault_id=data.get("vault_id", ""),
             amount=data.get("amount", 0.0),
             status=data.get("status", "completed"),
+            source=DepositSource(data.get("source", "manual")),
             created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
         )
@@ -0,0 +1,50 @@
+"""
+Notification model for Firestore.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class Notification:
+    """Represents an in-app notification."""
+
+    id: str = ""
+    user_id: str = ""
+    title: str = ""
+    body: str = ""
+    type: str = "info"  # info, success, warning, action
+    action_url: Optional[str] = None
+    is_read: bool = False
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    read_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "user_id": self.user_id,
+            "title": self.title,
+            "body": self.body,
+            "type": self.type,
+            "action_url": self.action_url,
+            "is_read": self.is_read,
+            "created_at": self.created_at.isoformat(),
+            "read_at": self.read_at.isoformat() if self.read_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "Notification":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            user_id=data.get("user_id", ""),
+            title=data.get("title", ""),
+            body=data.get("body", ""),
+            type=data.get("type", "info"),
+            action_url=data.get("action_url"),
+            is_read=data.get("is_read", False),
+            created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
+            read_at=datetime.fromisoformat(data["read_at"]) if data.get("read_at") else None,
+        )
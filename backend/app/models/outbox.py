@@ -0,0 +1,52 @@
+"""
+Outbox entry model for Firestore.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class OutboxEntry:
+    """
+    A side effect of a committed change, waiting to be carried out.
+
+    Written in the same batch as the change itself; `kind` names the
+    handler run by `OutboxService` and `payload` its arguments.
+    """
+
+    id: str = ""
+    kind: str = ""
+    user_id: str = ""
+    payload: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    available_at: datetime = field(default_factory=datetime.utcnow)  # Claim lease / retry backoff
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "kind": self.kind,
+            "user_id": self.user_id,
+            "payload": self.payload,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "available_at": self.available_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "OutboxEntry":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            kind=data.get("kind", ""),
+            user_id=data.get("user_id", ""),
+            payload=data.get("payload") or {},
+            attempts=data.get("attempts", 0),
+            error=data.get("error"),
+            created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
+            available_at=datetime.fromisoformat(data["available_at"]) if data.get("available_at") else datetime.utcnow(),
+        )
@@ -0,0 +1,64 @@
+"""
+Queued email model for Firestore.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class EmailStatus(str, Enum):
+    """Delivery state of a queued email."""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+@dataclass
+class QueuedEmail:
+    """Represents an email waiting in the persistent queue."""
+
+    id: str = ""
+    to: str = ""
+    template: str = ""  # Rendered when sent (see `email_templates`)
+    locale: str = "fr"
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: EmailStatus = EmailStatus.PENDING
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    available_at: datetime = field(default_factory=datetime.utcnow)  # Claim lease / retry backoff
+    sent_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "to": self.to,
+            "template": self.template,
+            "locale": self.locale,
+            "params": self.params,
+            "status": self.status.value,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "available_at": self.available_at.isoformat(),
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "QueuedEmail":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            to=data.get("to", ""),
+            template=data.get("template", ""),
+            locale=data.get("locale", "fr"),
+            params=data.get("params") or {},
+            status=EmailStatus(data.get("status", "pending")),
+            attempts=data.get("attempts", 0),
+            error=data.get("error"),
+            created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
+            available_at=datetime.fromisoformat(data["available_at"]) if data.get("available_at") else datetime.utcnow(),
+            sent_at=datetime.fromisoformat(data["sent_at"]) if data.get("sent_at") else None,
+        )
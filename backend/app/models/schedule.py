@@ -0,0 +1,84 @@
+"""
+Recurring deposit schedule model.
+"""
+
+import calendar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional
+
+
+class ScheduleFrequency(str, Enum):
+    """How often a scheduled deposit runs."""
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+def _add_month(moment: datetime, day: int) -> datetime:
+    """The next month at `day` (clamped to the month's length)."""
+    year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+    return moment.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+@dataclass
+class DepositSchedule:
+    """Represents an automatic deposit into a vault."""
+
+    id: str = ""
+    user_id: str = ""
+    vault_id: str = ""
+    amount: float = 0.0
+    frequency: ScheduleFrequency = ScheduleFrequency.MONTHLY
+    day_of_month: int = 1  # Monthly schedules: keeps the 31st on month ends
+    next_run_at: datetime = field(default_factory=datetime.utcnow)
+    last_run_at: Optional[datetime] = None
+    is_active: bool = True
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+    def next_run_after(self, now: datetime) -> datetime:
+        """
+        The first run strictly after `now`, on the schedule's cadence.
+
+        Runs missed while the scheduler was down are skipped, not made up.
+        """
+        run = self.next_run_at
+        while run <= now:
+            if self.frequency == ScheduleFrequency.WEEKLY:
+                run += timedelta(weeks=1)
+            else:
+                run = _add_month(run, self.day_of_month)
+        return run
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "user_id": self.user_id,
+            "vault_id": self.vault_id,
+            "amount": self.amount,
+            "frequency": self.frequency.value,
+            "day_of_month": self.day_of_month,
+            "next_run_at": self.next_run_at.isoformat(),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "DepositSchedule":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            user_id=data.get("user_id", ""),
+            vault_id=data.get("vault_id", ""),
+            amount=data.get("amount", 0.0),
+            frequency=ScheduleFrequency(data.get("frequency", "monthly")),
+            day_of_month=data.get("day_of_month", 1),
+            next_run_at=datetime.fromisoformat(data["next_run_at"]) if data.get("next_run_at") else datetime.utcnow(),
+            last_run_at=datetime.fromisoformat(data["last_run_at"]) if data.get("last_run_at") else None,
+            is_active=data.get("is_active", True),
+            created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
+            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
+        )
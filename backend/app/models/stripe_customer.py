@@ -0,0 +1,36 @@
+"""
+Stripe customer model for Firestore.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class StripeCustomer:
+    """
+    The user a Stripe customer belongs to, stored under the customer ID.
+
+    Written with the user's `stripe_customer_id`, so a webhook about a
+    customer finds its user with a point read instead of a query.
+    """
+
+    id: str = ""  # Stripe customer ID
+    user_id: str = ""
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "user_id": self.user_id,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "StripeCustomer":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            user_id=data.get("user_id", ""),
+            created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
+        )
@@ -0,0 +1,88 @@
+"""
+Stripe webhook event model for Firestore.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class StripeEventStatus(str, Enum):
+    """Processing state of a received Stripe event."""
+    PENDING = "pending"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+@dataclass
+class StripeEvent:
+    """
+    A verified Stripe webhook event, stored under its Stripe event ID.
+
+    `data` is the event's `data.object` as Stripe sent it.
+    """
+
+    id: str = ""
+    type: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+    created: datetime = field(default_factory=datetime.utcnow)  # When Stripe created it
+    status: StripeEventStatus = StripeEventStatus.PENDING
+    outcome: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    received_at: datetime = field(default_factory=datetime.utcnow)
+    available_at: datetime = field(default_factory=datetime.utcnow)  # Claim lease / retry backoff
+    processed_at: Optional[datetime] = None
+
+    @property
+    def customer_id(self) -> Optional[str]:
+        """The Stripe customer the event is about, if any."""
+        return self.data.get("customer")
+
+    @property
+    def ordering_key(self) -> str:
+        """Events sharing a key are processed in order."""
+        return self.customer_id or (self.data.get("metadata") or {}).get("user_id") or self.id
+
+    @classmethod
+    def from_stripe(cls, event: Dict[str, Any]) -> "StripeEvent":
+        """Create from a Stripe event payload."""
+        return cls(
+            id=event["id"],
+            type=event["type"],
+            data=event["data"]["object"],
+            created=datetime.utcfromtimestamp(event["created"]),
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to Firestore document."""
+        return {
+            "type": self.type,
+            "data": self.data,
+            "created": self.created.isoformat(),
+            "status": self.status.value,
+            "outcome": self.outcome,
+            "attempts": self.attempts,
+            "error": self.error,
+            "received_at": self.received_at.isoformat(),
+            "available_at": self.available_at.isoformat(),
+            "processed_at": self.processed_at.isoformat() if self.processed_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> "StripeEvent":
+        """Create from Firestore document."""
+        return cls(
+            id=doc_id,
+            type=data.get("type", ""),
+            data=data.get("data") or {},
+            created=datetime.fromisoformat(data["created"]) if data.get("created") else datetime.utcnow(),
+            status=StripeEventStatus(data.get("status", "pending")),
+            outcome=data.get("outcome"),
+            attempts=data.get("attempts", 0),
+            error=data.get("error"),
+            received_at=datetime.fromisoformat(data.get("received_at", datetime.utcnow().isoformat())),
+            available_at=datetime.fromisoformat(data["available_at"]) if data.get("available_at") else datetime.utcnow(),
+            processed_at=datetime.fromisoformat(data["processed_at"]) if data.get("processed_at") else None,
+        )
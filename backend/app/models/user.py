@@ -24,13 +24,18 @@ class User:
     firebase_uid: str = ""
     role: UserRole = UserRole.USER
     discipline_score: float = 50.0  # Start at 50%
+    total_saved: float = 0.0  # Sum of the user's vault balances
     is_premium: bool = False
     is_active: bool = True
     stripe_customer_id: Optional[str] = None
     notification_enabled: bool = True
+    locale: str = "fr"  # Language of the emails sent to the user
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
+    last_deposit_at: Optional[datetime] = None  # Maintained by every deposit (signup until the first)
+    last_encouraged_at: Optional[datetime] = None
+    subscription_event_at: Optional[datetime] = None  # Stripe time of the last subscription event applied
     
     @property
     def is_admin(self) -> bool:
@@ -45,13 +50,18 @@ class User:
             "firebase_uid": self.firebase_uid,
             "role": self.role.value,
             "discipline_score": self.discipline_score,
+            "total_saved": self.total_saved,
             "is_premium": self.is_premium,
             "is_active": self.is_active,
             "stripe_customer_id": self.stripe_customer_id,
             "notification_enabled": self.notification_enabled,
+            "locale": self.locale,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "last_login": self.last_login.isoformat() if self.last_login else None,
+            "last_deposit_at": self.last_deposit_at.isoformat() if self.last_deposit_at else None,
+            "last_encouraged_at": self.last_encouraged_at.isoformat() if self.last_encouraged_at else None,
+            "subscription_event_at": self.subscription_event_at.isoformat() if self.subscription_event_at else None,
         }
     
     @classmethod
@@ -64,11 +74,16 @@ class User:
             firebase_uid=data.get("firebase_uid", doc_id),
             role=UserRole(data.get("role", "user")),
             discipline_score=data.get("discipline_score", 50.0),
+            total_saved=data.get("total_saved", 0.0),
             is_premium=data.get("is_premium", False),
             is_active=data.get("is_active", True),
             stripe_customer_id=data.get("stripe_customer_id"),
             notification_enabled=data.get("notification_enabled", True),
+            locale=data.get("locale", "fr"),
             created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
             updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
             last_login=datetime.fromisoformat(data["last_login"]) if data.get("last_login") else None,
+            last_deposit_at=datetime.fromisoformat(data["last_deposit_at"]) if data.get("last_deposit_at") else None,
+            last_encouraged_at=datetime.fromisoformat(data["last_encouraged_at"]) if data.get("last_encouraged_at") else None,
+            subscription_event_at=datetime.fromisoformat(data["subscription_event_at"]) if data.get("subscription_event_at") else None,
         )
@@ -22,6 +22,8 @@ class Vault:
     is_active: bool = True
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
+    unlock_notified_at: Optional[datetime] = None  # Set by the unlock sweep
+    closed_at: Optional[datetime] = None
     
     @property
     def is_locked(self) -> bool:
@@ -54,6 +56,8 @@ class Vault:
             "is_active": self.is_active,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "unlock_notified_at": self.unlock_notified_at.isoformat() if self.unlock_notified_at else None,
+            "closed_at": self.closed_at.isoformat() if self.closed_at else None,
         }
     
     @classmethod
@@ -71,4 +75,6 @@ class Vault:
             is_active=data.get("is_active", True),
             created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
             updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
+            unlock_notified_at=datetime.fromisoformat(data["unlock_notified_at"]) if data.get("unlock_notified_at") else None,
+            closed_at=datetime.fromisoformat(data["closed_at"]) if data.get("closed_at") else None,
         )
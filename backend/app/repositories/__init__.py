@@ -0,0 +1,32 @@
+"""Repositories module."""
+
+from app.repositories.campaigns import campaign_run_repository
+from app.repositories.deposits import deposit_repository
+from app.repositories.email_queue import (
+    email_dead_letter_repository,
+    email_queue_repository,
+)
+from app.repositories.notifications import notification_repository
+from app.repositories.outbox import outbox_dead_letter_repository, outbox_repository
+from app.repositories.schedules import schedule_repository
+from app.repositories.stripe_customers import stripe_customer_repository
+from app.repositories.stripe_events import stripe_event_repository
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+
+__all__ = [
+    "campaign_run_repository",
+    "deposit_repository",
+    "email_dead_letter_repository",
+    "email_queue_repository",
+    "notification_repository",
+    "outbox_dead_letter_repository",
+    "outbox_repository",
+    "schedule_repository",
+    "stripe_customer_repository",
+    "stripe_event_repository",
+    "user_repository",
+    "vault_repository",
+    "withdrawal_repository",
+]
@@ -0,0 +1,158 @@
+"""
+Base repository mapping a collection to a model class.
+"""
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+from app.storage import DocumentStore, Transaction, WriteBatch, get_store
+from app.storage.base import Aggregation, OrderBy, Where
+
+
+class Model(Protocol):
+    """Models stored by repositories (see `app.models`)."""
+    id: str
+
+    def to_dict(self) -> dict: ...
+
+    @classmethod
+    def from_dict(cls, doc_id: str, data: dict) -> Any: ...
+
+
+T = TypeVar("T", bound=Model)
+
+
+class Repository(Generic[T]):
+    """
+    Typed access to one collection of the configured document store.
+
+    Write methods accept an optional `batch`: the write is then staged in it
+    (and applied on `batch.commit()`) instead of being sent immediately. A
+    `Transaction` is a batch too, and `get` can read through one.
+    """
+
+    COLLECTION: str = ""
+    MODEL: Type[T]
+
+    @property
+    def store(self) -> DocumentStore:
+        """The active document store."""
+        return get_store()
+
+    async def get(self, doc_id: str, transaction: Optional[Transaction] = None) -> Optional[T]:
+        """Get an entity by ID (within `transaction` if given)."""
+        if transaction is None:
+            data = await self.store.get(self.COLLECTION, doc_id)
+        else:
+            data = await transaction.get(self.COLLECTION, doc_id)
+        if data is None:
+            return None
+        return self.MODEL.from_dict(doc_id, data)
+
+    async def get_many(self, doc_ids: Iterable[str]) -> Dict[str, T]:
+        """Get entities by ID in one round trip (missing IDs are left out)."""
+        docs = await self.store.get_many(self.COLLECTION, [i for i in doc_ids if i])
+        return {doc_id: self.MODEL.from_dict(doc_id, data) for doc_id, data in docs.items()}
+
+    async def add(self, entity: T, batch: Optional[WriteBatch] = None) -> T:
+        """Insert an entity with a generated ID (set on the entity)."""
+        if batch is None:
+            entity.id = await self.store.add(self.COLLECTION, entity.to_dict())
+        else:
+            entity.id = self.store.new_id()
+            batch.set(self.COLLECTION, entity.id, entity.to_dict())
+        return entity
+
+    async def create(self, entity: T, batch: Optional[WriteBatch] = None) -> T:
+        """
+        Insert an entity under its current ID, once.
+
+        The (batch) commit fails with `DocumentExistsError` if an entity
+        with that ID exists: use deterministic IDs to deduplicate writes.
+        """
+        if batch is None:
+            own_batch = self.store.batch()
+            own_batch.create(self.COLLECTION, entity.id, entity.to_dict())
+            await own_batch.commit()
+        else:
+            batch.create(self.COLLECTION, entity.id, entity.to_dict())
+        return entity
+
+    async def save(self, entity: T, batch: Optional[WriteBatch] = None) -> T:
+        """Create or overwrite an entity under its current ID."""
+        if batch is None:
+            await self.store.set(self.COLLECTION, entity.id, entity.to_dict())
+        else:
+            batch.set(self.COLLECTION, entity.id, entity.to_dict())
+        return entity
+
+    async def update(self, doc_id: str, batch: Optional[WriteBatch] = None, **fields: Any) -> None:
+        """Update serialized fields (or `Increment` transforms) of an existing entity."""
+        if batch is None:
+            await self.store.update(self.COLLECTION, doc_id, fields)
+        else:
+            batch.update(self.COLLECTION, doc_id, fields)
+
+    async def delete(self, doc_id: str, batch: Optional[WriteBatch] = None) -> None:
+        """Delete an entity."""
+        if batch is None:
+            await self.store.delete(self.COLLECTION, doc_id)
+        else:
+            batch.delete(self.COLLECTION, doc_id)
+
+    async def stream(
+        self,
+        where: Sequence[Where] = (),
+        order_by: Sequence[OrderBy] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> AsyncIterator[T]:
+        """Stream entities matching a query (see `DocumentStore.query` for cursors)."""
+        async for doc in self.store.query(
+            self.COLLECTION, where, order_by, limit, offset, start_after
+        ):
+            yield self.MODEL.from_dict(doc.id, doc.data)
+
+    async def find(
+        self,
+        where: Sequence[Where] = (),
+        order_by: Sequence[OrderBy] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[T]:
+        """List entities matching a query."""
+        return [
+            entity
+            async for entity in self.stream(where, order_by, limit, offset, start_after)
+        ]
+
+    async def find_one(self, where: Sequence[Where] = ()) -> Optional[T]:
+        """Get the first entity matching a query."""
+        for entity in await self.find(where, limit=1):
+            return entity
+        return None
+
+    async def count(self, where: Sequence[Where] = ()) -> int:
+        """Count entities matching a query (server-side)."""
+        return await self.store.count(self.COLLECTION, where)
+
+    async def aggregate(
+        self,
+        aggregations: Sequence[Aggregation],
+        where: Sequence[Where] = (),
+    ) -> Dict[str, Any]:
+        """Compute server-side count/sum/avg aggregations."""
+        return await self.store.aggregate(self.COLLECTION, aggregations, where)
@@ -0,0 +1,16 @@
+"""
+Campaign run repository.
+"""
+
+from app.models.campaign import CampaignRun
+from app.repositories.base import Repository
+
+
+class CampaignRunRepository(Repository[CampaignRun]):
+    """Repository for the campaign_runs collection (one checkpoint per run)."""
+
+    COLLECTION = "campaign_runs"
+    MODEL = CampaignRun
+
+
+campaign_run_repository = CampaignRunRepository()
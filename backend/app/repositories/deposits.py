@@ -0,0 +1,41 @@
+"""
+Deposit repository.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+from app.models.deposit import Deposit
+from app.repositories.base import Repository
+from app.storage import DESCENDING
+
+
+class DepositRepository(Repository[Deposit]):
+    """Repository for the deposits collection."""
+
+    COLLECTION = "deposits"
+    MODEL = Deposit
+
+    async def list_for_user(
+        self,
+        user_id: str,
+        vault_id: Optional[str] = None,
+        limit: int = 50,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[Deposit]:
+        """List a user's deposits, newest first (`start_after`: `(created_at, id)`)."""
+        where = [("user_id", "==", user_id)]
+        if vault_id:
+            where.append(("vault_id", "==", vault_id))
+
+        return await self.find(
+            where, [("created_at", DESCENDING)], limit=limit, start_after=start_after
+        )
+
+    async def list_for_vault(self, vault_id: str, limit: Optional[int] = None) -> List[Deposit]:
+        """List a vault's deposits, newest first."""
+        return await self.find(
+            [("vault_id", "==", vault_id)], [("created_at", DESCENDING)], limit=limit
+        )
+
+
+deposit_repository = DepositRepository()
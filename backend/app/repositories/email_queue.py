@@ -0,0 +1,66 @@
+"""
+Email queue repository.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from app.models.queued_email import EmailStatus, QueuedEmail
+from app.repositories.base import Repository
+from app.storage import ASCENDING, WriteBatch
+
+CLAIMS_COLLECTION = "email_claims"
+
+
+class EmailQueueRepository(Repository[QueuedEmail]):
+    """Repository for the email_queue collection."""
+
+    COLLECTION = "email_queue"
+    MODEL = QueuedEmail
+
+    async def list_pending(
+        self,
+        limit: int,
+        due_by: Optional[datetime] = None,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[QueuedEmail]:
+        """
+        List pending emails, first available first.
+
+        With `due_by`, only those available by then. `start_after` is the
+        `(available_at, id)` of the last email of the previous page.
+        """
+        where = [("status", "==", EmailStatus.PENDING.value)]
+        if due_by:
+            where.append(("available_at", "<=", due_by.isoformat()))
+
+        return await self.find(
+            where, [("available_at", ASCENDING)], limit=limit, start_after=start_after
+        )
+
+    def stage_claim(self, batch: WriteBatch, email: QueuedEmail, lease_until: datetime) -> None:
+        """
+        Stage a claim on a pending email, leased until `lease_until`.
+
+        The claim is keyed on the email and its current `available_at`, so
+        two instances claiming the same email conflict: the commit fails
+        with `DocumentExistsError` for the second one. A claim whose sender
+        died expires with its lease, the email's next claim having a new key.
+        """
+        claim_id = f"{email.id}-{email.available_at.isoformat()}"
+        batch.create(CLAIMS_COLLECTION, claim_id, {
+            "email_id": email.id,
+            "expires_at": lease_until,
+        })
+        batch.update(self.COLLECTION, email.id, {"available_at": lease_until.isoformat()})
+
+
+class EmailDeadLetterRepository(Repository[QueuedEmail]):
+    """Repository for emails given up on (email_dead_letters collection)."""
+
+    COLLECTION = "email_dead_letters"
+    MODEL = QueuedEmail
+
+
+email_queue_repository = EmailQueueRepository()
+email_dead_letter_repository = EmailDeadLetterRepository()
@@ -0,0 +1,37 @@
+"""
+Notification repository.
+"""
+
+from typing import List
+
+from app.models.notification import Notification
+from app.repositories.base import Repository
+from app.storage import DESCENDING
+
+
+class NotificationRepository(Repository[Notification]):
+    """Repository for the notifications collection."""
+
+    COLLECTION = "notifications"
+    MODEL = Notification
+
+    async def list_for_user(
+        self,
+        user_id: str,
+        unread_only: bool = False,
+        limit: int = 20,
+    ) -> List[Notification]:
+        """List a user's notifications, newest first."""
+        where = [("user_id", "==", user_id)]
+        if unread_only:
+            where.append(("is_read", "==", False))
+
+        return await self.find(where, [("created_at", DESCENDING)], limit=limit)
+
+    async def list_unread_ids(self, user_id: str) -> List[str]:
+        """List the IDs of a user's unread notifications."""
+        unread = self.stream([("user_id", "==", user_id), ("is_read", "==", False)])
+        return [notification.id async for notification in unread]
+
+
+notification_repository = NotificationRepository()
@@ -0,0 +1,54 @@
+"""
+Outbox repository.
+"""
+
+from datetime import datetime
+from typing import List
+
+from app.models.outbox import OutboxEntry
+from app.repositories.base import Repository
+from app.storage import ASCENDING, WriteBatch
+
+CLAIMS_COLLECTION = "outbox_claims"
+
+
+class OutboxRepository(Repository[OutboxEntry]):
+    """Repository for the outbox collection."""
+
+    COLLECTION = "outbox"
+    MODEL = OutboxEntry
+
+    async def list_due(self, limit: int, due_by: datetime) -> List[OutboxEntry]:
+        """List the entries available by `due_by`, oldest first."""
+        return await self.find(
+            [("available_at", "<=", due_by.isoformat())],
+            [("available_at", ASCENDING)],
+            limit=limit,
+        )
+
+    def stage_claim(self, batch: WriteBatch, entry: OutboxEntry, lease_until: datetime) -> None:
+        """
+        Stage a claim on an entry, leased until `lease_until`.
+
+        Keyed on the entry and its current `available_at`, like email
+        claims (see `EmailQueueRepository.stage_claim`): a second claim of
+        the same entry fails with `DocumentExistsError` until the lease
+        expires.
+        """
+        claim_id = f"{entry.id}-{entry.available_at.isoformat()}"
+        batch.create(CLAIMS_COLLECTION, claim_id, {
+            "entry_id": entry.id,
+            "expires_at": lease_until,
+        })
+        batch.update(self.COLLECTION, entry.id, {"available_at": lease_until.isoformat()})
+
+
+class OutboxDeadLetterRepository(Repository[OutboxEntry]):
+    """Repository for entries given up on (outbox_dead_letters collection)."""
+
+    COLLECTION = "outbox_dead_letters"
+    MODEL = OutboxEntry
+
+
+outbox_repository = OutboxRepository()
+outbox_dead_letter_repository = OutboxDeadLetterRepository()
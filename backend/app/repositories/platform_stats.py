@@ -0,0 +1,49 @@
+"""
+Platform stats repository (sharded counter documents).
+"""
+
+from typing import Dict, List, Optional
+
+from app.storage import Increment, WriteBatch, get_store
+
+
+class PlatformStatsRepository:
+    """
+    Repository for the platform_stats collection.
+
+    Each document is a shard holding a partial value of every counter; the
+    platform totals are the sum over all shards.
+    """
+
+    COLLECTION = "platform_stats"
+
+    async def increment(
+        self,
+        shard_id: str,
+        deltas: Dict[str, float],
+        batch: Optional[WriteBatch] = None,
+    ) -> None:
+        """Atomically add deltas to a shard's counters (creating it if missing)."""
+        fields = {name: Increment(delta) for name, delta in deltas.items()}
+        if batch is None:
+            await get_store().set(self.COLLECTION, shard_id, fields, merge=True)
+        else:
+            batch.set(self.COLLECTION, shard_id, fields, merge=True)
+
+    async def list_shards(self) -> List[Dict[str, float]]:
+        """Read every shard."""
+        return [doc.data async for doc in get_store().query(self.COLLECTION)]
+
+    async def replace(self, shards: Dict[str, Dict[str, float]]) -> None:
+        """Overwrite every shard in one batch, deleting shards not listed."""
+        store = get_store()
+        batch = store.batch()
+        async for doc in store.query(self.COLLECTION):
+            if doc.id not in shards:
+                batch.delete(self.COLLECTION, doc.id)
+        for shard_id, counters in shards.items():
+            batch.set(self.COLLECTION, shard_id, counters)
+        await batch.commit()
+
+
+platform_stats_repository = PlatformStatsRepository()
@@ -0,0 +1,47 @@
+"""
+Deposit schedule repository.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from app.models.schedule import DepositSchedule
+from app.repositories.base import Repository
+from app.storage import ASCENDING, DESCENDING
+
+
+class ScheduleRepository(Repository[DepositSchedule]):
+    """Repository for the deposit_schedules collection."""
+
+    COLLECTION = "deposit_schedules"
+    MODEL = DepositSchedule
+
+    async def list_for_user(self, user_id: str, limit: Optional[int] = None) -> List[DepositSchedule]:
+        """List a user's active schedules, newest first."""
+        return await self.find(
+            [("user_id", "==", user_id), ("is_active", "==", True)],
+            [("created_at", DESCENDING)],
+            limit=limit,
+        )
+
+    async def list_due(
+        self,
+        now: datetime,
+        limit: int,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[DepositSchedule]:
+        """
+        List active schedules due at `now`, oldest first.
+
+        Pages through the `(is_active, next_run_at)` index; `start_after`
+        is `(next_run_at, id)` of the last schedule of the previous page.
+        """
+        return await self.find(
+            [("is_active", "==", True), ("next_run_at", "<=", now.isoformat())],
+            [("next_run_at", ASCENDING)],
+            limit=limit,
+            start_after=start_after,
+        )
+
+
+schedule_repository = ScheduleRepository()
@@ -0,0 +1,16 @@
+"""
+Stripe customer repository.
+"""
+
+from app.models.stripe_customer import StripeCustomer
+from app.repositories.base import Repository
+
+
+class StripeCustomerRepository(Repository[StripeCustomer]):
+    """Repository for the stripe_customers collection (document ID = Stripe customer ID)."""
+
+    COLLECTION = "stripe_customers"
+    MODEL = StripeCustomer
+
+
+stripe_customer_repository = StripeCustomerRepository()
@@ -0,0 +1,50 @@
+"""
+Stripe event repository.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from app.models.stripe_event import StripeEvent, StripeEventStatus
+from app.repositories.base import Repository
+from app.storage import ASCENDING, WriteBatch
+
+CLAIMS_COLLECTION = "stripe_event_claims"
+
+
+class StripeEventRepository(Repository[StripeEvent]):
+    """Repository for the stripe_events collection."""
+
+    COLLECTION = "stripe_events"
+    MODEL = StripeEvent
+
+    async def list_pending(self, limit: int, due_by: Optional[datetime] = None) -> List[StripeEvent]:
+        """List pending events, first available first (with `due_by`, only those available by then)."""
+        where = [("status", "==", StripeEventStatus.PENDING.value)]
+        if due_by:
+            where.append(("available_at", "<=", due_by.isoformat()))
+
+        return await self.find(where, [("available_at", ASCENDING)], limit=limit)
+
+    async def list_failed(self, limit: int) -> List[StripeEvent]:
+        """List the events given up on."""
+        return await self.find([("status", "==", StripeEventStatus.FAILED.value)], limit=limit)
+
+    def stage_claim(self, batch: WriteBatch, event: StripeEvent, lease_until: datetime) -> None:
+        """
+        Stage a claim on a pending event, leased until `lease_until`.
+
+        Keyed on the event and its current `available_at`, like email
+        claims (see `EmailQueueRepository.stage_claim`): a second claim of
+        the same event fails with `DocumentExistsError` until the lease
+        expires.
+        """
+        claim_id = f"{event.id}-{event.available_at.isoformat()}"
+        batch.create(CLAIMS_COLLECTION, claim_id, {
+            "event_id": event.id,
+            "expires_at": lease_until,
+        })
+        batch.update(self.COLLECTION, event.id, {"available_at": lease_until.isoformat()})
+
+
+stripe_event_repository = StripeEventRepository()
@@ -0,0 +1,73 @@
+"""
+User repository.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from app.models.user import User
+from app.repositories.base import Repository
+from app.storage import ASCENDING, DESCENDING
+
+
+class UserRepository(Repository[User]):
+    """Repository for the users collection (document ID = Firebase UID)."""
+
+    COLLECTION = "users"
+    MODEL = User
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Get a user by email."""
+        return await self.find_one([("email", "==", email)])
+
+    async def list_newest(
+        self,
+        role: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        limit: int = 50,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[User]:
+        """
+        List users, newest first.
+
+        `start_after` is the `(created_at, id)` of the last user of the
+        previous page.
+        """
+        where = []
+        if role:
+            where.append(("role", "==", role))
+        if is_active is not None:
+            where.append(("is_active", "==", is_active))
+
+        return await self.find(
+            where, [("created_at", DESCENDING)], limit=limit, start_after=start_after
+        )
+
+    async def list_top_savers(self, limit: int = 10) -> List[User]:
+        """List the users with the highest `total_saved` (single indexed query)."""
+        return await self.find(
+            [("total_saved", ">", 0)], [("total_saved", DESCENDING)], limit=limit
+        )
+
+    async def list_inactive(
+        self,
+        cutoff: datetime,
+        limit: int,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[User]:
+        """
+        List users whose last deposit is at or before `cutoff`, oldest first.
+
+        Users who never deposited count from their signup (the field
+        starts at `created_at`). `start_after` is the `(last_deposit_at,
+        id)` of the last user of the previous page.
+        """
+        return await self.find(
+            [("last_deposit_at", "<=", cutoff.isoformat())],
+            [("last_deposit_at", ASCENDING)],
+            limit=limit,
+            start_after=start_after,
+        )
+
+
+user_repository = UserRepository()
@@ -0,0 +1,96 @@
+"""
+Vault repository.
+"""
+
+from datetime import date
+from typing import Any, List, Optional, Sequence
+
+from app.models.vault import Vault
+from app.repositories.base import Repository
+from app.storage import ASCENDING, DESCENDING
+
+
+class VaultRepository(Repository[Vault]):
+    """Repository for the vaults collection."""
+
+    COLLECTION = "vaults"
+    MODEL = Vault
+
+    async def list_for_user(
+        self,
+        user_id: str,
+        active_only: bool = False,
+        limit: Optional[int] = None,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[Vault]:
+        """List a user's vaults, newest first (`start_after`: `(created_at, id)`)."""
+        where = [("user_id", "==", user_id)]
+        if active_only:
+            where.append(("is_active", "==", True))
+
+        return await self.find(
+            where, [("created_at", DESCENDING)], limit=limit, start_after=start_after
+        )
+
+    async def list_closed_for_user(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[Vault]:
+        """List a user's closed vaults, last closed first (`start_after`: `(closed_at, id)`)."""
+        return await self.find(
+            [("user_id", "==", user_id), ("closed_at", ">", "")],
+            [("closed_at", DESCENDING)],
+            limit=limit,
+            start_after=start_after,
+        )
+
+    async def list_unlocked_for_user(
+        self,
+        user_id: str,
+        until: date,
+        limit: Optional[int] = None,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[Vault]:
+        """
+        List a user's vaults unlocked by `until`, last unlocked first
+        (`start_after`: `(unlock_date, id)`).
+        """
+        return await self.find(
+            [("user_id", "==", user_id), ("unlock_date", "<=", until.isoformat())],
+            [("unlock_date", DESCENDING)],
+            limit=limit,
+            start_after=start_after,
+        )
+
+    async def list_unannounced(
+        self,
+        since: date,
+        until: date,
+        limit: int,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[Vault]:
+        """
+        List active vaults unlocking between `since` and `until` (inclusive)
+        whose unlock was not announced yet.
+
+        Pages through the `(is_active, unlock_notified_at, unlock_date)`
+        index; `start_after` is `(unlock_date, id)` of the last vault of the
+        previous page. On Firestore, `== None` only matches vaults storing
+        `unlock_notified_at` as null (see `scripts.backfill_unlock_notified`).
+        """
+        return await self.find(
+            [
+                ("is_active", "==", True),
+                ("unlock_notified_at", "==", None),
+                ("unlock_date", ">=", since.isoformat()),
+                ("unlock_date", "<=", until.isoformat()),
+            ],
+            [("unlock_date", ASCENDING)],
+            limit=limit,
+            start_after=start_after,
+        )
+
+
+vault_repository = VaultRepository()
@@ -0,0 +1,45 @@
+"""
+Withdrawal repository.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+from app.models.withdrawal import Withdrawal
+from app.repositories.base import Repository
+from app.storage import DESCENDING
+
+
+class WithdrawalRepository(Repository[Withdrawal]):
+    """Repository for the withdrawals collection."""
+
+    COLLECTION = "withdrawals"
+    MODEL = Withdrawal
+
+    async def list_for_user(
+        self,
+        user_id: str,
+        vault_id: Optional[str] = None,
+        limit: int = 50,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[Withdrawal]:
+        """List a user's withdrawals, newest first (`start_after`: `(created_at, id)`)."""
+        where = [("user_id", "==", user_id)]
+        if vault_id:
+            where.append(("vault_id", "==", vault_id))
+
+        return await self.find(
+            where, [("created_at", DESCENDING)], limit=limit, start_after=start_after
+        )
+
+    async def list_for_vault(self, vault_id: str, limit: int = 20) -> List[Withdrawal]:
+        """List a vault's withdrawals, newest first."""
+        return await self.find(
+            [("vault_id", "==", vault_id)], [("created_at", DESCENDING)], limit=limit
+        )
+
+    async def list_recent(self, limit: int = 20) -> List[Withdrawal]:
+        """List the most recent withdrawals platform-wide."""
+        return await self.find(order_by=[("created_at", DESCENDING)], limit=limit)
+
+
+withdrawal_repository = WithdrawalRepository()
@@ -2,137 +2,125 @@
 Admin service for platform management.
 """
 
-from typing import Any, Dict, List, Optional
-from google.cloud.firestore_v1 import FieldFilter
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.core.firebase import get_firestore_client
-from app.models.user import User, UserRole
-from app.models.vault import Vault
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.user import User
+from app.repositories.users import user_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.services.stats_service import stats_service
 
 
 class AdminService:
     """Service for admin operations."""
     
+    def __init__(self):
+        # Top savers snapshots: limit -> (computed at, rows)
+        self._top_savers: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}
+    
     async def get_global_stats(self) -> Dict[str, Any]:
-        """Get global platform statistics."""
-        db = get_firestore_client()
-        
-        # Get users stats
-        users_ref = db.collection("users")
-        all_users = list(users_ref.stream())
-        
-        total_users = len(all_users)
-        active_users = sum(1 for u in all_users if u.to_dict().get("is_active", True))
-        premium_users = sum(1 for u in all_users if u.to_dict().get("is_premium", False))
-        
-        # Calculate average discipline score
-        discipline_scores = [u.to_dict().get("discipline_score", 50) for u in all_users]
-        avg_discipline = sum(discipline_scores) / len(discipline_scores) if discipline_scores else 0
+        """
+        Get global platform statistics.
         
-        # Get vaults stats
-        vaults_ref = db.collection("vaults")
-        all_vaults = list(vaults_ref.stream())
+        Reads the incrementally maintained counter shards (see
+        `stats_service`) instead of recomputing totals on every call.
+        """
+        totals = await stats_service.get_totals()
         
-        total_vaults = len(all_vaults)
-        active_vaults = sum(1 for v in all_vaults if v.to_dict().get("is_active", True))
-        total_saved = sum(v.to_dict().get("current_amount", 0) for v in all_vaults)
-        
-        # Get withdrawals stats
-        withdrawals_ref = db.collection("withdrawals")
-        all_withdrawals = list(withdrawals_ref.stream())
-        
-        total_withdrawals = len(all_withdrawals)
-        total_withdrawn = sum(w.to_dict().get("amount", 0) for w in all_withdrawals)
+        total_users = int(totals["total_users"])
+        avg_discipline = totals["discipline_score_sum"] / total_users if total_users else 0
         
         return {
             "total_users": total_users,
-            "active_users": active_users,
-            "premium_users": premium_users,
-            "total_vaults": total_vaults,
-            "active_vaults": active_vaults,
-            "total_saved": round(total_saved, 2),
-            "total_withdrawals": total_withdrawals,
-            "total_withdrawn": round(total_withdrawn, 2),
+            "active_users": int(totals["active_users"]),
+            "premium_users": int(totals["premium_users"]),
+            "total_vaults": int(totals["total_vaults"]),
+            "active_vaults": int(totals["active_vaults"]),
+            "total_saved": round(totals["total_saved"], 2),
+            "total_withdrawals": int(totals["total_withdrawals"]),
+            "total_withdrawn": round(totals["total_withdrawn"], 2),
             "avg_discipline_score": round(avg_discipline, 1),
         }
     
     async def list_users(
         self,
-        skip: int = 0,
         limit: int = 50,
         role: Optional[str] = None,
         is_active: Optional[bool] = None,
-    ) -> List[User]:
-        """List users with pagination and filters."""
-        db = get_firestore_client()
-        query = db.collection("users")
-        
-        if role:
-            query = query.where(filter=FieldFilter("role", "==", role))
-        
-        if is_active is not None:
-            query = query.where(filter=FieldFilter("is_active", "==", is_active))
-        
-        # Order by created_at descending
-        query = query.order_by("created_at", direction="DESCENDING")
-        query = query.offset(skip).limit(limit)
-        
-        docs = query.stream()
-        return [User.from_dict(doc.id, doc.to_dict()) for doc in docs]
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[User], Optional[str]]:
+        """
+        List users, newest first, with cursor pagination and filters.
+        
+        Args:
+            limit: Page size
+            role: Only users with this role
+            is_active: Only active (or disabled) users
+            cursor: `next_cursor` of the previous page
+            
+        Returns:
+            The page of users and the cursor of the next page (None on
+            the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        start_after = decode_cursor(cursor, 2) if cursor else None
+        if start_after is not None and not all(isinstance(v, str) for v in start_after):
+            raise ValueError("Invalid cursor")
+        
+        # Fetch one extra user to know whether another page follows
+        users = await user_repository.list_newest(role, is_active, limit + 1, start_after)
+        if len(users) <= limit:
+            return users, None
+        
+        users = users[:limit]
+        last = users[-1]
+        return users, encode_cursor([last.created_at.isoformat(), last.id])
     
     async def get_recent_activity(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent platform activity."""
-        db = get_firestore_client()
-        
         # Get recent withdrawals
-        withdrawals = db.collection("withdrawals")\
-            .order_by("created_at", direction="DESCENDING")\
-            .limit(limit)\
-            .stream()
+        withdrawals = await withdrawal_repository.list_recent(limit)
         
         activities = []
         for w in withdrawals:
-            data = w.to_dict()
             activities.append({
                 "type": "withdrawal",
                 "id": w.id,
-                "user_id": data.get("user_id"),
-                "amount": data.get("amount"),
-                "created_at": data.get("created_at"),
+                "user_id": w.user_id,
+                "amount": w.amount,
+                "created_at": w.created_at.isoformat(),
             })
         
         return activities
     
     async def get_top_savers(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get top savers by total amount."""
-        db = get_firestore_client()
-        
-        # Get all vaults grouped by user
-        vaults = list(db.collection("vaults").stream())
-        
-        user_totals: Dict[str, float] = {}
-        for v in vaults:
-            data = v.to_dict()
-            user_id = data.get("user_id")
-            amount = data.get("current_amount", 0)
-            user_totals[user_id] = user_totals.get(user_id, 0) + amount
-        
-        # Sort and get top
-        sorted_users = sorted(user_totals.items(), key=lambda x: x[1], reverse=True)[:limit]
-        
-        # Get user details
-        result = []
-        for user_id, total in sorted_users:
-            user_doc = db.collection("users").document(user_id).get()
-            if user_doc.exists:
-                user_data = user_doc.to_dict()
-                result.append({
-                    "user_id": user_id,
-                    "email": user_data.get("email"),
-                    "full_name": user_data.get("full_name"),
-                    "total_saved": round(total, 2),
-                })
-        
+        """
+        Get top savers by total amount.
+        
+        Reads the `total_saved` field kept on each user by deposits and
+        withdrawals. The result is a snapshot refreshed at most every
+        `LEADERBOARD_REFRESH_SECONDS`.
+        """
+        snapshot = self._top_savers.get(limit)
+        if snapshot and time.monotonic() - snapshot[0] < settings.LEADERBOARD_REFRESH_SECONDS:
+            return snapshot[1]
+        
+        users = await user_repository.list_top_savers(limit)
+        result = [
+            {
+                "user_id": user.id,
+                "email": user.email,
+                "full_name": user.full_name,
+                "total_saved": round(user.total_saved, 2),
+            }
+            for user in users
+        ]
+        
+        self._top_savers[limit] = (time.monotonic(), result)
         return result
 
 
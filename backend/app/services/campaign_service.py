@@ -0,0 +1,160 @@
+"""
+Encouragement campaign.
+
+Once a day, users who have not deposited for `ENCOURAGEMENT_INACTIVE_DAYS`
+days get an encouragement notification. The run pages through the users on
+the `last_deposit_at` index, oldest deposit first, and writes the
+notifications in batches that also advance its checkpoint in
+`campaign_runs`: a run interrupted by a restart resumes after the last
+committed batch on the next tick.
+
+Notification IDs are derived from the run and the user and created, never
+overwritten, so an instance racing another on the same run has its batch
+rejected and stops, leaving the run to the other one.
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.models.campaign import CampaignRun
+from app.models.user import User
+from app.repositories.campaigns import campaign_run_repository
+from app.repositories.users import user_repository
+from app.services.notification_service import notification_service
+from app.storage import DocumentExistsError, Increment, WriteBatch, get_store
+
+logger = logging.getLogger(__name__)
+
+ENCOURAGEMENT = "encouragement"
+
+# Outcomes of an inactive user, as counted by `run_encouragement`
+ENCOURAGED = "encouraged"
+MUTED = "muted"  # Notifications off or account disabled
+RATE_LIMITED = "rate_limited"  # Encouraged less than the minimum interval ago
+
+# Writes per batch (Firestore's limit): 2 per encouraged user + the checkpoint
+MAX_BATCH_WRITES = 500
+USERS_PER_BATCH = (MAX_BATCH_WRITES - 1) // 2
+
+
+def run_id(campaign: str, day: date) -> str:
+    """ID of a campaign's run (and checkpoint) for a day."""
+    return f"{campaign}-{day.isoformat()}"
+
+
+class CampaignService:
+    """Service for notification campaigns over the user base."""
+
+    async def run_encouragement(
+        self,
+        today: Optional[date] = None,
+        page_size: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Start or resume the day's encouragement run.
+
+        Returns:
+            The number of users per outcome handled by this call (empty if
+            the day's run was already finished)
+        """
+        today = today or date.today()
+        page_size = page_size or settings.ENCOURAGEMENT_PAGE_SIZE
+        run = await self._checkpoint(today)
+        if run.finished_at:
+            return {}
+
+        now = datetime.utcnow()
+        outcomes: Counter = Counter()
+        start_after = run.cursor
+        while True:
+            page = await user_repository.list_inactive(run.cutoff, page_size, start_after)
+            finished = len(page) < page_size
+            batch = get_store().batch()
+            staged: Counter = Counter()
+            for i, user in enumerate(page):
+                outcome = await self._stage(batch, run, user, today, now)
+                staged[outcome] += 1
+                last = i == len(page) - 1
+                if staged[ENCOURAGED] == USERS_PER_BATCH or last:
+                    if not await self._commit(batch, run, user, staged, finished and last):
+                        logger.info("Campaign %s is run by another instance", run.id)
+                        return dict(outcomes)
+                    outcomes.update(staged)
+                    batch, staged = get_store().batch(), Counter()
+            if not page:
+                await campaign_run_repository.update(run.id, finished_at=now.isoformat())
+            if finished:
+                break
+            start_after = (page[-1].last_deposit_at.isoformat(), page[-1].id)
+
+        return dict(outcomes)
+
+    async def _checkpoint(self, today: date) -> CampaignRun:
+        """Load the day's run, creating it on its first tick."""
+        run = await campaign_run_repository.get(run_id(ENCOURAGEMENT, today))
+        if run:
+            return run
+
+        cutoff = datetime.combine(today, time()) - timedelta(days=settings.ENCOURAGEMENT_INACTIVE_DAYS)
+        run = CampaignRun(id=run_id(ENCOURAGEMENT, today), campaign=ENCOURAGEMENT, cutoff=cutoff)
+        try:
+            return await campaign_run_repository.create(run)
+        except DocumentExistsError:
+            return await campaign_run_repository.get(run.id)
+
+    async def _stage(
+        self,
+        batch: WriteBatch,
+        run: CampaignRun,
+        user: User,
+        today: date,
+        now: datetime,
+    ) -> str:
+        """Stage a user's encouragement in a batch; return its outcome."""
+        if not user.notification_enabled or not user.is_active:
+            return MUTED
+        min_interval = timedelta(days=settings.ENCOURAGEMENT_MIN_INTERVAL_DAYS)
+        if user.last_encouraged_at and now - user.last_encouraged_at < min_interval:
+            return RATE_LIMITED
+
+        await notification_service.notify_encouragement(
+            user.id,
+            (today - user.last_deposit_at.date()).days,
+            batch,
+            notification_id=f"{run.id}-{user.id}",
+        )
+        await user_repository.update(user.id, batch, last_encouraged_at=now.isoformat())
+        return ENCOURAGED
+
+    async def _commit(
+        self,
+        batch: WriteBatch,
+        run: CampaignRun,
+        last_user: User,
+        staged: Counter,
+        finished: bool,
+    ) -> bool:
+        """Commit a batch with the run's checkpoint; False if another instance won."""
+        fields = {name: Increment(count) for name, count in staged.items()}
+        fields["cursor"] = [last_user.last_deposit_at.isoformat(), last_user.id]
+        if finished:
+            fields["finished_at"] = datetime.utcnow().isoformat()
+        await campaign_run_repository.update(run.id, batch, **fields)
+        try:
+            await batch.commit()
+        except DocumentExistsError:
+            return False
+        return True
+
+    async def run_scheduled(self) -> Dict[str, int]:
+        """Run the encouragement campaign and log the outcome (background task)."""
+        outcomes = await self.run_encouragement()
+        if outcomes:
+            logger.info("Encouragement campaign: %s", outcomes)
+        return outcomes
+
+
+campaign_service = CampaignService()
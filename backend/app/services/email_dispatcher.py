@@ -0,0 +1,264 @@
+"""
+Email delivery.
+
+Requests never talk to the SMTP server: they write their emails to the
+`email_queue` collection (see `EmailService.queue`). On each instance, an
+`EmailDispatcher` claims the available ones, feeds them to a bounded
+in-process queue and a pool of workers sends them in batches over pooled
+SMTP connections.
+
+An email that fails for a transient reason is retried with exponential
+backoff (`available_at` pushed back); one refused permanently, failing
+`EMAIL_MAX_ATTEMPTS` times or whose template cannot be rendered with its
+params is moved to `email_dead_letters`. Claims are
+leased, so emails claimed by an instance that died are claimed again once
+the lease expires.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import smtplib
+from collections import Counter
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.smtp import SMTPPool
+from app.models.queued_email import EmailStatus, QueuedEmail
+from app.repositories.email_queue import (
+    email_dead_letter_repository,
+    email_queue_repository,
+)
+from app.services.email_templates import render
+from app.storage import DocumentExistsError, DocumentNotFoundError, get_store
+
+logger = logging.getLogger(__name__)
+
+# Emails claimed per batched write (2 writes each, under Firestore's 500)
+MAX_CLAIMS = 250
+
+
+def is_permanent(error: Exception) -> bool:
+    """Whether the server refused a message for good (5xx reply)."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def build_message(email: QueuedEmail) -> EmailMessage:
+    """
+    MIME message of a queued email.
+
+    Raises:
+        Exception: Whatever rendering its template with its params raised
+    """
+    subject, body = render(email.template, email.params, email.locale)
+    message = EmailMessage()
+    message["From"] = settings.EMAIL_FROM
+    message["To"] = email.to
+    message["Subject"] = subject
+    message["Message-ID"] = f"<{email.id}@flexsave.app>"
+    message.set_content(body, subtype="html")
+    return message
+
+
+class EmailDispatcher:
+    """
+    Background sender of the queued emails.
+
+    Started and stopped by the application lifespan (see `app.main`), like
+    `PeriodicTask`.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[SMTPPool] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self._workers = workers or settings.EMAIL_WORKERS
+        self.pool = pool or SMTPPool(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_USERNAME,
+            settings.SMTP_PASSWORD,
+            settings.SMTP_STARTTLS,
+            size=self._workers,
+        )
+        self._batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size or settings.EMAIL_QUEUE_SIZE)
+        self._poll_interval = poll_interval or settings.EMAIL_POLL_SECONDS
+        self._in_flight: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self.outcomes: Counter = Counter()
+
+    def start(self) -> None:
+        """Start the workers and the poller on the running event loop."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"email-worker-{i}")
+            for i in range(self._workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._poll_loop(), name="email-poller"))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop polling, give the workers `timeout` seconds to drain, then stop."""
+        if not self._tasks:
+            return
+        *workers, poller = self._tasks
+        poller.cancel()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except TimeoutError:
+            logger.warning("Stopping with %d emails unsent (re-sent after their lease)", self._queue.qsize())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.pool.close()
+
+    async def drain(self) -> None:
+        """Wait until every email handed to the workers is processed."""
+        await self._queue.join()
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                claimed = await self.poll()
+            except Exception:
+                logger.exception("Claiming queued emails failed")
+                claimed = 0
+            if not claimed:
+                await asyncio.sleep(self._poll_interval)
+
+    async def poll(self) -> int:
+        """Claim available emails and hand them to the workers; return how many."""
+        free = min(self._queue.maxsize - self._queue.qsize(), MAX_CLAIMS)
+        if free <= 0:
+            return 0
+
+        claimed = await self._claim(free)
+        for email in claimed:
+            self._in_flight.add(email.id)
+            await self._queue.put(email)
+        return len(claimed)
+
+    async def _claim(self, limit: int) -> List[QueuedEmail]:
+        """Lease up to `limit` available emails to this instance."""
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=settings.EMAIL_LEASE_SECONDS)
+        available = [
+            email for email in await email_queue_repository.list_pending(limit, due_by=now)
+            if email.id not in self._in_flight
+        ]
+        if not available:
+            return []
+
+        store = get_store()
+        batch = store.batch()
+        for email in available:
+            email_queue_repository.stage_claim(batch, email, lease_until)
+        try:
+            await batch.commit()
+            return available
+        except (DocumentExistsError, DocumentNotFoundError):
+            pass
+
+        # Another instance claimed (or already finished and deleted) some of
+        # these first: claim one by one
+        claimed = []
+        for email in available:
+            batch = store.batch()
+            email_queue_repository.stage_claim(batch, email, lease_until)
+            try:
+                await batch.commit()
+            except (DocumentExistsError, DocumentNotFoundError):
+                continue
+            claimed.append(email)
+        return claimed
+
+    async def _work(self) -> None:
+        while True:
+            emails = [await self._queue.get()]
+            while len(emails) < self._batch_size and not self._queue.empty():
+                emails.append(self._queue.get_nowait())
+            try:
+                await self._deliver(emails)
+            except Exception:
+                logger.exception("Recording the delivery of %d emails failed", len(emails))
+            finally:
+                for email in emails:
+                    self._in_flight.discard(email.id)
+                    self._queue.task_done()
+
+    async def _deliver(self, emails: List[QueuedEmail]) -> None:
+        """Send emails over one connection and record the outcome in one write."""
+        # Emails that cannot be rendered (e.g. bad params) would fail the same
+        # way on every attempt: they are dead-lettered without being sent
+        unrenderable: Dict[str, Exception] = {}
+        sendable, messages = [], []
+        for email in emails:
+            try:
+                messages.append(build_message(email))
+            except Exception as e:
+                unrenderable[email.id] = ValueError(f"Rendering failed: {e!r}")
+            else:
+                sendable.append(email)
+
+        try:
+            sent = await self.pool.send(messages) if messages else []
+        except (smtplib.SMTPException, OSError) as e:
+            logger.warning("SMTP connection failed: %s", e)
+            sent = [e] * len(messages)
+        results = {**unrenderable, **{email.id: error for email, error in zip(sendable, sent, strict=True)}}
+
+        now = datetime.utcnow()
+        batch = get_store().batch()
+        for email in emails:
+            error = results[email.id]
+            attempts = email.attempts + 1
+            if error is None:
+                outcome = "sent"
+                await email_queue_repository.update(
+                    email.id,
+                    batch,
+                    status=EmailStatus.SENT.value,
+                    attempts=attempts,
+                    sent_at=now.isoformat(),
+                )
+            elif email.id in unrenderable or is_permanent(error) or attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                outcome = "dead_lettered"
+                await email_dead_letter_repository.save(
+                    dataclasses.replace(
+                        email, status=EmailStatus.FAILED, attempts=attempts, error=str(error)
+                    ),
+                    batch,
+                )
+                await email_queue_repository.delete(email.id, batch)
+            else:
+                outcome = "retried"
+                backoff = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+                await email_queue_repository.update(
+                    email.id,
+                    batch,
+                    attempts=attempts,
+                    error=str(error),
+                    available_at=(now + timedelta(seconds=backoff)).isoformat(),
+                )
+            self.outcomes[outcome] += 1
+        await batch.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Delivery outcomes, queue depth and SMTP connection reuse."""
+        return {
+            **dict(self.outcomes),
+            "queued": self._queue.qsize(),
+            "smtp": self.pool.stats(),
+        }
@@ -0,0 +1,51 @@
+"""
+Email service.
+
+Emails are not sent on the request path: they are written to the
+`email_queue` collection (in the caller's batch when given), to be
+rendered and delivered in the background. Queued emails hold the template
+name and its params, not the rendered HTML.
+"""
+
+from typing import Any, Dict, Optional
+
+from app.models.queued_email import QueuedEmail
+from app.repositories.email_queue import email_queue_repository
+from app.services.email_templates import DEFAULT_LOCALE, TEMPLATES
+from app.storage import WriteBatch
+
+
+class EmailService:
+    """Service for outgoing emails."""
+
+    async def queue(
+        self,
+        to: str,
+        template: str,
+        params: Dict[str, Any],
+        locale: str = DEFAULT_LOCALE,
+        batch: Optional[WriteBatch] = None,
+        email_id: Optional[str] = None,
+    ) -> QueuedEmail:
+        """
+        Queue an email for delivery.
+
+        Args:
+            to: Recipient address
+            template: Name of an `email_templates` template
+            params: The template's params (JSON-serializable)
+            locale: Template variant (e.g. the recipient's locale)
+            batch: Stage the write in this batch
+            email_id: Deterministic ID: the email is then queued at most
+                once (the commit fails with `DocumentExistsError`)
+        """
+        if template not in TEMPLATES:
+            raise ValueError(f"Unknown email template: {template}")
+        email = QueuedEmail(id=email_id or "", to=to, template=template, locale=locale, params=params)
+
+        if email_id:
+            return await email_queue_repository.create(email, batch)
+        return await email_queue_repository.add(email, batch)
+
+
+email_service = EmailService()
@@ -1,42 +1,165 @@
 """
 Email templates for FlexSave notifications.
+
+Templates are compiled once, at import: each page (head, CSS, header,
+footer) is assembled and split into static segments and slots, so a render
+only formats the slots and joins. Text slots are HTML-escaped. Every
+template has a variant per locale; unknown locales fall back to French.
+"""
+
+import html
+import re
+from string import Formatter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+DEFAULT_LOCALE = "fr"
+LOCALES = ("fr", "en")
+
+_BASE_CSS = """\
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .footer { text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }
 """
 
-from typing import Optional
+_needs_escape = re.compile("[&<>\"']").search
+
+
+class Markup(str):
+    """Text that is already HTML: inserted in a template without escaping."""
+
+
+class Fragment:
+    """
+    A template source compiled into static segments and slots.
+
+    HTML fragments (`escape`) have their static segments reduced to ASCII,
+    non-ASCII characters becoming character references: a single emoji
+    would otherwise make CPython store the whole rendered page at 4 bytes
+    per character.
+    """
+
+    def __init__(self, source: str, escape: bool = True):
+        self._segments: List[str] = []
+        self._slots: List[Tuple[int, str, str]] = []
+        self._escape = escape
+        # The parser splits literals at escaped braces: merge the static
+        # text between two slots into one segment
+        static: List[str] = []
+        for literal, name, spec, conversion in Formatter().parse(source):
+            static.append(literal)
+            if name is None:
+                continue
+            if conversion or not name.isidentifier():
+                raise ValueError(f"Unsupported template slot: {name!r}")
+            self._add_static(static)
+            self._slots.append((len(self._segments), name, spec or ""))
+            self._segments.append("")
+        self._add_static(static)
+
+    def _add_static(self, static: List[str]) -> None:
+        literal = "".join(static)
+        static.clear()
+        if self._escape:
+            literal = literal.encode("ascii", "xmlcharrefreplace").decode("ascii")
+        if literal:
+            self._segments.append(literal)
+
+    def fill(self, params: Mapping[str, Any]) -> str:
+        """Render with `params` (KeyError if a slot is missing)."""
+        segments = self._segments.copy()
+        for index, name, spec in self._slots:
+            value = params[name]
+            if type(value) is str:
+                text = value if not spec else format(value, spec)
+                if self._escape and _needs_escape(text):
+                    text = html.escape(text)
+            else:
+                text = format(value, spec)
+            segments[index] = text
+        return "".join(segments)
+
+
+class EmailTemplate:
+    """
+    An email (subject and HTML body) compiled once, rendered many times.
+
+    `prepare` derives extra params (computed amounts, optional blocks)
+    from the given ones before the slots are filled.
+    """
 
+    def __init__(
+        self,
+        subject: str,
+        body: str,
+        prepare: Optional[Callable[[Mapping[str, Any]], Dict[str, Any]]] = None,
+    ):
+        self.subject = Fragment(subject, escape=False)
+        self.body = Fragment(body)
+        self._prepare = prepare
 
-def get_welcome_email(user_name: str) -> tuple[str, str]:
-    """Welcome email template."""
-    subject = "Bienvenue sur FlexSave ! 🎉"
-    
-    body = f"""
+    def render(self, params: Mapping[str, Any]) -> Tuple[str, str]:
+        """Render `(subject, html)`."""
+        if self._prepare:
+            params = {**params, **self._prepare(params)}
+        return self.subject.fill(params), self.body.fill(params)
+
+
+def _page(css: str, header: str, content: str, footer: str) -> str:
+    """HTML source of an email: CSS braces escaped, content slots kept."""
+    css = (_BASE_CSS + css).replace("{", "{{").replace("}", "}}")
+    return f"""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #10B981, #059669); padding: 40px 20px; text-align: center; border-radius: 12px 12px 0 0; }}
-        .header h1 {{ color: white; margin: 0; font-size: 28px; }}
-        .content {{ background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }}
-        .content h2 {{ color: #1f2937; }}
-        .content p {{ color: #6b7280; line-height: 1.6; }}
-        .button {{ display: inline-block; background: #10B981; color: white; padding: 14px 28px; text-decoration: none; border-radius: 8px; font-weight: 600; }}
-        .footer {{ text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }}
-        ul {{ color: #6b7280; }}
-        li {{ margin: 10px 0; }}
-    </style>
+{css}    </style>
 </head>
 <body>
     <div class="container">
         <div class="header">
-            <h1>💰 FlexSave</h1>
+            <h1>{header}</h1>
         </div>
         <div class="content">
+{content}
+        </div>
+        <div class="footer">
+{footer}
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+
+# Welcome
+
+_WELCOME_CSS = """\
+        .header { background: linear-gradient(135deg, #10B981, #059669); padding: 40px 20px; text-align: center; border-radius: 12px 12px 0 0; }
+        .header h1 { color: white; margin: 0; font-size: 28px; }
+        .content { background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }
+        .content h2 { color: #1f2937; }
+        .content p { color: #6b7280; line-height: 1.6; }
+        .button { display: inline-block; background: #10B981; color: white; padding: 14px 28px; text-decoration: none; border-radius: 8px; font-weight: 600; }
+        ul { color: #6b7280; }
+        li { margin: 10px 0; }
+"""
+
+_WELCOME_FR = EmailTemplate(
+    "Bienvenue sur FlexSave ! 🎉",
+    _page(_WELCOME_CSS, "💰 FlexSave", """\
             <h2>Bienvenue {user_name} !</h2>
             <p>Nous sommes ravis de vous accueillir sur FlexSave, la plateforme d'épargne qui vous permet de garder le contrôle.</p>
-            
             <p><strong>Voici comment ça fonctionne :</strong></p>
             <ul>
                 <li>📦 Créez des coffres d'épargne pour vos objectifs</li>
@@ -44,168 +167,207 @@ def get_welcome_email(user_name: str) -> tuple[str, str]:
                 <li>🔓 Gardez 10% de flexibilité pour les imprévus</li>
                 <li>📈 Suivez votre score de discipline</li>
             </ul>
-            
             <p style="text-align: center; margin-top: 30px;">
                 <a href="https://flexsave.com/dashboard" class="button">Créer mon premier coffre</a>
-            </p>
-        </div>
-        <div class="footer">
+            </p>""", """\
             <p>© 2025 FlexSave. Tous droits réservés.</p>
-            <p>Vous recevez cet email car vous avez créé un compte sur FlexSave.</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-    return subject, body
+            <p>Vous recevez cet email car vous avez créé un compte sur FlexSave.</p>"""),
+)
 
+_WELCOME_EN = EmailTemplate(
+    "Welcome to FlexSave! 🎉",
+    _page(_WELCOME_CSS, "💰 FlexSave", """\
+            <h2>Welcome {user_name}!</h2>
+            <p>We are delighted to welcome you to FlexSave, the savings platform that keeps you in control.</p>
+            <p><strong>Here is how it works:</strong></p>
+            <ul>
+                <li>📦 Create savings vaults for your goals</li>
+                <li>📅 Choose an unlock date</li>
+                <li>🔓 Keep 10% flexibility for the unexpected</li>
+                <li>📈 Track your discipline score</li>
+            </ul>
+            <p style="text-align: center; margin-top: 30px;">
+                <a href="https://flexsave.com/dashboard" class="button">Create my first vault</a>
+            </p>""", """\
+            <p>© 2025 FlexSave. All rights reserved.</p>
+            <p>You are receiving this email because you created a FlexSave account.</p>"""),
+)
 
-def get_deposit_email(user_name: str, vault_name: str, amount: float, new_total: float) -> tuple[str, str]:
-    """Deposit confirmation email."""
-    subject = f"Dépôt confirmé : {amount:.2f} € 💰"
-    
-    body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #10B981; padding: 30px; text-align: center; border-radius: 12px 12px 0 0; }}
-        .header h1 {{ color: white; margin: 0; font-size: 24px; }}
-        .content {{ background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }}
-        .amount {{ font-size: 48px; font-weight: bold; color: #10B981; text-align: center; margin: 20px 0; }}
-        .info {{ background: #f0fdf4; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-        .footer {{ text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>✅ Dépôt effectué</h1>
-        </div>
-        <div class="content">
+
+# Deposit confirmation
+
+_DEPOSIT_CSS = """\
+        .header { background: #10B981; padding: 30px; text-align: center; border-radius: 12px 12px 0 0; }
+        .header h1 { color: white; margin: 0; font-size: 24px; }
+        .content { background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }
+        .amount { font-size: 48px; font-weight: bold; color: #10B981; text-align: center; margin: 20px 0; }
+        .info { background: #f0fdf4; padding: 20px; border-radius: 8px; margin: 20px 0; }
+"""
+
+_DEPOSIT_FR = EmailTemplate(
+    "Dépôt confirmé : {amount:.2f} € 💰",
+    _page(_DEPOSIT_CSS, "✅ Dépôt effectué", """\
             <p>Bonjour {user_name},</p>
             <p class="amount">+{amount:.2f} €</p>
             <div class="info">
                 <p><strong>Coffre :</strong> {vault_name}</p>
                 <p><strong>Nouveau solde :</strong> {new_total:.2f} €</p>
             </div>
-            <p>Bravo ! Chaque dépôt vous rapproche de vos objectifs. 🎯</p>
-        </div>
-        <div class="footer">
-            <p>© 2025 FlexSave</p>
-        </div>
-    </div>
-</body>
-</html>
+            <p>Bravo ! Chaque dépôt vous rapproche de vos objectifs. 🎯</p>""", """\
+            <p>© 2025 FlexSave</p>"""),
+)
+
+_DEPOSIT_EN = EmailTemplate(
+    "Deposit confirmed: €{amount:.2f} 💰",
+    _page(_DEPOSIT_CSS, "✅ Deposit made", """\
+            <p>Hello {user_name},</p>
+            <p class="amount">+€{amount:.2f}</p>
+            <div class="info">
+                <p><strong>Vault:</strong> {vault_name}</p>
+                <p><strong>New balance:</strong> €{new_total:.2f}</p>
+            </div>
+            <p>Well done! Every deposit brings you closer to your goals. 🎯</p>""", """\
+            <p>© 2025 FlexSave</p>"""),
+)
+
+
+# Withdrawal confirmation
+
+_WITHDRAWAL_CSS = """\
+        .header { background: #3b82f6; padding: 30px; text-align: center; border-radius: 12px 12px 0 0; }
+        .header h1 { color: white; margin: 0; font-size: 24px; }
+        .content { background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }
+        .amount { font-size: 48px; font-weight: bold; color: #3b82f6; text-align: center; margin: 20px 0; }
+        .info { background: #eff6ff; padding: 20px; border-radius: 8px; margin: 20px 0; }
 """
-    return subject, body
-
-
-def get_withdrawal_email(
-    user_name: str,
-    vault_name: str,
-    amount: float,
-    fee: float,
-    is_early: bool
-) -> tuple[str, str]:
-    """Withdrawal confirmation email."""
-    net_amount = amount - fee
-    subject = f"Retrait confirmé : {net_amount:.2f} €"
-    
-    fee_info = ""
-    if is_early and fee > 0:
-        fee_info = f"""
+
+_EARLY_NOTICE = """
             <div style="background: #fef3c7; padding: 15px; border-radius: 8px; margin: 15px 0;">
                 <p style="margin: 0; color: #92400e;">
-                    ⚠️ Retrait anticipé : frais de {fee:.2f} € appliqués
+                    ⚠️ {text}
                 </p>
-            </div>
-        """
-    
-    body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #3b82f6; padding: 30px; text-align: center; border-radius: 12px 12px 0 0; }}
-        .header h1 {{ color: white; margin: 0; font-size: 24px; }}
-        .content {{ background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }}
-        .amount {{ font-size: 48px; font-weight: bold; color: #3b82f6; text-align: center; margin: 20px 0; }}
-        .info {{ background: #eff6ff; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-        .footer {{ text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>💸 Retrait effectué</h1>
-        </div>
-        <div class="content">
+            </div>"""
+
+
+def _withdrawal_details(fee_row: str, early_notice: str) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """`prepare` of a withdrawal template: net amount and fee blocks."""
+    fee_row_fragment = Fragment(fee_row)
+    notice_fragment = Fragment(_EARLY_NOTICE.replace("{text}", early_notice))
+
+    def prepare(params: Mapping[str, Any]) -> Dict[str, Any]:
+        fee = params["fee"]
+        has_fee = fee > 0
+        return {
+            "net_amount": params["amount"] - fee,
+            "fee_row": Markup(fee_row_fragment.fill(params) if has_fee else ""),
+            "early_notice": Markup(
+                notice_fragment.fill(params) if params["is_early"] and has_fee else ""
+            ),
+        }
+
+    return prepare
+
+
+_WITHDRAWAL_FR = EmailTemplate(
+    "Retrait confirmé : {net_amount:.2f} €",
+    _page(_WITHDRAWAL_CSS, "💸 Retrait effectué", """\
             <p>Bonjour {user_name},</p>
             <p class="amount">-{net_amount:.2f} €</p>
             <div class="info">
                 <p><strong>Coffre :</strong> {vault_name}</p>
                 <p><strong>Montant retiré :</strong> {amount:.2f} €</p>
-                {f"<p><strong>Frais :</strong> {fee:.2f} €</p>" if fee > 0 else ""}
+                {fee_row}
                 <p><strong>Montant net :</strong> {net_amount:.2f} €</p>
-            </div>
-            {fee_info}
-        </div>
-        <div class="footer">
-            <p>© 2025 FlexSave</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-    return subject, body
+            </div>{early_notice}""", """\
+            <p>© 2025 FlexSave</p>"""),
+    _withdrawal_details(
+        "<p><strong>Frais :</strong> {fee:.2f} €</p>",
+        "Retrait anticipé : frais de {fee:.2f} € appliqués",
+    ),
+)
 
+_WITHDRAWAL_EN = EmailTemplate(
+    "Withdrawal confirmed: €{net_amount:.2f}",
+    _page(_WITHDRAWAL_CSS, "💸 Withdrawal made", """\
+            <p>Hello {user_name},</p>
+            <p class="amount">-€{net_amount:.2f}</p>
+            <div class="info">
+                <p><strong>Vault:</strong> {vault_name}</p>
+                <p><strong>Amount withdrawn:</strong> €{amount:.2f}</p>
+                {fee_row}
+                <p><strong>Net amount:</strong> €{net_amount:.2f}</p>
+            </div>{early_notice}""", """\
+            <p>© 2025 FlexSave</p>"""),
+    _withdrawal_details(
+        "<p><strong>Fee:</strong> €{fee:.2f}</p>",
+        "Early withdrawal: a €{fee:.2f} fee was applied",
+    ),
+)
 
-def get_vault_unlocked_email(user_name: str, vault_name: str, amount: float) -> tuple[str, str]:
-    """Vault unlocked email."""
-    subject = f"🎉 Coffre débloqué : {vault_name}"
-    
-    body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #8b5cf6, #6366f1); padding: 40px; text-align: center; border-radius: 12px 12px 0 0; }}
-        .header h1 {{ color: white; margin: 0; font-size: 28px; }}
-        .content {{ background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; text-align: center; }}
-        .amount {{ font-size: 48px; font-weight: bold; color: #10B981; margin: 20px 0; }}
-        .button {{ display: inline-block; background: #10B981; color: white; padding: 14px 28px; text-decoration: none; border-radius: 8px; font-weight: 600; }}
-        .footer {{ text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🎉 Félicitations !</h1>
-        </div>
-        <div class="content">
+
+# Vault unlocked
+
+_VAULT_UNLOCKED_CSS = """\
+        .header { background: linear-gradient(135deg, #8b5cf6, #6366f1); padding: 40px; text-align: center; border-radius: 12px 12px 0 0; }
+        .header h1 { color: white; margin: 0; font-size: 28px; }
+        .content { background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; text-align: center; }
+        .amount { font-size: 48px; font-weight: bold; color: #10B981; margin: 20px 0; }
+        .button { display: inline-block; background: #10B981; color: white; padding: 14px 28px; text-decoration: none; border-radius: 8px; font-weight: 600; }
+"""
+
+_VAULT_UNLOCKED_FR = EmailTemplate(
+    "🎉 Coffre débloqué : {vault_name}",
+    _page(_VAULT_UNLOCKED_CSS, "🎉 Félicitations !", """\
             <p style="font-size: 18px; color: #374151;">Bonjour {user_name},</p>
             <p style="font-size: 20px; color: #6b7280;">Votre coffre <strong>{vault_name}</strong> est maintenant débloqué !</p>
             <p class="amount">{amount:.2f} €</p>
             <p style="color: #6b7280;">disponibles sans frais</p>
             <p style="margin-top: 30px;">
                 <a href="https://flexsave.com/dashboard/vaults" class="button">Voir mon coffre</a>
-            </p>
-        </div>
-        <div class="footer">
-            <p>© 2025 FlexSave</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-    return subject, body
+            </p>""", """\
+            <p>© 2025 FlexSave</p>"""),
+)
+
+_VAULT_UNLOCKED_EN = EmailTemplate(
+    "🎉 Vault unlocked: {vault_name}",
+    _page(_VAULT_UNLOCKED_CSS, "🎉 Congratulations!", """\
+            <p style="font-size: 18px; color: #374151;">Hello {user_name},</p>
+            <p style="font-size: 20px; color: #6b7280;">Your vault <strong>{vault_name}</strong> is now unlocked!</p>
+            <p class="amount">€{amount:.2f}</p>
+            <p style="color: #6b7280;">available with no fees</p>
+            <p style="margin-top: 30px;">
+                <a href="https://flexsave.com/dashboard/vaults" class="button">See my vault</a>
+            </p>""", """\
+            <p>© 2025 FlexSave</p>"""),
+)
+
+
+# Template name -> locale -> compiled template
+TEMPLATES: Dict[str, Dict[str, EmailTemplate]] = {
+    "welcome": {"fr": _WELCOME_FR, "en": _WELCOME_EN},
+    "deposit": {"fr": _DEPOSIT_FR, "en": _DEPOSIT_EN},
+    "withdrawal": {"fr": _WITHDRAWAL_FR, "en": _WITHDRAWAL_EN},
+    "vault_unlocked": {"fr": _VAULT_UNLOCKED_FR, "en": _VAULT_UNLOCKED_EN},
+}
+
+
+def get_template(name: str, locale: str = DEFAULT_LOCALE) -> EmailTemplate:
+    """A template's variant for `locale` (French if there is none)."""
+    variants = TEMPLATES[name]
+    return variants.get(locale) or variants[DEFAULT_LOCALE]
+
+
+def render(name: str, params: Mapping[str, Any], locale: str = DEFAULT_LOCALE) -> Tuple[str, str]:
+    """Render a template's `(subject, html)`."""
+    return get_template(name, locale).render(params)
+
+
+def render_many(messages: Iterable[Tuple[str, Mapping[str, Any], str]]) -> Iterator[Tuple[str, str]]:
+    """
+    Render `(name, params, locale)` messages lazily.
+
+    Each `(subject, html)` is produced when consumed, so a bulk job holds
+    one rendered message at a time however many it sends.
+    """
+    for name, params, locale in messages:
+        yield get_template(name, locale).render(params)
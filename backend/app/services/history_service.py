@@ -0,0 +1,179 @@
+"""
+History service: a user's deposits, withdrawals and vault events as one feed.
+"""
+
+import asyncio
+from collections import deque
+from datetime import date, datetime, time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.deposit import Deposit
+from app.models.vault import Vault
+from app.models.withdrawal import Withdrawal
+from app.repositories.deposits import deposit_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+
+# Feed entry types, in composite cursor order
+DEPOSIT = "deposit"
+WITHDRAWAL = "withdrawal"
+VAULT_CREATED = "vault_created"
+VAULT_UNLOCKED = "vault_unlocked"
+VAULT_CLOSED = "vault_closed"
+SOURCES = (DEPOSIT, WITHDRAWAL, VAULT_CREATED, VAULT_UNLOCKED, VAULT_CLOSED)
+
+HistoryItem = Deposit | Withdrawal | Vault
+
+Fetch = Callable[[int, Optional[Sequence[Any]]], Awaitable[List[HistoryItem]]]
+
+
+def occurred_at(kind: str, item: HistoryItem) -> datetime:
+    """When a feed entry happened (the field its source is ordered by)."""
+    if kind == VAULT_UNLOCKED:
+        return datetime.combine(item.unlock_date, time.min)
+    if kind == VAULT_CLOSED:
+        return item.closed_at
+    return item.created_at
+
+
+def _position(kind: str, item: HistoryItem) -> List[str]:
+    """`start_after` values resuming a source after `item`."""
+    if kind == VAULT_UNLOCKED:
+        return [item.unlock_date.isoformat(), item.id]
+    return [occurred_at(kind, item).isoformat(), item.id]
+
+
+class _Source:
+    """One ordered query of the feed, read a chunk at a time."""
+
+    def __init__(self, kind: str, fetch: Fetch, position: Optional[List[str]]):
+        self.kind = kind
+        self._fetch = fetch
+        self._position = position
+        self.buffer: Deque[HistoryItem] = deque()
+        self.exhausted = False
+
+    @property
+    def pending(self) -> bool:
+        """Whether the source may still have entries to merge."""
+        return bool(self.buffer) or not self.exhausted
+
+    def head_key(self) -> Tuple[datetime, str]:
+        head = self.buffer[0]
+        return occurred_at(self.kind, head), head.id
+
+    async def fill(self, size: int) -> None:
+        """Read the next `size` entries (fewer means the source is exhausted)."""
+        items = await self._fetch(size, self._position)
+        self.buffer.extend(items)
+        self.exhausted = len(items) < size
+        if items:
+            self._position = _position(self.kind, items[-1])
+
+
+class HistoryService:
+    """Service for the unified transaction history."""
+
+    @staticmethod
+    def _decode(cursor: Optional[str]) -> List[Optional[List[Any]]]:
+        if not cursor:
+            return [None] * len(SOURCES)
+
+        positions = decode_cursor(cursor, len(SOURCES))
+        for position in positions:
+            if position is not None and (
+                not isinstance(position, list)
+                or len(position) != 2
+                or not all(isinstance(v, str) for v in position)
+            ):
+                raise ValueError("Invalid cursor")
+        return positions
+
+    async def get_history(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        today: Optional[date] = None,
+    ) -> Tuple[List[Tuple[str, HistoryItem]], Optional[str]]:
+        """
+        Get a page of a user's history, newest first.
+
+        Each source (deposits, withdrawals, vault creations, unlocks and
+        closures) is an ordered query resuming after its own position in
+        the composite cursor; the results are k-way merged. The sources
+        first read their share of the page, then a source that runs out
+        while it may still hold newer entries reads its share of what the
+        page still lacks. A page reads at most a few documents per source
+        beyond the `limit + 1` it needs, however deep it is.
+
+        Args:
+            user_id: The user
+            limit: Page size
+            cursor: `next_cursor` of the previous page
+            today: Vaults unlocked by this day are in the feed (default: today)
+
+        Returns:
+            The page as `(type, item)` pairs and the cursor of the next
+            page (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        positions = self._decode(cursor)
+        today = today or date.today()
+        fetches: Tuple[Fetch, ...] = (
+            lambda n, after: deposit_repository.list_for_user(user_id, limit=n, start_after=after),
+            lambda n, after: withdrawal_repository.list_for_user(user_id, limit=n, start_after=after),
+            lambda n, after: vault_repository.list_for_user(user_id, limit=n, start_after=after),
+            lambda n, after: vault_repository.list_unlocked_for_user(user_id, today, limit=n, start_after=after),
+            lambda n, after: vault_repository.list_closed_for_user(user_id, limit=n, start_after=after),
+        )
+        sources = [
+            _Source(kind, fetch, position)
+            for kind, fetch, position in zip(SOURCES, fetches, positions, strict=True)
+        ]
+
+        # One more entry than the page tells whether there is a next page
+        wanted = limit + 1
+        share = -(-wanted // len(sources))
+        await asyncio.gather(*(source.fill(share) for source in sources))
+
+        merged: List[Tuple[str, HistoryItem]] = []
+        while len(merged) < wanted:
+            # A source can only be merged from while it has a head
+            empty = [s for s in sources if not s.buffer and not s.exhausted]
+            if empty:
+                pending = sum(s.pending for s in sources)
+                share = -(-(wanted - len(merged)) // pending)
+                await asyncio.gather(*(source.fill(share) for source in empty))
+                continue
+
+            heads = [s for s in sources if s.buffer]
+            if not heads:
+                break
+            newest = max(heads, key=_Source.head_key)
+            merged.append((newest.kind, newest.buffer.popleft()))
+
+        page = merged[:limit]
+        if len(merged) <= limit:
+            return page, None
+
+        # Each source resumes after the last of its items on this page
+        for kind, item in page:
+            positions[SOURCES.index(kind)] = _position(kind, item)
+
+        return page, encode_cursor(positions)
+
+
+history_service = HistoryService()
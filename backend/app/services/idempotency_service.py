@@ -0,0 +1,146 @@
+"""
+Idempotency service: replay the result of retried requests.
+
+A client sends the same `Idempotency-Key` header when it retries a request.
+The first request stores its result in the `idempotency_keys` collection, in
+the same batch or transaction as the write it guards, so the record exists
+if and only if the write happened. Retries find the record (in the
+in-process LRU first) and get the same result back without touching the
+vault again.
+
+Records carry an `expires_at` timestamp for a Firestore TTL policy on the
+collection; they keep replaying until Firestore deletes them.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.storage import WriteBatch, get_store
+
+COLLECTION = "idempotency_keys"
+
+T = TypeVar("T")
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when a key is sent again with different request parameters."""
+
+
+@dataclass(frozen=True)
+class IdempotentRequest:
+    """A request carrying an `Idempotency-Key`."""
+    key_id: str
+    fingerprint: str
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """Service for idempotency records."""
+
+    def __init__(self):
+        self._cache: LRUCache[Dict[str, Any]] = LRUCache(
+            settings.IDEMPOTENCY_CACHE_SIZE,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+            clock=time.monotonic,
+        )
+
+    @staticmethod
+    def request(
+        user_id: str,
+        key: Optional[str],
+        operation: str,
+        **params: Any,
+    ) -> Optional[IdempotentRequest]:
+        """
+        Describe an idempotent request.
+
+        Args:
+            user_id: The caller; keys are scoped per user
+            key: The `Idempotency-Key` header (None when absent)
+            operation: Name of the guarded operation
+            **params: The operation's parameters
+
+        Returns:
+            The request, or None if no key was sent
+        """
+        if not key:
+            return None
+
+        payload = json.dumps({"operation": operation, **params}, sort_keys=True, default=str)
+        return IdempotentRequest(
+            key_id=_digest(f"{user_id}:{key}"),
+            fingerprint=_digest(payload),
+        )
+
+    async def lookup(self, request: IdempotentRequest, model: Type[T]) -> Optional[T]:
+        """
+        Get the stored result of an earlier request with the same key.
+
+        Args:
+            request: The request
+            model: Model class of the result
+
+        Returns:
+            The result, or None if the key has not been used
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used for other parameters
+        """
+        record = self._cache.get(request.key_id)
+        if record is None:
+            record = await get_store().get(COLLECTION, request.key_id)
+            if record is None:
+                return None
+            self._cache.set(request.key_id, record)
+
+        if record["fingerprint"] != request.fingerprint:
+            raise IdempotencyKeyReusedError(
+                "Idempotency-Key already used for a different request"
+            )
+
+        return model.from_dict(record["result_id"], record["result"])
+
+    def stage(self, batch: WriteBatch, request: IdempotentRequest, result: Any) -> None:
+        """
+        Stage the record of a request's result in the batch making the change.
+
+        If another request with the same key commits first, the commit fails
+        with `DocumentExistsError` and nothing in the batch is applied.
+        """
+        now = datetime.now(UTC)
+        record = {
+            "fingerprint": request.fingerprint,
+            "result_id": result.id,
+            "result": result.to_dict(),
+            "created_at": now.isoformat(),
+            "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        }
+        batch.create(COLLECTION, request.key_id, record)
+
+    def remember(self, request: IdempotentRequest, result: Any) -> None:
+        """Cache the result of a committed request for replays on this instance."""
+        self._cache.set(request.key_id, {
+            "fingerprint": request.fingerprint,
+            "result_id": result.id,
+            "result": result.to_dict(),
+        })
+
+    def clear_cache(self) -> None:
+        """Drop every cached record."""
+        self._cache.clear()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Record cache size and hit/miss counters."""
+        return self._cache.stats()
+
+
+idempotency_service = IdempotencyService()
@@ -2,17 +2,17 @@
 Notification service for push notifications.
 """
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
-from app.core.firebase import get_firestore_client
+from app.models.notification import Notification
+from app.repositories.notifications import notification_repository
+from app.storage import WriteBatch
 
 
 class NotificationService:
     """Service for managing notifications."""
     
-    COLLECTION = "notifications"
-    
     async def create(
         self,
         user_id: str,
@@ -20,75 +20,63 @@ class NotificationService:
         body: str,
         notification_type: str = "info",  # info, success, warning, action
         action_url: Optional[str] = None,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
     ) -> str:
-        """Create a notification for a user."""
-        db = get_firestore_client()
+        """
+        Create a notification for a user.
         
-        notification = {
-            "user_id": user_id,
-            "title": title,
-            "body": body,
-            "type": notification_type,
-            "action_url": action_url,
-            "is_read": False,
-            "created_at": datetime.utcnow().isoformat(),
-        }
+        With a `batch`, the write is staged in it. With a deterministic
+        `notification_id`, the notification is created at most once: the
+        commit fails with `DocumentExistsError` if it already exists.
+        """
+        notification = Notification(
+            id=notification_id or "",
+            user_id=user_id,
+            title=title,
+            body=body,
+            type=notification_type,
+            action_url=action_url,
+        )
         
-        doc_ref = db.collection(self.COLLECTION).document()
-        doc_ref.set(notification)
+        if notification_id:
+            await notification_repository.create(notification, batch)
+        else:
+            await notification_repository.add(notification, batch)
         
-        return doc_ref.id
+        return notification.id
     
     async def get_user_notifications(
         self,
         user_id: str,
         unread_only: bool = False,
         limit: int = 20,
-    ) -> list:
+    ) -> List[Notification]:
         """Get notifications for a user."""
-        db = get_firestore_client()
-        
-        query = db.collection(self.COLLECTION)\
-            .where("user_id", "==", user_id)\
-            .order_by("created_at", direction="DESCENDING")
-        
-        if unread_only:
-            query = query.where("is_read", "==", False)
-        
-        query = query.limit(limit)
-        
-        notifications = []
-        for doc in query.stream():
-            data = doc.to_dict()
-            data["id"] = doc.id
-            notifications.append(data)
-        
-        return notifications
+        return await notification_repository.list_for_user(user_id, unread_only, limit)
     
     async def mark_as_read(self, notification_id: str) -> None:
         """Mark a notification as read."""
-        db = get_firestore_client()
-        db.collection(self.COLLECTION).document(notification_id).update({
-            "is_read": True,
-            "read_at": datetime.utcnow().isoformat(),
-        })
+        await notification_repository.update(
+            notification_id,
+            is_read=True,
+            read_at=datetime.utcnow().isoformat(),
+        )
     
     async def mark_all_as_read(self, user_id: str) -> None:
         """Mark all notifications as read for a user."""
-        db = get_firestore_client()
-        notifications = db.collection(self.COLLECTION)\
-            .where("user_id", "==", user_id)\
-            .where("is_read", "==", False)\
-            .stream()
-        
-        for doc in notifications:
-            doc.reference.update({
-                "is_read": True,
-                "read_at": datetime.utcnow().isoformat(),
-            })
+        for notification_id in await notification_repository.list_unread_ids(user_id):
+            await self.mark_as_read(notification_id)
     
     # Predefined notifications
-    async def notify_deposit(self, user_id: str, vault_name: str, amount: float) -> str:
+    async def notify_deposit(
+        self,
+        user_id: str,
+        vault_name: str,
+        amount: float,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
         """Notify user of a successful deposit."""
         return await self.create(
             user_id=user_id,
@@ -96,9 +84,19 @@ class NotificationService:
             body=f"{amount:.2f} € ajouté à votre coffre {vault_name}",
             notification_type="success",
             action_url="/dashboard/vaults",
+            batch=batch,
+            notification_id=notification_id,
         )
     
-    async def notify_withdrawal(self, user_id: str, vault_name: str, amount: float, fee: float = 0) -> str:
+    async def notify_withdrawal(
+        self,
+        user_id: str,
+        vault_name: str,
+        amount: float,
+        fee: float = 0,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
         """Notify user of a withdrawal."""
         body = f"Retrait de {amount:.2f} € depuis {vault_name}"
         if fee > 0:
@@ -109,9 +107,17 @@ class NotificationService:
             title="Retrait effectué",
             body=body,
             notification_type="info",
+            batch=batch,
+            notification_id=notification_id,
         )
     
-    async def notify_vault_unlocked(self, user_id: str, vault_name: str) -> str:
+    async def notify_vault_unlocked(
+        self,
+        user_id: str,
+        vault_name: str,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
         """Notify user when a vault is unlocked."""
         return await self.create(
             user_id=user_id,
@@ -119,6 +125,8 @@ class NotificationService:
             body=f"Votre coffre {vault_name} est maintenant disponible",
             notification_type="success",
             action_url="/dashboard/vaults",
+            batch=batch,
+            notification_id=notification_id,
         )
     
     async def notify_goal_reached(self, user_id: str, vault_name: str) -> str:
@@ -131,7 +139,13 @@ class NotificationService:
             action_url="/dashboard/vaults",
         )
     
-    async def notify_encouragement(self, user_id: str, days_since_deposit: int) -> str:
+    async def notify_encouragement(
+        self,
+        user_id: str,
+        days_since_deposit: int,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
         """Send encouragement notification."""
         return await self.create(
             user_id=user_id,
@@ -139,6 +153,73 @@ class NotificationService:
             body=f"Il y a {days_since_deposit} jours que vous n'avez pas épargné. Même un petit montant compte !",
             notification_type="action",
             action_url="/dashboard/vaults",
+            batch=batch,
+            notification_id=notification_id,
+        )
+
+    async def notify_payment_succeeded(
+        self,
+        user_id: str,
+        amount: float,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
+        """Notify user of an accepted payment."""
+        return await self.create(
+            user_id=user_id,
+            title="Paiement réussi ✅",
+            body=f"Votre paiement de {amount:.2f} € a été accepté",
+            notification_type="success",
+            batch=batch,
+            notification_id=notification_id,
+        )
+    
+    async def notify_payment_failed(
+        self,
+        user_id: str,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
+        """Notify user of a failed payment."""
+        return await self.create(
+            user_id=user_id,
+            title="Paiement échoué ❌",
+            body="Votre paiement n'a pas abouti. Veuillez réessayer.",
+            notification_type="warning",
+            batch=batch,
+            notification_id=notification_id,
+        )
+    
+    async def notify_premium_started(
+        self,
+        user_id: str,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
+        """Welcome user to Premium."""
+        return await self.create(
+            user_id=user_id,
+            title="Bienvenue Premium ! 🌟",
+            body="Profitez de frais réduits et de fonctionnalités exclusives",
+            notification_type="success",
+            batch=batch,
+            notification_id=notification_id,
+        )
+    
+    async def notify_premium_ended(
+        self,
+        user_id: str,
+        batch: Optional[WriteBatch] = None,
+        notification_id: Optional[str] = None,
+    ) -> str:
+        """Notify user that their Premium subscription ended."""
+        return await self.create(
+            user_id=user_id,
+            title="Abonnement terminé",
+            body="Votre abonnement Premium a pris fin",
+            notification_type="info",
+            batch=batch,
+            notification_id=notification_id,
         )
 
 
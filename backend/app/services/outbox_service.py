@@ -0,0 +1,338 @@
+"""
+Transactional outbox.
+
+A change with side effects (notifications, discipline score, emails) does
+not carry them out on the request path: it stages an `OutboxEntry` in the
+batch or transaction of the change itself (see `OutboxService.stage`), so
+the request only waits for that one commit and the side effects are
+recorded if and only if the change is.
+
+`drain`, run in the background on every instance, claims due entries with
+a lease (like queued emails) and carries them out per user, in one
+transaction per user: the user and the entries are re-read, each entry's
+handler stages its effects, the score change is written once and the
+entries are deleted in the same commit. An entry whose instance died is
+claimed again once its lease expires, so effects happen at least once; an
+entry already carried out is gone when re-read, and notifications and
+emails have IDs derived from the entry, so they are never duplicated.
+"""
+
+import asyncio
+import dataclasses
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.outbox import OutboxEntry
+from app.models.user import User
+from app.repositories.outbox import outbox_dead_letter_repository, outbox_repository
+from app.repositories.users import user_repository
+from app.services.email_service import email_service
+from app.services.notification_service import notification_service
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.storage import (
+    DocumentExistsError,
+    DocumentNotFoundError,
+    Transaction,
+    WriteBatch,
+    get_store,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entry kinds, each carried out by the handler of the same name
+DEPOSIT = "deposit"
+REWARD = "reward"  # Discipline score change only
+WITHDRAWAL = "withdrawal"
+PAYMENT_SUCCEEDED = "payment_succeeded"
+PAYMENT_FAILED = "payment_failed"
+PREMIUM_STARTED = "premium_started"
+PREMIUM_ENDED = "premium_ended"
+
+# Outcomes of a claimed entry, as counted by `drain`
+DONE = "done"
+DUPLICATE = "duplicate"  # Already carried out (by another instance or event)
+RETRIED = "retried"
+DEAD_LETTERED = "dead_lettered"
+
+# Entries claimed per batched write (2 writes each, under Firestore's 500)
+MAX_CLAIMS = 250
+
+# Entries carried out per transaction: at most 3 writes each (delete,
+# notification, email) plus the user and counters, under Firestore's 500
+MAX_ENTRIES_PER_COMMIT = 150
+
+Handler = Callable[[Transaction, OutboxEntry, User], Awaitable[None]]
+
+
+def effect_id(entry: OutboxEntry) -> str:
+    """ID of the notification and email created for an entry."""
+    return f"outbox-{entry.id}"
+
+
+class OutboxService:
+    """Service staging and carrying out side effects."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {
+            DEPOSIT: self._on_deposit,
+            REWARD: self._on_reward,
+            WITHDRAWAL: self._on_withdrawal,
+            PAYMENT_SUCCEEDED: self._on_payment_succeeded,
+            PAYMENT_FAILED: self._on_payment_failed,
+            PREMIUM_STARTED: self._on_premium_started,
+            PREMIUM_ENDED: self._on_premium_ended,
+        }
+
+    async def stage(
+        self,
+        batch: WriteBatch,
+        kind: str,
+        user_id: str,
+        entry_id: Optional[str] = None,
+        **payload: Any,
+    ) -> OutboxEntry:
+        """
+        Stage a side effect in the batch (or transaction) of its change.
+
+        Args:
+            batch: The batch committing the change
+            kind: One of the entry kinds of this module
+            user_id: The user the effect is for
+            entry_id: Deterministic ID: the entry is then staged at most
+                once (the commit fails with `DocumentExistsError`)
+            payload: The handler's arguments (JSON-serializable)
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown outbox entry kind: {kind}")
+        entry = OutboxEntry(id=entry_id or "", kind=kind, user_id=user_id, payload=payload)
+
+        if entry_id:
+            return await outbox_repository.create(entry, batch)
+        return await outbox_repository.add(entry, batch)
+
+    async def drain(
+        self,
+        now: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Carry out every entry due at `now`.
+
+        Entries are claimed `batch_size` at a time and their users
+        processed `concurrency` at a time, until no due entry is left.
+
+        Returns:
+            The number of entries per outcome
+        """
+        batch_size = min(batch_size or settings.OUTBOX_BATCH_SIZE, MAX_CLAIMS)
+        semaphore = asyncio.Semaphore(concurrency or settings.OUTBOX_CONCURRENCY)
+
+        async def _bounded(user_id: str, entries: List[OutboxEntry]) -> List[str]:
+            async with semaphore:
+                return await self._execute(user_id, entries)
+
+        outcomes: Counter = Counter()
+        while True:
+            listed, claimed = await self._claim(now or datetime.utcnow(), batch_size)
+            groups: Dict[str, List[OutboxEntry]] = defaultdict(list)
+            for entry in claimed:
+                groups[entry.user_id].append(entry)
+            chunks = [
+                (user_id, entries[i:i + MAX_ENTRIES_PER_COMMIT])
+                for user_id, entries in groups.items()
+                for i in range(0, len(entries), MAX_ENTRIES_PER_COMMIT)
+            ]
+            for result in await asyncio.gather(*(_bounded(*chunk) for chunk in chunks)):
+                outcomes.update(result)
+            if listed < batch_size:
+                break
+
+        return dict(outcomes)
+
+    async def _claim(self, now: datetime, limit: int) -> tuple[int, List[OutboxEntry]]:
+        """Lease up to `limit` due entries; return how many were due and the claimed ones."""
+        lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        due = await outbox_repository.list_due(limit, now)
+        if not due:
+            return 0, []
+
+        store = get_store()
+        batch = store.batch()
+        for entry in due:
+            outbox_repository.stage_claim(batch, entry, lease_until)
+        try:
+            await batch.commit()
+            return len(due), due
+        except (DocumentExistsError, DocumentNotFoundError):
+            pass
+
+        # Another instance claimed (or already carried out and deleted) some
+        # of these first: claim one by one
+        claimed = []
+        for entry in due:
+            batch = store.batch()
+            outbox_repository.stage_claim(batch, entry, lease_until)
+            try:
+                await batch.commit()
+            except (DocumentExistsError, DocumentNotFoundError):
+                continue
+            claimed.append(entry)
+        return len(due), claimed
+
+    async def _execute(self, user_id: str, entries: List[OutboxEntry]) -> List[str]:
+        """Carry out a user's entries in one transaction; return their outcomes."""
+        try:
+            outcomes = await get_store().run_transaction(
+                lambda transaction: self._apply(transaction, user_id, entries)
+            )
+        except Exception as e:
+            if len(entries) == 1:
+                return [await self._failed(entries[0], e)]
+            # Carry them out one by one, so one bad entry holds up no other
+            return [outcome for entry in entries for outcome in await self._execute(user_id, [entry])]
+
+        user_service.invalidate(user_id)
+        return outcomes
+
+    async def _apply(self, transaction: Transaction, user_id: str, entries: List[OutboxEntry]) -> List[str]:
+        """Stage the effects of entries still in the outbox; return their outcomes."""
+        user = await user_repository.get(user_id, transaction)
+        pending = [await outbox_repository.get(entry.id, transaction) for entry in entries]
+
+        score = user.discipline_score if user else 0
+        outcomes = []
+        for entry in pending:
+            if entry is None:
+                outcomes.append(DUPLICATE)
+                continue
+            if user:
+                await self._handlers[entry.kind](transaction, entry, user)
+            await outbox_repository.delete(entry.id, transaction)
+            outcomes.append(DONE)
+
+        if user and user.discipline_score != score:
+            await user_repository.update(
+                user_id,
+                transaction,
+                discipline_score=user.discipline_score,
+                updated_at=datetime.utcnow().isoformat(),
+            )
+            await stats_service.increment(
+                transaction, discipline_score_sum=user.discipline_score - score
+            )
+        return outcomes
+
+    async def _failed(self, entry: OutboxEntry, error: Exception) -> str:
+        """Retry or dead-letter an entry that could not be carried out; return its outcome."""
+        if isinstance(error, DocumentExistsError):
+            # Its notification or email exists: carried out under this ID before
+            await outbox_repository.delete(entry.id)
+            return DUPLICATE
+
+        attempts = entry.attempts + 1
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            logger.error("Outbox entry %s (%s) dead-lettered: %s", entry.id, entry.kind, error)
+            batch = get_store().batch()
+            await outbox_dead_letter_repository.save(
+                dataclasses.replace(entry, attempts=attempts, error=repr(error)), batch
+            )
+            await outbox_repository.delete(entry.id, batch)
+            await batch.commit()
+            return DEAD_LETTERED
+
+        logger.warning("Outbox entry %s (%s) failed: %s", entry.id, entry.kind, error)
+        backoff = settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+        await outbox_repository.update(
+            entry.id,
+            attempts=attempts,
+            error=repr(error),
+            available_at=(datetime.utcnow() + timedelta(seconds=backoff)).isoformat(),
+        )
+        return RETRIED
+
+    async def run_scheduled(self) -> Dict[str, int]:
+        """Drain the outbox and log the outcome (background task)."""
+        outcomes = await self.drain()
+        if outcomes.keys() - {DONE}:  # Routine drains are not worth a log line
+            logger.info("Outbox: %s", outcomes)
+        return outcomes
+
+    # Handlers: stage an entry's effects for its already-loaded user, whose
+    # in-memory discipline score they may change
+    async def _on_deposit(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        await self._on_reward(transaction, entry, user)
+        if not user.notification_enabled:
+            return
+        p = entry.payload
+        await notification_service.notify_deposit(
+            user.id, p["vault_name"], p["amount"], transaction, notification_id=effect_id(entry)
+        )
+        await email_service.queue(
+            user.email,
+            "deposit",
+            {
+                "user_name": user.full_name,
+                "vault_name": p["vault_name"],
+                "amount": p["amount"],
+                "new_total": p["new_total"],
+            },
+            user.locale,
+            transaction,
+            email_id=effect_id(entry),
+        )
+
+    async def _on_reward(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        user.discipline_score = user_service.discipline_score_after(
+            user, entry.payload.get("score_delta", 0)
+        )
+
+    async def _on_withdrawal(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        await self._on_reward(transaction, entry, user)
+        if not user.notification_enabled:
+            return
+        p = entry.payload
+        await notification_service.notify_withdrawal(
+            user.id, p["vault_name"], p["amount"], p["fee"], transaction, notification_id=effect_id(entry)
+        )
+        await email_service.queue(
+            user.email,
+            "withdrawal",
+            {
+                "user_name": user.full_name,
+                "vault_name": p["vault_name"],
+                "amount": p["amount"],
+                "fee": p["fee"],
+                "is_early": p["is_early"],
+            },
+            user.locale,
+            transaction,
+            email_id=effect_id(entry),
+        )
+
+    async def _on_payment_succeeded(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        await notification_service.notify_payment_succeeded(
+            user.id, entry.payload["amount"], transaction, notification_id=effect_id(entry)
+        )
+
+    async def _on_payment_failed(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        await notification_service.notify_payment_failed(
+            user.id, transaction, notification_id=effect_id(entry)
+        )
+
+    async def _on_premium_started(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        await notification_service.notify_premium_started(
+            user.id, transaction, notification_id=effect_id(entry)
+        )
+
+    async def _on_premium_ended(self, transaction: Transaction, entry: OutboxEntry, user: User) -> None:
+        await notification_service.notify_premium_ended(
+            user.id, transaction, notification_id=effect_id(entry)
+        )
+
+
+outbox_service = OutboxService()
@@ -0,0 +1,168 @@
+"""
+Recurring deposit scheduler.
+
+Schedules are stored in `deposit_schedules` with the time of their next run.
+`run_due` pages through the due ones on the `(is_active, next_run_at)` index
+and runs each in its own transaction: the schedule is re-read, its deposit
+is made through `VaultService.deposit` and `next_run_at` is advanced in the
+same commit. An instance that loses the race sees `next_run_at` changed and
+skips it, so several instances can run the scheduler without depositing
+twice.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.models.deposit import DepositSource
+from app.models.schedule import DepositSchedule, ScheduleFrequency
+from app.models.vault import Vault
+from app.repositories.schedules import schedule_repository
+from app.repositories.vaults import vault_repository
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.storage import Transaction, get_store
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of a due schedule, as counted by `run_due`
+DEPOSITED = "deposited"
+SKIPPED = "skipped"  # Already run by another instance
+CANCELLED = "cancelled"  # Vault closed or gone: the schedule is deactivated
+FAILED = "failed"
+
+
+class ScheduleService:
+    """Service for recurring deposit schedules."""
+
+    async def create(
+        self,
+        vault: Vault,
+        amount: float,
+        frequency: ScheduleFrequency,
+        start_date: Optional[date] = None,
+    ) -> DepositSchedule:
+        """
+        Schedule a recurring deposit into an already-loaded vault.
+
+        The first deposit runs on `start_date` (default: today), then every
+        week or every month on the same day.
+
+        Raises:
+            ValueError: If the vault is closed or the start date is past
+        """
+        start_date = start_date or date.today()
+        if not vault.is_active:
+            raise ValueError("Vault is closed")
+        if start_date < date.today():
+            raise ValueError("Start date is in the past")
+
+        schedule = DepositSchedule(
+            user_id=vault.user_id,
+            vault_id=vault.id,
+            amount=amount,
+            frequency=frequency,
+            day_of_month=start_date.day,
+            next_run_at=datetime.combine(start_date, time()),
+        )
+        return await schedule_repository.add(schedule)
+
+    async def get_by_id(self, schedule_id: str) -> Optional[DepositSchedule]:
+        """Get a schedule by ID."""
+        return await schedule_repository.get(schedule_id)
+
+    async def get_user_schedules(self, user_id: str) -> List[DepositSchedule]:
+        """Get a user's active schedules."""
+        return await schedule_repository.list_for_user(user_id)
+
+    async def cancel(self, schedule: DepositSchedule) -> None:
+        """Stop an already-loaded schedule."""
+        await schedule_repository.update(
+            schedule.id,
+            is_active=False,
+            updated_at=datetime.utcnow().isoformat(),
+        )
+
+    async def run_due(
+        self,
+        now: Optional[datetime] = None,
+        page_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Run every schedule due at `now`.
+
+        Due schedules are read `page_size` at a time (resuming after the
+        last one of the previous page), so memory stays bounded however
+        many are due, and each page is run `concurrency` at a time.
+
+        Returns:
+            The number of schedules per outcome
+        """
+        now = now or datetime.utcnow()
+        page_size = page_size or settings.SCHEDULER_PAGE_SIZE
+        semaphore = asyncio.Semaphore(concurrency or settings.SCHEDULER_CONCURRENCY)
+
+        async def _bounded(schedule: DepositSchedule) -> str:
+            async with semaphore:
+                return await self._run_one(schedule, now)
+
+        outcomes: Counter = Counter()
+        start_after = None
+        while True:
+            page = await schedule_repository.list_due(now, page_size, start_after)
+            outcomes.update(await asyncio.gather(*(_bounded(s) for s in page)))
+            if len(page) < page_size:
+                break
+            start_after = (page[-1].next_run_at.isoformat(), page[-1].id)
+
+        return dict(outcomes)
+
+    async def _run_one(self, schedule: DepositSchedule, now: datetime) -> str:
+        """Run one due schedule in a transaction; return its outcome."""
+        async def _run(transaction: Transaction) -> str:
+            current = await schedule_repository.get(schedule.id, transaction)
+            if not current or not current.is_active or current.next_run_at != schedule.next_run_at:
+                return SKIPPED
+
+            vault = await vault_repository.get(current.vault_id, transaction)
+            if not vault or not vault.is_active or vault.user_id != current.user_id:
+                await schedule_repository.update(
+                    current.id, transaction, is_active=False, updated_at=now.isoformat()
+                )
+                return CANCELLED
+
+            await vault_service.deposit(
+                vault, current.amount, DepositSource.SCHEDULED, batch=transaction
+            )
+            await schedule_repository.update(
+                current.id,
+                transaction,
+                next_run_at=current.next_run_after(now).isoformat(),
+                last_run_at=now.isoformat(),
+                updated_at=now.isoformat(),
+            )
+            return DEPOSITED
+
+        try:
+            outcome = await get_store().run_transaction(_run)
+        except Exception:
+            logger.exception("Scheduled deposit %s failed", schedule.id)
+            return FAILED
+
+        if outcome == DEPOSITED:
+            user_service.invalidate(schedule.user_id)
+        return outcome
+
+    async def run_scheduled(self) -> Dict[str, int]:
+        """Run the due schedules and log the outcome (background task)."""
+        outcomes = await self.run_due()
+        if outcomes:
+            logger.info("Recurring deposits: %s", outcomes)
+        return outcomes
+
+
+schedule_service = ScheduleService()
@@ -0,0 +1,123 @@
+"""
+Platform statistics service.
+
+Platform-wide counters are maintained incrementally: every mutation that
+changes them adds an `Increment` to one randomly chosen shard document, in
+the same batch as the mutation itself. Spreading writes over
+`STATS_COUNTER_SHARDS` documents keeps each shard under Firestore's
+sustained write rate per document.
+"""
+
+import asyncio
+import random
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.repositories.platform_stats import platform_stats_repository
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.storage import WriteBatch
+
+COUNTERS = (
+    "total_users",
+    "active_users",
+    "premium_users",
+    "discipline_score_sum",
+    "total_vaults",
+    "active_vaults",
+    "total_saved",
+    "total_withdrawals",
+    "total_withdrawn",
+)
+
+
+class PlatformStatsService:
+    """Service for the sharded platform counters."""
+
+    def _shard_id(self, index: int) -> str:
+        return f"shard_{index}"
+
+    async def increment(self, batch: Optional[WriteBatch] = None, **deltas: float) -> None:
+        """
+        Add deltas to the platform counters.
+
+        With `batch`, the increment is staged and committed together with
+        the caller's own writes.
+        """
+        unknown = set(deltas) - set(COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown counters: {', '.join(sorted(unknown))}")
+
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        shard = self._shard_id(random.randrange(settings.STATS_COUNTER_SHARDS))
+        await platform_stats_repository.increment(shard, deltas, batch)
+
+    async def get_totals(self) -> Dict[str, float]:
+        """Sum the counters over every shard."""
+        totals = dict.fromkeys(COUNTERS, 0)
+        for shard in await platform_stats_repository.list_shards():
+            for name in COUNTERS:
+                totals[name] += shard.get(name, 0)
+        return totals
+
+    async def compute(self) -> Dict[str, float]:
+        """
+        Compute the counters from the source collections.
+
+        Uses concurrent server-side aggregation queries; this is the
+        reference the incremental counters are reconciled against.
+        """
+        users, active_users, premium_users, vaults, active_vaults, withdrawals = await asyncio.gather(
+            user_repository.aggregate([
+                ("total", "count", None),
+                ("discipline_score_sum", "sum", "discipline_score"),
+            ]),
+            user_repository.count([("is_active", "==", True)]),
+            user_repository.count([("is_premium", "==", True)]),
+            vault_repository.aggregate([
+                ("total", "count", None),
+                ("total_saved", "sum", "current_amount"),
+            ]),
+            vault_repository.count([("is_active", "==", True)]),
+            withdrawal_repository.aggregate([
+                ("total", "count", None),
+                ("total_withdrawn", "sum", "amount"),
+            ]),
+        )
+
+        return {
+            "total_users": int(users["total"]),
+            "active_users": active_users,
+            "premium_users": premium_users,
+            "discipline_score_sum": users["discipline_score_sum"] or 0,
+            "total_vaults": int(vaults["total"]),
+            "active_vaults": active_vaults,
+            "total_saved": vaults["total_saved"] or 0,
+            "total_withdrawals": int(withdrawals["total"]),
+            "total_withdrawn": withdrawals["total_withdrawn"] or 0,
+        }
+
+    async def rebuild(self) -> Dict[str, float]:
+        """
+        Rebuild the counters from scratch.
+
+        Writes the computed totals to the first shard and zeroes the others.
+        Mutations committed while the rebuild runs may be counted twice or
+        not at all, so run it when traffic is low.
+        """
+        totals = await self.compute()
+        zero = dict.fromkeys(COUNTERS, 0)
+
+        shards = {self._shard_id(0): totals}
+        for index in range(1, settings.STATS_COUNTER_SHARDS):
+            shards[self._shard_id(index)] = zero
+        await platform_stats_repository.replace(shards)
+
+        return totals
+
+
+stats_service = PlatformStatsService()
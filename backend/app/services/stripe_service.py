@@ -2,9 +2,11 @@
 Stripe Treasury service for managing financial operations.
 """
 
-import stripe
+import asyncio
 from typing import Optional
 
+import stripe
+
 from app.core.config import settings
 
 # Initialize Stripe
@@ -15,12 +17,26 @@ class StripeService:
     """Service for Stripe Treasury operations."""
     
     @staticmethod
-    async def create_customer(email: str, name: str) -> str:
-        """Create a Stripe customer."""
-        customer = stripe.Customer.create(
+    async def create_customer(email: str, name: str, user_id: Optional[str] = None) -> str:
+        """
+        Create a Stripe customer.
+        
+        With `user_id`, the request is idempotent per user: concurrent or
+        retried calls within 24 hours return the same customer.
+        """
+        metadata = {"app": "flexsave"}
+        options = {}
+        if user_id:
+            metadata["user_id"] = user_id
+            options["idempotency_key"] = f"customer-{user_id}"
+        
+        # The Stripe client blocks: call it off the event loop
+        customer = await asyncio.to_thread(
+            stripe.Customer.create,
             email=email,
             name=name,
-            metadata={"app": "flexsave"}
+            metadata=metadata,
+            **options,
         )
         return customer.id
     
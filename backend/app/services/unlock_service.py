@@ -0,0 +1,131 @@
+"""
+Vault unlock announcements.
+
+`sweep` pages through the active vaults not announced yet whose
+`unlock_date` fell in the last `UNLOCK_SWEEP_LOOKBACK_DAYS` days, on the
+`(is_active, unlock_notified_at, unlock_date)` index: an announced vault is
+not read again. Each one gets, in one batched write with its neighbours:
+`unlock_notified_at` set, an in-app notification and a queued email. The notification and the email have IDs derived from the vault and
+are created, never overwritten, so an instance that loses the race to
+another has its batch rejected and announces nothing twice.
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.vault import Vault
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.services.email_service import email_service
+from app.services.notification_service import notification_service
+from app.storage import DocumentExistsError, WriteBatch, get_store
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of an unlocked vault, as counted by `sweep`
+ANNOUNCED = "announced"
+MUTED = "muted"  # Owner turned notifications off: marked, not announced
+SKIPPED = "skipped"  # Already announced by another instance
+
+# Vaults per batched write: at most 3 writes each, under Firestore's 500
+CHUNK_SIZE = 150
+
+
+def announcement_id(vault_id: str) -> str:
+    """ID of a vault's unlock notification and email."""
+    return f"vault-unlocked-{vault_id}"
+
+
+class UnlockService:
+    """Service announcing unlocked vaults to their owners."""
+
+    async def sweep(
+        self,
+        today: Optional[date] = None,
+        page_size: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Announce every vault unlocked by `today` and not announced yet.
+
+        Vaults are read `page_size` at a time (resuming after the last one
+        of the previous page) and their owners with one read per page, so
+        memory stays bounded however many vaults unlock on a day.
+
+        Returns:
+            The number of vaults per outcome
+        """
+        today = today or date.today()
+        page_size = page_size or settings.UNLOCK_SWEEP_PAGE_SIZE
+        since = today - timedelta(days=settings.UNLOCK_SWEEP_LOOKBACK_DAYS)
+
+        outcomes: Counter = Counter()
+        start_after = None
+        while True:
+            page = await vault_repository.list_unannounced(since, today, page_size, start_after)
+            if page:
+                users = await user_repository.get_many({v.user_id for v in page})
+                for i in range(0, len(page), CHUNK_SIZE):
+                    outcomes.update(await self._announce(page[i:i + CHUNK_SIZE], users))
+            if len(page) < page_size:
+                break
+            start_after = (page[-1].unlock_date.isoformat(), page[-1].id)
+
+        return dict(outcomes)
+
+    async def _announce(self, vaults: List[Vault], users: Dict[str, User]) -> List[str]:
+        """Announce vaults in one batched write; return their outcomes."""
+        store = get_store()
+        batch = store.batch()
+        outcomes = [await self._stage(batch, vault, users.get(vault.user_id)) for vault in vaults]
+        try:
+            await batch.commit()
+            return outcomes
+        except DocumentExistsError:
+            pass
+
+        # Another instance got to some of these first: retry one by one
+        outcomes = []
+        for vault in vaults:
+            batch = store.batch()
+            outcome = await self._stage(batch, vault, users.get(vault.user_id))
+            try:
+                await batch.commit()
+            except DocumentExistsError:
+                outcome = SKIPPED
+            outcomes.append(outcome)
+        return outcomes
+
+    async def _stage(self, batch: WriteBatch, vault: Vault, user: Optional[User]) -> str:
+        """Stage a vault's announcement in a batch; return its outcome."""
+        await vault_repository.update(
+            vault.id, batch, unlock_notified_at=datetime.utcnow().isoformat()
+        )
+        if not user or not user.notification_enabled:
+            return MUTED
+
+        await notification_service.notify_vault_unlocked(
+            user.id, vault.name, batch, notification_id=announcement_id(vault.id)
+        )
+        await email_service.queue(
+            user.email,
+            "vault_unlocked",
+            {"user_name": user.full_name, "vault_name": vault.name, "amount": vault.current_amount},
+            user.locale,
+            batch,
+            email_id=announcement_id(vault.id),
+        )
+        return ANNOUNCED
+
+    async def run_scheduled(self) -> Dict[str, int]:
+        """Sweep the unlocked vaults and log the outcome (background task)."""
+        outcomes = await self.sweep()
+        if outcomes:
+            logger.info("Vault unlocks: %s", outcomes)
+        return outcomes
+
+
+unlock_service = UnlockService()
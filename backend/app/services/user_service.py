@@ -1,18 +1,73 @@
 """
-User service for Firestore operations.
+User service for user operations.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import contextlib
+import dataclasses
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
-from app.core.firebase import get_firestore_client
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.stripe_customer import StripeCustomer
 from app.models.user import User, UserRole
+from app.repositories.stripe_customers import stripe_customer_repository
+from app.repositories.users import user_repository
+from app.services.email_service import email_service
+from app.services.stats_service import stats_service
+from app.services.stripe_service import stripe_service
+from app.storage import (
+    DocumentExistsError,
+    DocumentNotFoundError,
+    Transaction,
+    WriteBatch,
+    get_store,
+)
+
+# Firestore accepts at most 500 writes per batch
+_BATCH_SIZE = 500
+
+# User fields summed in the platform counters
+_COUNTED_FIELDS = {"is_active", "is_premium", "discipline_score"}
 
 
 class UserService:
-    """Service for user operations."""
+    """
+    Service for user operations.
+    
+    Users read by ID are cached per instance for `USER_CACHE_TTL_SECONDS`.
+    Writes made through this service invalidate the entry immediately.
+    Other instances see a change once their entry expires, so that TTL
+    bounds how long a disabled account stays usable.
+    
+    Stripe customers are mapped to their user in `stripe_customers`; the
+    mapping never changes, so it is cached without expiry.
+    """
+    
+    def __init__(self):
+        self._cache: LRUCache[User] = LRUCache(
+            settings.USER_CACHE_SIZE,
+            ttl=settings.USER_CACHE_TTL_SECONDS,
+            clock=time.monotonic,
+        )
+        # Stripe customer ID -> user ID
+        self._customer_users: LRUCache[str] = LRUCache(settings.STRIPE_CUSTOMER_CACHE_SIZE)
+        # Logins not yet written: user ID -> last_login
+        self._pending_logins: Dict[str, datetime] = {}
+    
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user from the cache (call after writing the user elsewhere)."""
+        self._cache.pop(user_id)
+    
+    def clear_cache(self) -> None:
+        """Drop every cached user (and Stripe customer mapping)."""
+        self._cache.clear()
+        self._customer_users.clear()
     
-    COLLECTION = "users"
+    def cache_stats(self) -> Dict[str, Any]:
+        """User cache size and hit/miss counters."""
+        return self._cache.stats()
     
     async def create(
         self,
@@ -22,9 +77,12 @@ class UserService:
         role: UserRole = UserRole.USER,
         stripe_customer_id: Optional[str] = None,
     ) -> User:
-        """Create a new user in Firestore."""
-        db = get_firestore_client()
+        """
+        Create a new user (and queue their welcome email).
         
+        If the user already exists (e.g. concurrent first requests), nothing
+        is written and the stored user is returned, so it is counted once.
+        """
         user = User(
             email=email,
             full_name=full_name,
@@ -34,9 +92,32 @@ class UserService:
         )
         
         # Use firebase_uid as document ID for easy lookup
-        doc_ref = db.collection(self.COLLECTION).document(firebase_uid)
-        doc_ref.set(user.to_dict())
         user.id = firebase_uid
+        # Until a first deposit, the campaign counts inactivity from signup
+        user.last_deposit_at = user.created_at
+        
+        batch = get_store().batch()
+        await user_repository.create(user, batch)
+        if stripe_customer_id:
+            await self._stage_stripe_customer(batch, stripe_customer_id, user.id)
+        await stats_service.increment(
+            batch,
+            total_users=1,
+            active_users=int(user.is_active),
+            premium_users=int(user.is_premium),
+            discipline_score_sum=user.discipline_score,
+        )
+        await email_service.queue(
+            email, "welcome", {"user_name": full_name}, user.locale, batch, email_id=f"welcome-{user.id}"
+        )
+        try:
+            await batch.commit()
+        except DocumentExistsError:
+            existing = await user_repository.get(user.id)
+            if existing is None:
+                raise
+            user = existing
+        self.invalidate(user.id)
         
         return user
     
@@ -49,13 +130,16 @@ class UserService:
         )
     
     async def get_by_id(self, user_id: str) -> Optional[User]:
-        """Get a user by ID."""
-        db = get_firestore_client()
-        doc = db.collection(self.COLLECTION).document(user_id).get()
+        """Get a user by ID (served from the cache when fresh)."""
+        user = self._cache.get(user_id)
+        if user is None:
+            user = await user_repository.get(user_id)
+            if user is None:
+                return None
+            self._cache.set(user_id, user)
         
-        if doc.exists:
-            return User.from_dict(doc.id, doc.to_dict())
-        return None
+        # Callers may modify the user they get: never hand out the cached instance
+        return dataclasses.replace(user)
     
     async def get_by_firebase_uid(self, firebase_uid: str) -> Optional[User]:
         """Get a user by Firebase UID."""
@@ -63,42 +147,200 @@ class UserService:
     
     async def get_by_email(self, email: str) -> Optional[User]:
         """Get a user by email."""
-        db = get_firestore_client()
-        docs = db.collection(self.COLLECTION).where("email", "==", email).limit(1).stream()
+        return await user_repository.get_by_email(email)
+    
+    async def get_by_stripe_customer_id(self, customer_id: str) -> Optional[User]:
+        """Get a user by Stripe customer ID (one point read, none when cached)."""
+        user_id = self._customer_users.get(customer_id)
+        if user_id is None:
+            customer = await stripe_customer_repository.get(customer_id)
+            if customer is None:
+                return None
+            user_id = customer.user_id
+            self._customer_users.set(customer_id, user_id)
+        return await self.get_by_id(user_id)
+    
+    async def set_stripe_customer(self, user_id: str, customer_id: str) -> None:
+        """Record a user's Stripe customer, on the user and in the mapping."""
+        batch = get_store().batch()
+        await user_repository.update(
+            user_id,
+            batch,
+            stripe_customer_id=customer_id,
+            updated_at=datetime.utcnow().isoformat(),
+        )
+        await self._stage_stripe_customer(batch, customer_id, user_id)
+        await batch.commit()
+        self.invalidate(user_id)
+        self._customer_users.set(customer_id, user_id)
+    
+    async def get_or_create_stripe_customer(self, user: User) -> str:
+        """
+        A user's Stripe customer ID, creating and recording the customer on
+        first use.
+        
+        Concurrent first calls for a user get the same customer back from
+        Stripe (see `StripeService.create_customer`).
+        """
+        if user.stripe_customer_id:
+            return user.stripe_customer_id
         
-        for doc in docs:
-            return User.from_dict(doc.id, doc.to_dict())
-        return None
+        customer_id = await stripe_service.create_customer(user.email, user.full_name, user.id)
+        await self.set_stripe_customer(user.id, customer_id)
+        return customer_id
+    
+    @staticmethod
+    async def _stage_stripe_customer(batch: WriteBatch, customer_id: str, user_id: str) -> None:
+        """Stage the Stripe customer -> user mapping."""
+        await stripe_customer_repository.save(StripeCustomer(id=customer_id, user_id=user_id), batch)
     
-    async def update(self, user_id: str, **kwargs) -> Optional[User]:
-        """Update user fields."""
-        db = get_firestore_client()
-        doc_ref = db.collection(self.COLLECTION).document(user_id)
+    async def update(
+        self,
+        user_id: str,
+        current: Optional[User] = None,
+        batch: Optional[WriteBatch] = None,
+        **kwargs,
+    ) -> Optional[User]:
+        """
+        Update user fields.
         
-        # Add updated_at
-        kwargs["updated_at"] = datetime.utcnow().isoformat()
+        Changes to counted fields (is_active, is_premium, discipline_score)
+        also update the platform counters by the difference with the stored
+        user, read in a transaction so that concurrent updates (or a stale
+        cached user) cannot make them drift.
         
-        # Convert role enum to string if present
-        if "role" in kwargs and isinstance(kwargs["role"], UserRole):
-            kwargs["role"] = kwargs["role"].value
+        If `batch` is given, the writes are only staged in it and None is
+        returned: the caller commits, then invalidates the cached user.
+        Staging counted fields requires `current`, read within `batch`'s
+        transaction.
+        
+        Raises:
+            ValueError: If counted fields are staged without `current`
+        """
+        counted = bool(_COUNTED_FIELDS & kwargs.keys())
+        if batch is not None:
+            if counted and current is None:
+                raise ValueError("Staging counted user fields requires the current user")
+            await self._stage_update(batch, user_id, current, kwargs)
+            return None
+        
+        if counted:
+            async def _update(transaction: Transaction) -> None:
+                stored = await user_repository.get(user_id, transaction)
+                await self._stage_update(transaction, user_id, stored, kwargs)
+            
+            await get_store().run_transaction(_update)
+        else:
+            batch = get_store().batch()
+            await self._stage_update(batch, user_id, None, kwargs)
+            await batch.commit()
+        self.invalidate(user_id)
         
-        doc_ref.update(kwargs)
         return await self.get_by_id(user_id)
     
-    async def update_last_login(self, user_id: str) -> None:
-        """Update user's last login time."""
-        db = get_firestore_client()
-        db.collection(self.COLLECTION).document(user_id).update({
-            "last_login": datetime.utcnow().isoformat()
-        })
+    async def _stage_update(
+        self,
+        batch: WriteBatch,
+        user_id: str,
+        current: Optional[User],
+        changes: Dict[str, Any],
+    ) -> None:
+        """Stage a user update and its counter deltas (from `current`, if given)."""
+        deltas = self._counter_deltas(current, changes) if current else {}
+        changes = {**changes, "updated_at": datetime.utcnow().isoformat()}
+        
+        # Convert role enum to string if present
+        if isinstance(changes.get("role"), UserRole):
+            changes["role"] = changes["role"].value
+        
+        await user_repository.update(user_id, batch, **changes)
+        await stats_service.increment(batch, **deltas)
+    
+    @staticmethod
+    def _counter_deltas(current: User, changes: Dict[str, Any]) -> Dict[str, float]:
+        """Platform counter deltas for a user update."""
+        deltas: Dict[str, float] = {}
+        if "is_active" in changes:
+            deltas["active_users"] = int(changes["is_active"]) - int(current.is_active)
+        if "is_premium" in changes:
+            deltas["premium_users"] = int(changes["is_premium"]) - int(current.is_premium)
+        if "discipline_score" in changes:
+            deltas["discipline_score_sum"] = changes["discipline_score"] - current.discipline_score
+        return deltas
+    
+    def record_login(self, user: User) -> None:
+        """
+        Record a request from a user without writing it right away.
+        
+        `last_login` is only persisted when the stored value is older than
+        `LAST_LOGIN_GRANULARITY_SECONDS`; pending values are written in
+        batches by `flush_logins`, run periodically and on shutdown.
+        """
+        now = datetime.utcnow()
+        granularity = timedelta(seconds=settings.LAST_LOGIN_GRANULARITY_SECONDS)
+        if user.id in self._pending_logins:
+            self._pending_logins[user.id] = now
+            return
+        if user.last_login and now - user.last_login < granularity:
+            return
+        
+        self._pending_logins[user.id] = now
+        
+        # Keep the cached copy in step so the next requests see the new value
+        cached = self._cache.peek(user.id)
+        if cached is not None:
+            cached.last_login = now
+    
+    async def flush_logins(self) -> int:
+        """
+        Write pending last_login values in batched writes.
+        
+        Returns:
+            Number of users written
+        """
+        pending, self._pending_logins = self._pending_logins, {}
+        items = list(pending.items())
+        
+        for start in range(0, len(items), _BATCH_SIZE):
+            chunk = items[start:start + _BATCH_SIZE]
+            batch = get_store().batch()
+            for user_id, last_login in chunk:
+                await user_repository.update(user_id, batch, last_login=last_login.isoformat())
+            try:
+                await batch.commit()
+            except DocumentNotFoundError:
+                # A user was deleted meanwhile: write the others one by one
+                for user_id, last_login in chunk:
+                    with contextlib.suppress(DocumentNotFoundError):
+                        await user_repository.update(user_id, last_login=last_login.isoformat())
+            except Exception:
+                # Retry on the next flush, keeping any newer value
+                for user_id, last_login in items[start:]:
+                    self._pending_logins.setdefault(user_id, last_login)
+                raise
+        
+        return len(items)
+    
+    @staticmethod
+    def discipline_score_after(user: User, delta: float) -> float:
+        """A user's discipline score after applying `delta` (kept within 0-100)."""
+        return max(0, min(100, user.discipline_score + delta))
     
     async def update_discipline_score(self, user_id: str, delta: float) -> Optional[User]:
-        """Update user's discipline score."""
-        user = await self.get_by_id(user_id)
-        if user:
-            new_score = max(0, min(100, user.discipline_score + delta))
-            return await self.update(user_id, discipline_score=new_score)
-        return None
+        """Update user's discipline score (from the stored score, in a transaction)."""
+        async def _update(transaction: Transaction) -> bool:
+            user = await user_repository.get(user_id, transaction)
+            if not user:
+                return False
+            await self._stage_update(
+                transaction, user_id, user, {"discipline_score": self.discipline_score_after(user, delta)}
+            )
+            return True
+        
+        if not await get_store().run_transaction(_update):
+            return None
+        self.invalidate(user_id)
+        return await self.get_by_id(user_id)
     
     async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get user savings statistics."""
@@ -120,9 +362,7 @@ class UserService:
     
     async def get_all_users_count(self) -> int:
         """Get total number of users."""
-        db = get_firestore_client()
-        docs = list(db.collection(self.COLLECTION).stream())
-        return len(docs)
+        return await user_repository.count()
 
 
 user_service = UserService()
@@ -2,19 +2,42 @@
 Vault service for business logic.
 """
 
+import dataclasses
+from collections import defaultdict
 from datetime import date, datetime
-from typing import List, Optional
-from google.cloud.firestore_v1 import FieldFilter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from app.core.firebase import get_firestore_client
+from app.models.deposit import Deposit, DepositSource
+from app.models.user import User
 from app.models.vault import Vault
+from app.repositories.deposits import deposit_repository
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.services.idempotency_service import IdempotentRequest, idempotency_service
+from app.services.outbox_service import DEPOSIT, outbox_service
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.storage import Increment, Transaction, WriteBatch, get_store
+
+# Discipline score change rewarding a deposit (once per request)
+DEPOSIT_REWARD = 1
+
+# Allocations per batch deposit: up to four writes each (ledger record,
+# vault, owner, outbox entry), within Firestore's 500
+MAX_BATCH_DEPOSITS = 100
+
+
+class VaultNotFoundError(ValueError):
+    """Raised when a vault does not exist."""
+
+
+class VaultAccessError(ValueError):
+    """Raised when a user acts on a vault they do not own."""
 
 
 class VaultService:
     """Service for vault operations."""
     
-    COLLECTION = "vaults"
-    
     async def create(
         self,
         user_id: str,
@@ -24,8 +47,6 @@ class VaultService:
         flexibility_percentage: float = 10.0,
     ) -> Vault:
         """Create a new vault."""
-        db = get_firestore_client()
-        
         vault = Vault(
             user_id=user_id,
             name=name,
@@ -34,79 +55,217 @@ class VaultService:
             flexibility_percentage=flexibility_percentage,
         )
         
-        doc_ref = db.collection(self.COLLECTION).document()
-        vault.id = doc_ref.id
-        doc_ref.set(vault.to_dict())
+        batch = get_store().batch()
+        await vault_repository.add(vault, batch)
+        await stats_service.increment(batch, total_vaults=1, active_vaults=1)
+        await batch.commit()
         
         return vault
     
     async def get_by_id(self, vault_id: str) -> Optional[Vault]:
         """Get a vault by ID."""
-        db = get_firestore_client()
-        doc = db.collection(self.COLLECTION).document(vault_id).get()
+        return await vault_repository.get(vault_id)
+    
+    async def get_many(self, vault_ids: Iterable[str]) -> Dict[str, Vault]:
+        """
+        Get vaults by ID with a single batched read.
         
-        if doc.exists:
-            return Vault.from_dict(doc.id, doc.to_dict())
-        return None
+        Use this to resolve the vaults of a list of withdrawals or deposits
+        instead of one `get_by_id` per item.
+        """
+        return await vault_repository.get_many(vault_ids)
     
     async def get_user_vaults(self, user_id: str, active_only: bool = False) -> List[Vault]:
         """Get all vaults for a user."""
-        db = get_firestore_client()
-        query = db.collection(self.COLLECTION).where(
-            filter=FieldFilter("user_id", "==", user_id)
-        )
+        return await vault_repository.list_for_user(user_id, active_only)
+    
+    async def deposit(
+        self,
+        vault: Vault,
+        amount: float,
+        source: DepositSource = DepositSource.MANUAL,
+        idempotency: Optional[IdempotentRequest] = None,
+        depositor: Optional[User] = None,
+        batch: Optional[WriteBatch] = None,
+    ) -> Vault:
+        """
+        Add money to a vault.
         
-        if active_only:
-            query = query.where(filter=FieldFilter("is_active", "==", True))
+        The balance is changed with a server-side increment, so concurrent
+        deposits never overwrite each other, and a `Deposit` record is
+        appended to the ledger in the same batch. `vault` is the caller's
+        already-loaded vault: it is not read again, nor modified.
         
-        docs = query.order_by("created_at", direction="DESCENDING").stream()
+        If the already-loaded `depositor` (the vault owner) is given, an
+        outbox entry staged in the same batch rewards the deposit with
+        `DEPOSIT_REWARD` discipline points and notifies them (in-app and by
+        email, if they take notifications) in the background.
         
-        return [Vault.from_dict(doc.id, doc.to_dict()) for doc in docs]
-    
-    async def deposit(self, vault_id: str, amount: float) -> Vault:
-        """Add money to a vault."""
-        db = get_firestore_client()
-        doc_ref = db.collection(self.COLLECTION).document(vault_id)
+        If `batch` (e.g. a transaction) is given, the writes are only staged
+        in it: the caller commits, then invalidates the owner's cached user.
         
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise ValueError(f"Vault {vault_id} not found")
+        Returns:
+            A copy of `vault` with the deposit applied
         
-        vault = Vault.from_dict(doc.id, doc.to_dict())
-        vault.current_amount += amount
+        Raises:
+            DocumentNotFoundError: If the vault no longer exists (nothing is
+                written)
+            DocumentExistsError: If `idempotency` is given and a request with
+                the same key committed first (nothing is written)
+        """
+        staged = batch is not None
+        batch = batch or get_store().batch()
+        [updated] = await self._stage_deposits(batch, [(vault, amount)], source)
+        if depositor:
+            await outbox_service.stage(
+                batch,
+                DEPOSIT,
+                depositor.id,
+                score_delta=DEPOSIT_REWARD,
+                vault_name=vault.name,
+                amount=amount,
+                new_total=updated.current_amount,
+            )
+        if idempotency:
+            idempotency_service.stage(batch, idempotency, updated)
+        if staged:
+            return updated
         
-        doc_ref.update({
-            "current_amount": vault.current_amount,
-            "updated_at": datetime.utcnow().isoformat(),
-        })
+        await batch.commit()
+        user_service.invalidate(vault.user_id)
+        if idempotency:
+            idempotency_service.remember(idempotency, updated)
         
-        return vault
+        return updated
     
-    async def withdraw(
-        self, 
-        vault_id: str, 
-        amount: float, 
-        is_early: bool = False
-    ) -> tuple[Vault, float, float]:
+    async def deposit_many(
+        self,
+        allocations: Sequence[Tuple[Vault, float]],
+        source: DepositSource = DepositSource.MANUAL,
+        depositor: Optional[User] = None,
+    ) -> List[Vault]:
         """
-        Withdraw from a vault.
+        Add money to several already-loaded vaults in one batched commit.
+        
+        Every allocation gets its own ledger record; each vault and each
+        owner is incremented once. `depositor` is rewarded once and
+        notified of the deposit to each vault (through the outbox, one
+        entry per vault). All deposits are applied or none is.
+        
+        Args:
+            allocations: (vault, amount) pairs, at most `MAX_BATCH_DEPOSITS`
+            source: Origin of the deposits
+            depositor: The already-loaded owner, to reward and notify
         
         Returns:
-            Tuple of (updated_vault, fee, net_amount)
+            Copies of the distinct vaults with their deposits applied, in
+            request order
+        
+        Raises:
+            ValueError: If there are no allocations or too many
+            DocumentNotFoundError: If a vault no longer exists (nothing is
+                written)
         """
-        db = get_firestore_client()
-        doc_ref = db.collection(self.COLLECTION).document(vault_id)
+        if not allocations:
+            raise ValueError("No deposits")
+        if len(allocations) > MAX_BATCH_DEPOSITS:
+            raise ValueError(f"At most {MAX_BATCH_DEPOSITS} deposits per batch")
         
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise ValueError(f"Vault {vault_id} not found")
+        batch = get_store().batch()
+        updated = await self._stage_deposits(batch, allocations, source)
+        if depositor:
+            # One deposit notification per vault, the deposit rewarded once
+            amounts: Dict[str, float] = defaultdict(float)
+            for vault, amount in allocations:
+                amounts[vault.id] += amount
+            for i, vault in enumerate(updated):
+                await outbox_service.stage(
+                    batch,
+                    DEPOSIT,
+                    depositor.id,
+                    score_delta=DEPOSIT_REWARD if i == 0 else 0,
+                    vault_name=vault.name,
+                    amount=amounts[vault.id],
+                    new_total=vault.current_amount,
+                )
+        await batch.commit()
+        for user_id in {vault.user_id for vault in updated}:
+            user_service.invalidate(user_id)
+        
+        return updated
+    
+    async def _stage_deposits(
+        self,
+        batch: WriteBatch,
+        allocations: Sequence[Tuple[Vault, float]],
+        source: DepositSource,
+    ) -> List[Vault]:
+        """Stage ledger records and increments; return the updated vault copies."""
+        now = datetime.utcnow()
+        updated: Dict[str, Vault] = {}
+        vault_deltas: Dict[str, float] = defaultdict(float)
+        user_deltas: Dict[str, float] = defaultdict(float)
+        
+        for vault, amount in allocations:
+            current = updated.get(vault.id, vault)
+            updated[vault.id] = dataclasses.replace(
+                current, current_amount=current.current_amount + amount, updated_at=now
+            )
+            vault_deltas[vault.id] += amount
+            user_deltas[vault.user_id] += amount
+            await deposit_repository.add(
+                Deposit(
+                    user_id=vault.user_id,
+                    vault_id=vault.id,
+                    amount=amount,
+                    source=source,
+                    created_at=now,
+                ),
+                batch,
+            )
+        
+        for vault_id, amount in vault_deltas.items():
+            await vault_repository.update(
+                vault_id,
+                batch,
+                current_amount=Increment(amount),
+                updated_at=now.isoformat(),
+            )
+        
+        for user_id, amount in user_deltas.items():
+            await user_repository.update(
+                user_id, batch, total_saved=Increment(amount), last_deposit_at=now.isoformat()
+            )
+        await stats_service.increment(batch, total_saved=sum(user_deltas.values()))
         
-        vault = Vault.from_dict(doc.id, doc.to_dict())
+        return list(updated.values())
+    
+    async def get_user_deposits(
+        self,
+        user_id: str,
+        vault_id: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Deposit]:
+        """Get deposit history for a user."""
+        return await deposit_repository.list_for_user(user_id, vault_id, limit)
+    
+    def apply_withdrawal(
+        self,
+        vault: Vault,
+        amount: float,
+        is_early: bool = False,
+    ) -> tuple[float, float]:
+        """
+        Validate a withdrawal and debit it from a loaded vault (in memory).
         
-        # Calculate fee
+        Returns:
+            Tuple of (fee, net_amount)
+            
+        Raises:
+            ValueError: If the vault cannot cover the withdrawal
+        """
         fee, net_amount = self.calculate_withdrawal_fee(vault, amount, is_early)
         
-        # Validate
         if amount > vault.current_amount:
             raise ValueError("Insufficient funds")
         
@@ -119,13 +278,7 @@ class VaultService:
         
         vault.current_amount -= amount
         
-        doc_ref.update({
-            "current_amount": vault.current_amount,
-            "flexibility_used": vault.flexibility_used,
-            "updated_at": datetime.utcnow().isoformat(),
-        })
-        
-        return vault, fee, net_amount
+        return fee, net_amount
     
     def calculate_withdrawal_fee(
         self,
@@ -150,29 +303,48 @@ class VaultService:
         
         return round(fee, 2), round(net_amount, 2)
     
-    async def close_vault(self, vault_id: str) -> bool:
-        """Close a vault (mark as inactive)."""
-        db = get_firestore_client()
-        doc_ref = db.collection(self.COLLECTION).document(vault_id)
-        
-        doc = doc_ref.get()
-        if not doc.exists:
-            return False
-        
-        vault = Vault.from_dict(doc.id, doc.to_dict())
-        
-        if vault.is_locked:
-            raise ValueError("Cannot close a locked vault")
+    async def close_vault(self, user_id: str, vault_id: str) -> Vault:
+        """
+        Close a user's vault (mark as inactive).
         
-        if vault.current_amount > 0:
-            raise ValueError("Withdraw all funds before closing")
+        The checks and the write run in one transaction that reads the
+        vault, so a deposit committed meanwhile is seen (and the vault not
+        closed), and a vault is only closed (and counted) once.
         
-        doc_ref.update({
-            "is_active": False,
-            "updated_at": datetime.utcnow().isoformat(),
-        })
+        Raises:
+            VaultNotFoundError: If the vault does not exist
+            VaultAccessError: If the vault belongs to another user
+            ValueError: If the vault is already closed, locked or not empty
+        """
+        async def _close(transaction: Transaction) -> Vault:
+            vault = await vault_repository.get(vault_id, transaction)
+            if not vault:
+                raise VaultNotFoundError("Vault not found")
+            if vault.user_id != user_id:
+                raise VaultAccessError("Not authorized")
+            
+            if not vault.is_active:
+                raise ValueError("Vault is already closed")
+            
+            if vault.is_locked:
+                raise ValueError("Cannot close a locked vault")
+            
+            if vault.current_amount > 0:
+                raise ValueError("Withdraw all funds before closing")
+            
+            vault.is_active = False
+            vault.closed_at = vault.updated_at = datetime.utcnow()
+            await vault_repository.update(
+                vault_id,
+                transaction,
+                is_active=False,
+                closed_at=vault.closed_at.isoformat(),
+                updated_at=vault.updated_at.isoformat(),
+            )
+            await stats_service.increment(transaction, active_vaults=-1)
+            return vault
         
-        return True
+        return await get_store().run_transaction(_close)
 
 
 vault_service = VaultService()
@@ -0,0 +1,187 @@
+"""
+Background processing of the stored Stripe events.
+
+On each instance, a `WebhookProcessor` claims the pending events (leased,
+like queued emails), and hands them, oldest first, to a pool of workers
+with one in-process queue each. Events are routed by customer (see
+`StripeEvent.ordering_key`), so one customer's events are processed one
+at a time and in order, while other customers' events proceed in
+parallel.
+
+An event that fails is retried with exponential backoff; after
+`WEBHOOK_MAX_ATTEMPTS` failures it is marked failed and kept for
+`scripts.replay_stripe_events`.
+"""
+
+import asyncio
+import logging
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.models.stripe_event import StripeEvent, StripeEventStatus
+from app.repositories.stripe_events import stripe_event_repository
+from app.services.webhook_service import webhook_service
+from app.storage import DocumentExistsError, DocumentNotFoundError, get_store
+
+logger = logging.getLogger(__name__)
+
+# Events claimed per batched write (2 writes each, under Firestore's 500)
+MAX_CLAIMS = 250
+
+RETRIED = "retried"
+FAILED = "failed"
+
+
+class WebhookProcessor:
+    """
+    Background processor of the stored Stripe events.
+
+    Started and stopped by the application lifespan (see `app.main`), like
+    `PeriodicTask`.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        workers = workers or settings.WEBHOOK_WORKERS
+        queue_size = queue_size or settings.WEBHOOK_QUEUE_SIZE
+        self._queues: List[asyncio.Queue] = [asyncio.Queue(queue_size) for _ in range(workers)]
+        self._poll_interval = poll_interval or settings.WEBHOOK_POLL_SECONDS
+        self._in_flight: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self.outcomes: Counter = Counter()
+
+    def start(self) -> None:
+        """Start the workers and the poller on the running event loop."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._work(queue), name=f"webhook-worker-{i}")
+            for i, queue in enumerate(self._queues)
+        ]
+        self._tasks.append(asyncio.create_task(self._poll_loop(), name="webhook-poller"))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop polling, give the workers `timeout` seconds to drain, then stop."""
+        if not self._tasks:
+            return
+        *workers, poller = self._tasks
+        poller.cancel()
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except TimeoutError:
+            logger.warning("Stopping with %d events unprocessed (processed after their lease)",
+                           sum(q.qsize() for q in self._queues))
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> None:
+        """Wait until every event handed to the workers is processed."""
+        for queue in self._queues:
+            await queue.join()
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                claimed = await self.poll()
+            except Exception:
+                logger.exception("Claiming Stripe events failed")
+                claimed = 0
+            if not claimed:
+                await asyncio.sleep(self._poll_interval)
+
+    async def poll(self) -> int:
+        """Claim pending events and hand them to the workers; return how many."""
+        free = min(min(q.maxsize - q.qsize() for q in self._queues), MAX_CLAIMS)
+        if free <= 0:
+            return 0
+
+        claimed = await self._claim(free)
+        for event in sorted(claimed, key=lambda e: e.created):
+            self._in_flight.add(event.id)
+            await self._queue_for(event).put(event)
+        return len(claimed)
+
+    def _queue_for(self, event: StripeEvent) -> asyncio.Queue:
+        """The worker queue of an event's customer."""
+        return self._queues[zlib.crc32(event.ordering_key.encode()) % len(self._queues)]
+
+    async def _claim(self, limit: int) -> List[StripeEvent]:
+        """Lease up to `limit` pending events to this instance."""
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS)
+        available = [
+            event for event in await stripe_event_repository.list_pending(limit, due_by=now)
+            if event.id not in self._in_flight
+        ]
+        if not available:
+            return []
+
+        store = get_store()
+        batch = store.batch()
+        for event in available:
+            stripe_event_repository.stage_claim(batch, event, lease_until)
+        try:
+            await batch.commit()
+            return available
+        except (DocumentExistsError, DocumentNotFoundError):
+            pass
+
+        # Another instance claimed some of these first (or they were deleted):
+        # claim one by one
+        claimed = []
+        for event in available:
+            batch = store.batch()
+            stripe_event_repository.stage_claim(batch, event, lease_until)
+            try:
+                await batch.commit()
+            except (DocumentExistsError, DocumentNotFoundError):
+                continue
+            claimed.append(event)
+        return claimed
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                outcome = await self._process(event)
+            except Exception:
+                logger.exception("Recording the failure of Stripe event %s failed", event.id)
+                outcome = FAILED
+            finally:
+                self._in_flight.discard(event.id)
+                queue.task_done()
+            self.outcomes[outcome] += 1
+
+    async def _process(self, event: StripeEvent) -> str:
+        """Process an event, or record its failure; return its outcome."""
+        try:
+            return await webhook_service.process(event)
+        except Exception as e:
+            error = e
+
+        attempts = event.attempts + 1
+        fields: Dict[str, Any] = {"attempts": attempts, "error": repr(error)}
+        if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            logger.error("Stripe event %s (%s) failed: %r", event.id, event.type, error)
+            fields["status"] = StripeEventStatus.FAILED.value
+            outcome = FAILED
+        else:
+            logger.warning("Stripe event %s (%s) will be retried: %r", event.id, event.type, error)
+            backoff = settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+            fields["available_at"] = (datetime.utcnow() + timedelta(seconds=backoff)).isoformat()
+            outcome = RETRIED
+        await stripe_event_repository.update(event.id, **fields)
+        return outcome
+
+    def stats(self) -> Dict[str, Any]:
+        """Processing outcomes and queue depths."""
+        return {**dict(self.outcomes), "queued": [q.qsize() for q in self._queues]}
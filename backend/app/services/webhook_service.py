@@ -0,0 +1,171 @@
+"""
+Stripe webhook events.
+
+The webhook endpoint only verifies an event and stores it in
+`stripe_events` under its Stripe event ID (`receive`): Stripe's retries
+of an event already stored are dropped, and the response does not wait
+for any other read or write. `WebhookProcessor` (see `webhook_processor`)
+then carries out the stored events in the background with `process`.
+
+Each event is processed in one transaction that re-reads it, applies it
+and marks it processed, so an event is applied once however many times
+it is delivered or claimed. Its notification goes through the outbox
+under the event ID. Subscription events older than the last one applied
+to the user are recorded but not applied, so a late delivery cannot undo
+a newer change.
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.models.stripe_event import StripeEvent, StripeEventStatus
+from app.models.user import User
+from app.repositories.stripe_events import stripe_event_repository
+from app.repositories.users import user_repository
+from app.services.outbox_service import (
+    PAYMENT_FAILED,
+    PAYMENT_SUCCEEDED,
+    PREMIUM_ENDED,
+    PREMIUM_STARTED,
+    outbox_service,
+)
+from app.services.user_service import user_service
+from app.storage import (
+    DocumentExistsError,
+    DocumentNotFoundError,
+    Transaction,
+    get_store,
+)
+
+# Outcomes of a processed event
+APPLIED = "applied"
+IGNORED = "ignored"  # Type not handled, or no matching user
+STALE = "stale"  # Older than the last subscription event applied to the user
+SKIPPED = "skipped"  # Already processed (by another instance)
+
+Handler = Callable[[Transaction, StripeEvent, User], Awaitable[str]]
+
+
+class WebhookService:
+    """Service storing and applying Stripe webhook events."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {
+            "payment_intent.succeeded": self._on_payment_succeeded,
+            "payment_intent.payment_failed": self._on_payment_failed,
+            "customer.subscription.created": self._on_subscription_created,
+            "customer.subscription.deleted": self._on_subscription_deleted,
+        }
+
+    async def receive(self, event: Dict[str, Any]) -> bool:
+        """
+        Store a verified Stripe event for processing.
+
+        Returns:
+            False if the event was already received (nothing is written)
+        """
+        try:
+            await stripe_event_repository.create(StripeEvent.from_stripe(event))
+        except DocumentExistsError:
+            return False
+        return True
+
+    async def requeue(self, event_id: str) -> bool:
+        """
+        Put a stored event back in the queue, to be applied again.
+
+        Returns:
+            False if no such event is stored
+        """
+        try:
+            await stripe_event_repository.update(
+                event_id,
+                status=StripeEventStatus.PENDING.value,
+                attempts=0,
+                error=None,
+                available_at=datetime.utcnow().isoformat(),
+            )
+        except DocumentNotFoundError:
+            return False
+        return True
+
+    async def process(self, event: StripeEvent) -> str:
+        """
+        Apply a stored event and mark it processed; return its outcome.
+
+        Raises:
+            Exception: Whatever applying it raised (nothing is written)
+        """
+        handler = self._handlers.get(event.type)
+        user = await self._find_user(event) if handler else None
+
+        async def _process(transaction: Transaction) -> str:
+            current = await stripe_event_repository.get(event.id, transaction)
+            if not current or current.status != StripeEventStatus.PENDING:
+                return SKIPPED
+            fresh = await user_repository.get(user.id, transaction) if user else None
+
+            outcome = await handler(transaction, current, fresh) if fresh else IGNORED
+            await stripe_event_repository.update(
+                event.id,
+                transaction,
+                status=StripeEventStatus.PROCESSED.value,
+                outcome=outcome,
+                attempts=current.attempts + 1,
+                error=None,
+                processed_at=datetime.utcnow().isoformat(),
+            )
+            return outcome
+
+        outcome = await get_store().run_transaction(_process)
+        if outcome == APPLIED:
+            user_service.invalidate(user.id)
+        return outcome
+
+    async def _find_user(self, event: StripeEvent) -> Optional[User]:
+        """The user an event is about (by Stripe customer, else by metadata)."""
+        if event.customer_id and event.type.startswith("customer."):
+            return await user_service.get_by_stripe_customer_id(event.customer_id)
+        user_id = (event.data.get("metadata") or {}).get("user_id")
+        return await user_service.get_by_id(user_id) if user_id else None
+
+    async def _on_payment_succeeded(self, transaction: Transaction, event: StripeEvent, user: User) -> str:
+        amount = event.data.get("amount", 0) / 100  # Convert from cents
+        await outbox_service.stage(transaction, PAYMENT_SUCCEEDED, user.id, event.id, amount=amount)
+        return APPLIED
+
+    async def _on_payment_failed(self, transaction: Transaction, event: StripeEvent, user: User) -> str:
+        await outbox_service.stage(transaction, PAYMENT_FAILED, user.id, event.id)
+        return APPLIED
+
+    async def _on_subscription_created(self, transaction: Transaction, event: StripeEvent, user: User) -> str:
+        return await self._set_premium(transaction, event, user, True)
+
+    async def _on_subscription_deleted(self, transaction: Transaction, event: StripeEvent, user: User) -> str:
+        return await self._set_premium(transaction, event, user, False)
+
+    async def _set_premium(
+        self,
+        transaction: Transaction,
+        event: StripeEvent,
+        user: User,
+        is_premium: bool,
+    ) -> str:
+        """Update a user's Premium status and notify them, unless the event is stale."""
+        if user.subscription_event_at and user.subscription_event_at > event.created:
+            return STALE
+
+        await user_service.update(
+            user.id,
+            current=user,
+            batch=transaction,
+            is_premium=is_premium,
+            subscription_event_at=event.created.isoformat(),
+        )
+        await outbox_service.stage(
+            transaction, PREMIUM_STARTED if is_premium else PREMIUM_ENDED, user.id, event.id
+        )
+        return APPLIED
+
+
+webhook_service = WebhookService()
@@ -4,29 +4,33 @@ Withdrawal service for transaction management.
 
 from datetime import datetime
 from typing import List, Optional
-from google.cloud.firestore_v1 import FieldFilter
 
-from app.core.firebase import get_firestore_client
+from app.models.vault import Vault
 from app.models.withdrawal import Withdrawal, WithdrawalStatus
-from app.services.vault_service import vault_service
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.services.idempotency_service import IdempotentRequest, idempotency_service
+from app.services.outbox_service import WITHDRAWAL, outbox_service
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.services.vault_service import VaultAccessError, VaultNotFoundError, vault_service
+from app.storage import Increment, Transaction, get_store
+
+# Discipline score change for an early withdrawal from a locked vault
+EARLY_WITHDRAWAL_PENALTY = -2
 
 
 class WithdrawalService:
     """Service for withdrawal operations."""
     
-    COLLECTION = "withdrawals"
-    
     async def preview(
         self,
-        vault_id: str,
+        vault: Vault,
         amount: float,
         is_early: bool = False,
     ) -> dict:
-        """Preview a withdrawal with fee calculation."""
-        vault = await vault_service.get_by_id(vault_id)
-        if not vault:
-            raise ValueError("Vault not found")
-        
+        """Preview a withdrawal from an already-loaded vault, with fee calculation."""
         fee, net_amount = vault_service.calculate_withdrawal_fee(vault, amount, is_early)
         
         can_withdraw = True
@@ -40,7 +44,7 @@ class WithdrawalService:
             message = f"Exceeds flexibility limit ({vault.flexibility_available:.2f}€ available)"
         
         return {
-            "vault_id": vault_id,
+            "vault_id": vault.id,
             "amount": amount,
             "fee": fee,
             "fee_percentage": 1.0 if (is_early and vault.is_locked) else 0.0,
@@ -56,49 +60,87 @@ class WithdrawalService:
         vault_id: str,
         amount: float,
         is_early: bool = False,
+        idempotency: Optional[IdempotentRequest] = None,
     ) -> Withdrawal:
-        """Create a withdrawal transaction."""
-        db = get_firestore_client()
-        
-        # Perform withdrawal
-        vault, fee, net_amount = await vault_service.withdraw(vault_id, amount, is_early)
-        
-        # Verify ownership
-        if vault.user_id != user_id:
-            raise ValueError("Not authorized")
+        """
+        Create a withdrawal transaction.
         
-        # Create withdrawal record
-        withdrawal = Withdrawal(
-            user_id=user_id,
-            vault_id=vault_id,
-            amount=amount,
-            fee=fee,
-            net_amount=net_amount,
-            is_early=is_early,
-            status=WithdrawalStatus.COMPLETED,
-            completed_at=datetime.utcnow(),
-        )
+        Ownership check, balance and flexibility validation, vault debit,
+        withdrawal record, counters, the idempotency record (if any) and an
+        outbox entry are committed together in one transaction: nothing
+        moves unless everything does. The vault is read once, inside it.
+        The outbox entry applies the discipline penalty and notifies the
+        user in the background.
         
-        doc_ref = db.collection(self.COLLECTION).document()
-        withdrawal.id = doc_ref.id
-        doc_ref.set(withdrawal.to_dict())
+        Raises:
+            VaultNotFoundError: If the vault does not exist
+            VaultAccessError: If the vault belongs to another user
+            ValueError: If the vault cannot cover the withdrawal
+            DocumentExistsError: If `idempotency` is given and a request with
+                the same key committed first (nothing is written)
+        """
+        async def _create(transaction: Transaction) -> Withdrawal:
+            vault = await vault_repository.get(vault_id, transaction)
+            if not vault:
+                raise VaultNotFoundError("Vault not found")
+            
+            # Verify ownership
+            if vault.user_id != user_id:
+                raise VaultAccessError("Not authorized")
+            
+            # Penalize early withdrawals from a locked vault
+            penalized = is_early and vault.is_locked
+            
+            fee, net_amount = vault_service.apply_withdrawal(vault, amount, is_early)
+            now = datetime.utcnow()
+            
+            withdrawal = Withdrawal(
+                user_id=user_id,
+                vault_id=vault_id,
+                amount=amount,
+                fee=fee,
+                net_amount=net_amount,
+                is_early=is_early,
+                status=WithdrawalStatus.COMPLETED,
+                completed_at=now,
+            )
+            
+            await vault_repository.update(
+                vault_id,
+                transaction,
+                current_amount=vault.current_amount,
+                flexibility_used=vault.flexibility_used,
+                updated_at=now.isoformat(),
+            )
+            await withdrawal_repository.add(withdrawal, transaction)
+            await user_repository.update(user_id, transaction, total_saved=Increment(-amount))
+            await stats_service.increment(
+                transaction, total_saved=-amount, total_withdrawals=1, total_withdrawn=amount
+            )
+            await outbox_service.stage(
+                transaction,
+                WITHDRAWAL,
+                user_id,
+                score_delta=EARLY_WITHDRAWAL_PENALTY if penalized else 0,
+                vault_name=vault.name,
+                amount=amount,
+                fee=fee,
+                is_early=is_early,
+            )
+            if idempotency:
+                idempotency_service.stage(transaction, idempotency, withdrawal)
+            return withdrawal
         
-        # Update user discipline score
-        if is_early and vault.is_locked:
-            # Penalize early withdrawal
-            from app.services.user_service import user_service
-            await user_service.update_discipline_score(user_id, -2)
+        withdrawal = await get_store().run_transaction(_create)
+        user_service.invalidate(user_id)
+        if idempotency:
+            idempotency_service.remember(idempotency, withdrawal)
         
         return withdrawal
     
     async def get_by_id(self, withdrawal_id: str) -> Optional[Withdrawal]:
         """Get withdrawal by ID."""
-        db = get_firestore_client()
-        doc = db.collection(self.COLLECTION).document(withdrawal_id).get()
-        
-        if doc.exists:
-            return Withdrawal.from_dict(doc.id, doc.to_dict())
-        return None
+        return await withdrawal_repository.get(withdrawal_id)
     
     async def get_user_withdrawals(
         self, 
@@ -107,27 +149,11 @@ class WithdrawalService:
         limit: int = 50,
     ) -> List[Withdrawal]:
         """Get withdrawal history for a user."""
-        db = get_firestore_client()
-        query = db.collection(self.COLLECTION).where(
-            filter=FieldFilter("user_id", "==", user_id)
-        )
-        
-        if vault_id:
-            query = query.where(filter=FieldFilter("vault_id", "==", vault_id))
-        
-        docs = query.order_by("created_at", direction="DESCENDING").limit(limit).stream()
-        
-        return [Withdrawal.from_dict(doc.id, doc.to_dict()) for doc in docs]
+        return await withdrawal_repository.list_for_user(user_id, vault_id, limit)
     
     async def get_vault_withdrawals(self, vault_id: str, limit: int = 20) -> List[Withdrawal]:
         """Get withdrawal history for a vault."""
-        db = get_firestore_client()
-        query = db.collection(self.COLLECTION).where(
-            filter=FieldFilter("vault_id", "==", vault_id)
-        ).order_by("created_at", direction="DESCENDING").limit(limit)
-        
-        docs = query.stream()
-        return [Withdrawal.from_dict(doc.id, doc.to_dict()) for doc in docs]
+        return await withdrawal_repository.list_for_vault(vault_id, limit)
 
 
 withdrawal_service = WithdrawalService()
@@ -0,0 +1,78 @@
+"""
+Pluggable storage backends.
+
+The backend is selected with `Settings.STORAGE_BACKEND` ("firestore" or
+"sqlite") and shared by every repository through `get_store()`.
+"""
+
+from app.core.config import settings
+from app.storage.base import (
+    ASCENDING,
+    DESCENDING,
+    Document,
+    DocumentExistsError,
+    DocumentNotFoundError,
+    DocumentStore,
+    Increment,
+    Transaction,
+    TransactionConflictError,
+    WriteBatch,
+)
+
+_store: DocumentStore | None = None
+
+
+def create_store(backend: str) -> DocumentStore:
+    """Instantiate a storage backend by name."""
+    if backend == "firestore":
+        from app.storage.firestore import FirestoreStore
+        return FirestoreStore()
+
+    if backend == "sqlite":
+        from app.storage.sqlite import SQLiteStore
+        return SQLiteStore(settings.SQLITE_PATH)
+
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_store() -> DocumentStore:
+    """Get the configured document store."""
+    global _store
+
+    if _store is None:
+        _store = create_store(settings.STORAGE_BACKEND)
+
+    return _store
+
+
+def set_store(store: DocumentStore | None) -> None:
+    """Replace the active document store (tests, benchmarks, tooling)."""
+    global _store
+    _store = store
+
+
+async def close_store() -> None:
+    """Close the active document store."""
+    global _store
+
+    if _store is not None:
+        await _store.close()
+        _store = None
+
+
+__all__ = [
+    "ASCENDING",
+    "DESCENDING",
+    "Document",
+    "DocumentExistsError",
+    "DocumentNotFoundError",
+    "DocumentStore",
+    "Increment",
+    "Transaction",
+    "TransactionConflictError",
+    "WriteBatch",
+    "close_store",
+    "create_store",
+    "get_store",
+    "set_store",
+]
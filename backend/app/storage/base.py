@@ -0,0 +1,278 @@
+"""
+Storage backend interface.
+
+Backends expose a small document-store API (collections of JSON-like
+documents addressed by id) that mirrors the subset of Firestore used by
+the repositories, so the same repository code runs on Firestore in
+production and on SQLite for local load testing.
+"""
+
+import asyncio
+import secrets
+import string
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+# (field, operator, value) - operators follow Firestore: ==, !=, <, <=, >, >=, in
+Where = Tuple[str, str, Any]
+# (field, ASCENDING | DESCENDING)
+OrderBy = Tuple[str, str]
+# (alias, "count" | "sum" | "avg", field) - field is None for count
+Aggregation = Tuple[str, str, Optional[str]]
+
+R = TypeVar("R")
+
+_ID_ALPHABET = string.ascii_letters + string.digits
+
+# Attempts per transaction before giving up (Firestore's default)
+MAX_TRANSACTION_ATTEMPTS = 5
+
+
+class Document(NamedTuple):
+    """A stored document."""
+    id: str
+    data: dict
+
+
+class DocumentNotFoundError(LookupError):
+    """Raised when updating a document that does not exist."""
+
+
+class DocumentExistsError(ValueError):
+    """Raised when creating a document that already exists."""
+
+
+class TransactionConflictError(RuntimeError):
+    """Raised when a transaction keeps conflicting with concurrent writes."""
+
+
+class Increment:
+    """
+    Field transform adding `value` to the stored number (missing counts as 0).
+
+    Usable as a field value in `set`, `update` and batched writes; applied
+    atomically by the backend (Firestore `Increment`).
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Increment({self.value!r})"
+
+
+def apply_fields(current: Optional[dict], fields: dict) -> dict:
+    """Apply top-level field values and `Increment` transforms to a document."""
+    result = dict(current or {})
+    for key, value in fields.items():
+        if isinstance(value, Increment):
+            result[key] = (result.get(key) or 0) + value.value
+        else:
+            result[key] = value
+    return result
+
+
+class WriteBatch(ABC):
+    """Group of writes committed atomically."""
+
+    @abstractmethod
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        """Stage a create/overwrite (or merge) of a document."""
+
+    @abstractmethod
+    def create(self, collection: str, doc_id: str, data: dict) -> None:
+        """Stage a create; the commit fails with `DocumentExistsError` if it exists."""
+
+    @abstractmethod
+    def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        """Stage an update; the commit fails if the document does not exist."""
+
+    @abstractmethod
+    def delete(self, collection: str, doc_id: str) -> None:
+        """Stage a delete."""
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Apply every staged write atomically."""
+
+
+class Transaction(WriteBatch):
+    """
+    Reads and writes applied atomically.
+
+    Every read must happen before the first write. Writes are staged and
+    applied on commit (done by `DocumentStore.run_transaction`), which
+    fails if a document that was read has changed in the meantime.
+    """
+
+    @abstractmethod
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        """Read a document within the transaction."""
+
+    async def commit(self) -> None:
+        raise TypeError("Transactions are committed by DocumentStore.run_transaction")
+
+
+class TransactionMetrics:
+    """Counters for transaction outcomes and contention retries."""
+
+    def __init__(self):
+        self.committed = 0
+        self.failed = 0
+        self.conflicts = 0
+        self.retries = 0
+
+    def record(self, attempts: int, committed: bool, conflict: bool = False) -> None:
+        """Record one `run_transaction` call that took `attempts` attempts."""
+        self.retries += max(attempts - 1, 0)
+        if committed:
+            self.committed += 1
+        else:
+            self.failed += 1
+            self.conflicts += int(conflict)
+
+    def stats(self) -> Dict[str, Any]:
+        """Outcome counters and retries per transaction."""
+        total = self.committed + self.failed
+        return {
+            "committed": self.committed,
+            "failed": self.failed,
+            "conflicts": self.conflicts,
+            "retries": self.retries,
+            "retries_per_transaction": round(self.retries / total, 4) if total else 0.0,
+        }
+
+
+class DocumentStore(ABC):
+    """Abstract document store."""
+
+    name: str = ""
+
+    def __init__(self):
+        self.transaction_metrics = TransactionMetrics()
+
+    def new_id(self) -> str:
+        """Generate a Firestore-style 20 character document ID."""
+        return "".join(secrets.choice(_ID_ALPHABET) for _ in range(20))
+
+    @abstractmethod
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        """Get a document's data, or None if it does not exist."""
+
+    async def get_many(self, collection: str, doc_ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Get several documents in one round trip.
+
+        Returns:
+            Mapping of ID to data for the documents that exist.
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))
+        results = await asyncio.gather(*(self.get(collection, doc_id) for doc_id in doc_ids))
+        return {
+            doc_id: data for doc_id, data in zip(doc_ids, results, strict=True) if data is not None
+        }
+
+    @abstractmethod
+    async def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        """Create or overwrite a document (or merge top-level fields)."""
+
+    @abstractmethod
+    async def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        """
+        Update top-level fields of an existing document.
+
+        Raises:
+            DocumentNotFoundError: If the document does not exist.
+        """
+
+    @abstractmethod
+    async def delete(self, collection: str, doc_id: str) -> None:
+        """Delete a document (no-op if missing)."""
+
+    @abstractmethod
+    def batch(self) -> WriteBatch:
+        """Start a batch of atomic writes."""
+
+    @abstractmethod
+    async def run_transaction(
+        self,
+        fn: Callable[[Transaction], Awaitable[R]],
+        max_attempts: int = MAX_TRANSACTION_ATTEMPTS,
+    ) -> R:
+        """
+        Run `fn` in a transaction and commit its writes.
+
+        `fn` is called again (with a fresh transaction) when the commit
+        conflicts with concurrent writes, so it must not have side effects
+        other than its transaction reads and writes. Exceptions raised by
+        `fn` abort the transaction and propagate.
+
+        Raises:
+            TransactionConflictError: If every attempt conflicted.
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        collection: str,
+        where: Sequence[Where] = (),
+        order_by: Sequence[OrderBy] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> AsyncIterator[Document]:
+        """
+        Stream documents matching all `where` clauses.
+
+        `start_after` is a cursor: the values of the `order_by` fields of the
+        last document already returned, followed by its ID. Results resume
+        right after that document (ties are broken on the document ID), so
+        deep pages cost as much as the first one, unlike `offset`.
+        """
+
+    @abstractmethod
+    async def aggregate(
+        self,
+        collection: str,
+        aggregations: Sequence[Aggregation],
+        where: Sequence[Where] = (),
+    ) -> Dict[str, Any]:
+        """
+        Compute server-side aggregations over the documents matching `where`.
+
+        Returns:
+            Mapping of alias to value. Sums over no documents are 0 and
+            averages over no documents are None, as in Firestore.
+        """
+
+    async def count(self, collection: str, where: Sequence[Where] = ()) -> int:
+        """Count the documents matching `where`."""
+        result = await self.aggregate(collection, [("count", "count", None)], where)
+        return int(result["count"])
+
+    async def add(self, collection: str, data: dict) -> str:
+        """Create a document with a generated ID and return the ID."""
+        doc_id = self.new_id()
+        await self.set(collection, doc_id, data)
+        return doc_id
+
+    # A no-op unless the backend holds resources (connections, threads)
+    async def close(self) -> None:  # noqa: B027
+        """Release backend resources."""
@@ -0,0 +1,246 @@
+"""
+Firestore storage backend built on the async Firestore client.
+"""
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+)
+
+from google.api_core.exceptions import Aborted, AlreadyExists, NotFound
+from google.cloud import firestore
+from google.cloud.firestore_v1 import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from app.core.firebase import close_firestore_client, get_firestore_client
+from app.storage.base import (
+    ASCENDING,
+    MAX_TRANSACTION_ATTEMPTS,
+    Aggregation,
+    Document,
+    DocumentExistsError,
+    DocumentNotFoundError,
+    DocumentStore,
+    Increment,
+    OrderBy,
+    R,
+    Transaction,
+    TransactionConflictError,
+    Where,
+    WriteBatch,
+)
+
+
+def _to_firestore(data: dict) -> dict:
+    """Convert storage field transforms into Firestore transforms."""
+    return {
+        key: firestore.Increment(value.value) if isinstance(value, Increment) else value
+        for key, value in data.items()
+    }
+
+
+class FirestoreWriteBatch(WriteBatch):
+    """Write batch backed by a Firestore `AsyncWriteBatch`."""
+
+    def __init__(self, client: firestore.AsyncClient):
+        self._client = client
+        self._batch = client.batch()
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        ref = self._client.collection(collection).document(doc_id)
+        self._batch.set(ref, _to_firestore(data), merge=merge)
+
+    def create(self, collection: str, doc_id: str, data: dict) -> None:
+        self._batch.create(self._client.collection(collection).document(doc_id), data)
+
+    def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        ref = self._client.collection(collection).document(doc_id)
+        self._batch.update(ref, _to_firestore(fields))
+
+    def delete(self, collection: str, doc_id: str) -> None:
+        self._batch.delete(self._client.collection(collection).document(doc_id))
+
+    async def commit(self) -> None:
+        try:
+            await self._batch.commit()
+        except NotFound as e:
+            raise DocumentNotFoundError(str(e)) from e
+        except AlreadyExists as e:
+            raise DocumentExistsError(str(e)) from e
+
+
+class FirestoreTransaction(Transaction):
+    """Transaction backed by a Firestore `AsyncTransaction`."""
+
+    def __init__(self, client: firestore.AsyncClient, transaction: firestore.AsyncTransaction):
+        self._client = client
+        self._transaction = transaction
+
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        ref = self._client.collection(collection).document(doc_id)
+        doc = await ref.get(transaction=self._transaction)
+        return doc.to_dict() if doc.exists else None
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        ref = self._client.collection(collection).document(doc_id)
+        self._transaction.set(ref, _to_firestore(data), merge=merge)
+
+    def create(self, collection: str, doc_id: str, data: dict) -> None:
+        self._transaction.create(self._client.collection(collection).document(doc_id), data)
+
+    def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        ref = self._client.collection(collection).document(doc_id)
+        self._transaction.update(ref, _to_firestore(fields))
+
+    def delete(self, collection: str, doc_id: str) -> None:
+        self._transaction.delete(self._client.collection(collection).document(doc_id))
+
+
+class FirestoreStore(DocumentStore):
+    """Document store backed by Cloud Firestore."""
+
+    name = "firestore"
+
+    @property
+    def client(self):
+        """The shared async Firestore client."""
+        return get_firestore_client()
+
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        doc = await self.client.collection(collection).document(doc_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def get_many(self, collection: str, doc_ids: Iterable[str]) -> Dict[str, dict]:
+        refs = [
+            self.client.collection(collection).document(doc_id)
+            for doc_id in dict.fromkeys(doc_ids)
+        ]
+        if not refs:
+            return {}
+
+        # One BatchGetDocuments call for every reference
+        return {
+            doc.id: doc.to_dict()
+            async for doc in self.client.get_all(refs)
+            if doc.exists
+        }
+
+    async def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        await self.client.collection(collection).document(doc_id).set(
+            _to_firestore(data), merge=merge
+        )
+
+    async def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        try:
+            await self.client.collection(collection).document(doc_id).update(
+                _to_firestore(fields)
+            )
+        except NotFound as e:
+            raise DocumentNotFoundError(f"{collection}/{doc_id}") from e
+
+    async def delete(self, collection: str, doc_id: str) -> None:
+        await self.client.collection(collection).document(doc_id).delete()
+
+    async def add(self, collection: str, data: dict) -> str:
+        doc_ref = self.client.collection(collection).document()
+        await doc_ref.set(data)
+        return doc_ref.id
+
+    def batch(self) -> WriteBatch:
+        return FirestoreWriteBatch(self.client)
+
+    async def run_transaction(
+        self,
+        fn: Callable[[Transaction], Awaitable[R]],
+        max_attempts: int = MAX_TRANSACTION_ATTEMPTS,
+    ) -> R:
+        attempts = 0
+
+        @firestore.async_transactional
+        async def _attempt(transaction: firestore.AsyncTransaction) -> R:
+            nonlocal attempts
+            attempts += 1
+            return await fn(FirestoreTransaction(self.client, transaction))
+
+        committed = conflict = False
+        try:
+            # The client retries aborted commits itself, keeping its place in line
+            result = await _attempt(self.client.transaction(max_attempts=max_attempts))
+            committed = True
+            return result
+        except ValueError as e:
+            if isinstance(e.__cause__, Aborted):
+                conflict = True
+                raise TransactionConflictError(str(e)) from e
+            raise
+        except NotFound as e:
+            raise DocumentNotFoundError(str(e)) from e
+        except AlreadyExists as e:
+            raise DocumentExistsError(str(e)) from e
+        finally:
+            self.transaction_metrics.record(attempts, committed, conflict)
+
+    def _filtered(self, collection: str, where: Sequence[Where]):
+        query = self.client.collection(collection)
+        for field, op, value in where:
+            query = query.where(filter=FieldFilter(field, op, value))
+        return query
+
+    async def query(
+        self,
+        collection: str,
+        where: Sequence[Where] = (),
+        order_by: Sequence[OrderBy] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> AsyncIterator[Document]:
+        query = self._filtered(collection, where)
+
+        for field, direction in order_by:
+            query = query.order_by(field, direction=direction)
+
+        if start_after is not None:
+            # Order on the document ID explicitly so the cursor can carry it
+            direction = order_by[-1][1] if order_by else ASCENDING
+            query = query.order_by(FieldPath.document_id(), direction=direction)
+            query = query.start_after(list(start_after))
+
+        if offset:
+            query = query.offset(offset)
+
+        if limit is not None:
+            query = query.limit(limit)
+
+        async for doc in query.stream():
+            yield Document(doc.id, doc.to_dict())
+
+    async def aggregate(
+        self,
+        collection: str,
+        aggregations: Sequence[Aggregation],
+        where: Sequence[Where] = (),
+    ) -> Dict[str, Any]:
+        # Chain every aggregation onto one AggregationQuery: a single read
+        target = self._filtered(collection, where)
+        for alias, kind, field in aggregations:
+            if kind == "count":
+                target = target.count(alias=alias)
+            elif kind == "sum":
+                target = target.sum(field, alias=alias)
+            elif kind == "avg":
+                target = target.avg(field, alias=alias)
+            else:
+                raise ValueError(f"Unsupported aggregation: {kind!r}")
+
+        results = await target.get()
+        return {result.alias: result.value for result in results[0]}
+
+    async def close(self) -> None:
+        await close_firestore_client()
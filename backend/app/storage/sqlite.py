@@ -0,0 +1,510 @@
+"""
+SQLite storage backend for local load testing and profiling.
+
+Each collection is a table of JSON documents (`id`, `data`). Fields used in
+queries are indexed with expression indexes on `json_extract(data, '$.field')`,
+which mirror the Firestore composite indexes the same queries need. The
+connection runs in WAL mode and is owned by a single worker thread so the
+event loop never blocks on disk I/O; all statements are parameterized so
+sqlite3's statement cache reuses the prepared statements.
+"""
+
+import asyncio
+import json
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from app.storage.base import (
+    ASCENDING,
+    DESCENDING,
+    MAX_TRANSACTION_ATTEMPTS,
+    Aggregation,
+    Document,
+    DocumentExistsError,
+    DocumentNotFoundError,
+    DocumentStore,
+    OrderBy,
+    R,
+    Transaction,
+    TransactionConflictError,
+    Where,
+    WriteBatch,
+    apply_fields,
+)
+
+# Rows fetched per worker thread round trip while streaming a query
+FETCH_SIZE = 500
+
+# Indexed fields per collection, in index column order
+INDEXES: Dict[str, List[Tuple[str, ...]]] = {
+    "users": [
+        ("email",),
+        ("created_at",),
+        ("role", "created_at"),
+        ("is_active", "created_at"),
+        ("is_premium",),
+        ("total_saved",),
+        ("last_deposit_at",),
+    ],
+    "vaults": [
+        ("is_active",),
+        ("is_active", "unlock_notified_at", "unlock_date"),
+        ("user_id", "created_at"),
+        ("user_id", "closed_at"),
+        ("user_id", "unlock_date"),
+        ("user_id", "is_active", "created_at"),
+    ],
+    "withdrawals": [
+        ("created_at",),
+        ("user_id", "created_at"),
+        ("user_id", "vault_id", "created_at"),
+        ("vault_id", "created_at"),
+    ],
+    "deposits": [
+        ("created_at",),
+        ("user_id", "created_at"),
+        ("user_id", "vault_id", "created_at"),
+        ("vault_id", "created_at"),
+    ],
+    "deposit_schedules": [
+        ("is_active", "next_run_at"),
+        ("user_id", "is_active", "created_at"),
+    ],
+    "email_queue": [
+        ("status", "available_at"),
+    ],
+    "stripe_events": [
+        ("status", "available_at"),
+    ],
+    "notifications": [
+        ("user_id", "created_at"),
+        ("user_id", "is_read", "created_at"),
+    ],
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def _identifier(name: str) -> str:
+    """Validate a collection or field name before it is interpolated into SQL."""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
+
+
+def _field(name: str) -> str:
+    return f"json_extract(data, '$.{_identifier(name)}')"
+
+
+def _param(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _where_sql(where: Sequence[Where]) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+
+    for field, op, value in where:
+        expr = _field(field)
+        if op == "in":
+            values = list(value)
+            clauses.append(f"{expr} IN ({', '.join('?' for _ in values)})")
+            params.extend(_param(v) for v in values)
+        elif op == "==" and value is None:
+            clauses.append(f"{expr} IS NULL")
+        elif op in _OPERATORS:
+            clauses.append(f"{expr} {_OPERATORS[op]} ?")
+            params.append(_param(value))
+        else:
+            raise ValueError(f"Unsupported operator: {op!r}")
+
+    sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return sql, params
+
+
+def _order_sql(order_by: Sequence[OrderBy]) -> str:
+    if not order_by:
+        return " ORDER BY id"
+
+    terms = [
+        f"{_field(field)} {'DESC' if direction == DESCENDING else 'ASC'}"
+        for field, direction in order_by
+    ]
+    # Firestore breaks ties on the document ID in the direction of the last ordering
+    terms.append(f"id {'DESC' if order_by[-1][1] == DESCENDING else 'ASC'}")
+    return f" ORDER BY {', '.join(terms)}"
+
+
+def _json_default(value: Any) -> Any:
+    # Timestamps (e.g. TTL fields, native in Firestore) are stored as ISO strings
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _cursor_sql(order_by: Sequence[OrderBy], start_after: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """Compare the sort key row value against a cursor (see `DocumentStore.query`)."""
+    directions = {direction for _, direction in order_by} or {ASCENDING}
+    if len(directions) > 1:
+        raise ValueError("Cursors require every order_by field to use the same direction")
+
+    columns = [_field(field) for field, _ in order_by] + ["id"]
+    if len(start_after) != len(columns):
+        raise ValueError(f"Cursor needs {len(columns)} values, got {len(start_after)}")
+
+    op = "<" if directions.pop() == DESCENDING else ">"
+    params = [_param(v) for v in start_after]
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"({', '.join(columns)}) {op} ({placeholders})"
+    if order_by:
+        # SQLite only seeks an index on a plain bound of its leading sort column
+        sql = f"{columns[0]} {op}= ? AND {sql}"
+        params.insert(0, params[0])
+    return sql, params
+
+
+class SQLiteWriteBatch(WriteBatch):
+    """Write batch applied in a single SQLite transaction."""
+
+    def __init__(self, store: "SQLiteStore"):
+        self._store = store
+        self._writes: List[Tuple[Callable[..., None], tuple]] = []
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        self._writes.append((self._store._apply_set, (collection, doc_id, data, merge)))
+
+    def create(self, collection: str, doc_id: str, data: dict) -> None:
+        self._writes.append((self._store._apply_create, (collection, doc_id, data)))
+
+    def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        self._writes.append((self._store._apply_update, (collection, doc_id, fields)))
+
+    def delete(self, collection: str, doc_id: str) -> None:
+        self._writes.append((self._store._apply_delete, (collection, doc_id)))
+
+    async def commit(self) -> None:
+        await self._store._run(self._store._apply_atomically, self._writes)
+
+
+class SQLiteTransaction(Transaction):
+    """
+    Optimistic transaction: remembers what it read and, on commit, applies
+    its writes only if none of those documents changed since.
+    """
+
+    def __init__(self, store: "SQLiteStore"):
+        self._store = store
+        self._reads: Dict[Tuple[str, str], Optional[str]] = {}
+        self._writes: List[Tuple[Callable[..., None], tuple]] = []
+
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        if self._writes:
+            raise ValueError("Transaction reads must happen before writes")
+        raw = await self._store._run(self._store._read_raw, collection, doc_id)
+        self._reads[(collection, doc_id)] = raw
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        self._writes.append((self._store._apply_set, (collection, doc_id, data, merge)))
+
+    def create(self, collection: str, doc_id: str, data: dict) -> None:
+        self._writes.append((self._store._apply_create, (collection, doc_id, data)))
+
+    def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        self._writes.append((self._store._apply_update, (collection, doc_id, fields)))
+
+    def delete(self, collection: str, doc_id: str) -> None:
+        self._writes.append((self._store._apply_delete, (collection, doc_id)))
+
+
+class SQLiteStore(DocumentStore):
+    """Document store backed by a local SQLite database."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:"):
+        super().__init__()
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._tables: set[str] = set()
+        # One thread owns the connection; the lock keeps multi-statement
+        # operations from interleaving on it.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-store")
+        self._lock = asyncio.Lock()
+        # Transactions run one at a time, like Firestore's pessimistic
+        # transactions; plain writes can still interleave and cause retries.
+        self._transaction_lock = asyncio.Lock()
+
+    # -- connection & schema (worker thread) --------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self._path,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=256,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn = conn
+        return self._conn
+
+    def _table(self, collection: str) -> str:
+        table = _identifier(collection)
+        if table not in self._tables:
+            conn = self._connection()
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" '
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID"
+            )
+            for fields in INDEXES.get(table, []):
+                index = f"ix_{table}_{'_'.join(fields)}"
+                columns = ", ".join(_field(f) for f in fields)
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "{index}" ON "{table}" ({columns})')
+            self._tables.add(table)
+        return table
+
+    def _read(self, table: str, doc_id: str) -> Optional[dict]:
+        row = self._connection().execute(
+            f'SELECT data FROM "{table}" WHERE id = ?', (doc_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _read_raw(self, collection: str, doc_id: str) -> Optional[str]:
+        row = self._connection().execute(
+            f'SELECT data FROM "{self._table(collection)}" WHERE id = ?', (doc_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, table: str, doc_id: str, data: dict) -> None:
+        self._connection().execute(
+            f'INSERT INTO "{table}" (id, data) VALUES (?, ?) '
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (doc_id, json.dumps(data, default=_json_default)),
+        )
+
+    def _apply_set(self, collection: str, doc_id: str, data: dict, merge: bool) -> None:
+        table = self._table(collection)
+        current = self._read(table, doc_id) if merge else None
+        self._write(table, doc_id, apply_fields(current, data))
+
+    def _apply_create(self, collection: str, doc_id: str, data: dict) -> None:
+        table = self._table(collection)
+        if self._read(table, doc_id) is not None:
+            raise DocumentExistsError(f"{collection}/{doc_id}")
+        self._write(table, doc_id, apply_fields(None, data))
+
+    def _apply_update(self, collection: str, doc_id: str, fields: dict) -> None:
+        table = self._table(collection)
+        current = self._read(table, doc_id)
+        if current is None:
+            raise DocumentNotFoundError(f"{collection}/{doc_id}")
+        self._write(table, doc_id, apply_fields(current, fields))
+
+    def _apply_delete(self, collection: str, doc_id: str) -> None:
+        table = self._table(collection)
+        self._connection().execute(f'DELETE FROM "{table}" WHERE id = ?', (doc_id,))
+
+    def _apply_atomically(
+        self,
+        writes: List[Tuple[Callable[..., None], tuple]],
+        reads: Optional[Dict[Tuple[str, str], Optional[str]]] = None,
+    ) -> bool:
+        """Apply writes in one SQLite transaction; False if a read document changed."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (collection, doc_id), raw in (reads or {}).items():
+                if self._read_raw(collection, doc_id) != raw:
+                    self._rollback()
+                    return False
+            for apply, args in writes:
+                apply(*args)
+        except BaseException:
+            self._rollback()
+            raise
+        conn.execute("COMMIT")
+        return True
+
+    def _rollback(self) -> None:
+        self._connection().execute("ROLLBACK")
+        # Tables created lazily inside the transaction are rolled back too
+        self._tables.clear()
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    # -- DocumentStore -------------------------------------------------------
+
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        def _get() -> Optional[dict]:
+            return self._read(self._table(collection), doc_id)
+
+        return await self._run(_get)
+
+    async def get_many(self, collection: str, doc_ids: Iterable[str]) -> Dict[str, dict]:
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if not doc_ids:
+            return {}
+
+        def _get_many() -> List[Tuple[str, str]]:
+            table = self._table(collection)
+            placeholders = ", ".join("?" for _ in doc_ids)
+            return self._connection().execute(
+                f'SELECT id, data FROM "{table}" WHERE id IN ({placeholders})', doc_ids
+            ).fetchall()
+
+        return {doc_id: json.loads(data) for doc_id, data in await self._run(_get_many)}
+
+    async def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        await self._run(self._apply_set, collection, doc_id, data, merge)
+
+    async def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        await self._run(self._apply_update, collection, doc_id, fields)
+
+    async def delete(self, collection: str, doc_id: str) -> None:
+        await self._run(self._apply_delete, collection, doc_id)
+
+    def batch(self) -> WriteBatch:
+        return SQLiteWriteBatch(self)
+
+    async def run_transaction(
+        self,
+        fn: Callable[[Transaction], Awaitable[R]],
+        max_attempts: int = MAX_TRANSACTION_ATTEMPTS,
+    ) -> R:
+        attempts = 0
+        committed = conflict = False
+        try:
+            async with self._transaction_lock:
+                while attempts < max_attempts:
+                    attempts += 1
+                    transaction = SQLiteTransaction(self)
+                    result = await fn(transaction)
+                    if await self._run(
+                        self._apply_atomically, transaction._writes, transaction._reads
+                    ):
+                        committed = True
+                        return result
+
+            conflict = True
+            raise TransactionConflictError(f"Transaction failed after {max_attempts} attempts")
+        finally:
+            self.transaction_metrics.record(attempts, committed, conflict)
+
+    def _select(
+        self,
+        collection: str,
+        where: Sequence[Where],
+        order_by: Sequence[OrderBy],
+        limit: Optional[int],
+        offset: int,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> Tuple[str, List[Any]]:
+        table = self._table(collection)
+        where_sql, params = _where_sql(where)
+        if start_after is not None:
+            cursor_sql, cursor_params = _cursor_sql(order_by, start_after)
+            where_sql += f" {'AND' if where_sql else 'WHERE'} {cursor_sql}"
+            params += cursor_params
+        sql = f'SELECT id, data FROM "{table}"{where_sql}{_order_sql(order_by)}'
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit if limit is not None else -1, offset]
+        return sql, params
+
+    async def query(
+        self,
+        collection: str,
+        where: Sequence[Where] = (),
+        order_by: Sequence[OrderBy] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> AsyncIterator[Document]:
+        def _query() -> sqlite3.Cursor:
+            sql, params = self._select(collection, where, order_by, limit, offset, start_after)
+            return self._connection().execute(sql, params)
+
+        # Rows are fetched a page at a time, so a full scan holds one page in
+        # memory, like a Firestore stream
+        cursor = await self._run(_query)
+        try:
+            while True:
+                rows: List[Tuple[str, str]] = await self._run(cursor.fetchmany, FETCH_SIZE)
+                for doc_id, data in rows:
+                    yield Document(doc_id, json.loads(data))
+                if len(rows) < FETCH_SIZE:
+                    break
+        finally:
+            await self._run(cursor.close)
+
+    async def aggregate(
+        self,
+        collection: str,
+        aggregations: Sequence[Aggregation],
+        where: Sequence[Where] = (),
+    ) -> Dict[str, Any]:
+        functions = {"count": "COUNT(*)", "sum": "TOTAL({})", "avg": "AVG({})"}
+        columns = []
+        for _, kind, field in aggregations:
+            if kind not in functions:
+                raise ValueError(f"Unsupported aggregation: {kind!r}")
+            columns.append(functions[kind].format(_field(field) if field else ""))
+
+        def _aggregate() -> Tuple[Any, ...]:
+            table = self._table(collection)
+            where_sql, params = _where_sql(where)
+            sql = f'SELECT {", ".join(columns)} FROM "{table}"{where_sql}'
+            return self._connection().execute(sql, params).fetchone()
+
+        row = await self._run(_aggregate)
+        return {alias: value for (alias, _, _), value in zip(aggregations, row, strict=True)}
+
+    async def explain(
+        self,
+        collection: str,
+        where: Sequence[Where] = (),
+        order_by: Sequence[OrderBy] = (),
+        limit: Optional[int] = None,
+        start_after: Optional[Sequence[Any]] = None,
+    ) -> List[str]:
+        """Return SQLite's query plan for a query (one line per step)."""
+        def _explain() -> List[str]:
+            sql, params = self._select(collection, where, order_by, limit, 0, start_after)
+            rows = self._connection().execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            return [row[-1] for row in rows]
+
+        return await self._run(_explain)
+
+    async def close(self) -> None:
+        def _close() -> None:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._tables.clear()
+
+        await self._run(_close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,98 @@
+"""
+Throughput benchmark for the async Firestore data layer.
+
+Drives `GET /api/v1/vaults/` through the ASGI app with N concurrent clients
+against a fake Firestore that adds a fixed latency to every round trip.
+
+- "blocking": the latency is paid with `time.sleep`, which is what calling the
+  synchronous `firestore.Client` from `async def` services used to do.
+- "async": the latency is paid with `asyncio.sleep`, like `AsyncClient`.
+
+Usage:
+    python -m benchmarks.async_firestore --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from app.api import deps
+from app.core import firebase
+from app.main import app
+from app.models.user import User
+from app.models.vault import Vault
+from app.storage import set_store
+from app.storage.firestore import FirestoreStore
+from benchmarks.fake_firestore import FakeAsyncClient
+
+USER_ID = "bench-user"
+
+
+def build_client(blocking: bool, latency: float) -> FakeAsyncClient:
+    """Create a fake client seeded with one user and a few vaults."""
+    client = FakeAsyncClient(latency=latency, blocking=blocking)
+    client.seed("users", USER_ID, User(id=USER_ID, email="bench@flexsave.app").to_dict())
+    for i in range(5):
+        vault = Vault(
+            user_id=USER_ID,
+            name=f"Vault {i}",
+            target_amount=1000,
+            unlock_date=date.today() + timedelta(days=30),
+        )
+        client.seed("vaults", f"vault-{i}", vault.to_dict())
+    return client
+
+
+async def fake_verify_token(token: str) -> dict:
+    return {"uid": USER_ID, "email": "bench@flexsave.app"}
+
+
+async def run(blocking: bool, requests: int, concurrency: int, latency: float) -> float:
+    """Run the load and return requests/sec."""
+    firebase._db = build_client(blocking, latency)
+    set_store(FirestoreStore())
+    deps.verify_firebase_token = fake_verify_token
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": "Bearer bench"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def one() -> None:
+            async with semaphore:
+                response = await http.get("/api/v1/vaults/", headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    firebase._db = None
+    set_store(None)
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    results = {}
+    for label, blocking in (("blocking (sync client)", True), ("async (AsyncClient)", False)):
+        results[label] = asyncio.run(run(blocking, args.requests, args.concurrency, latency))
+        print(f"{label:<24} {results[label]:8.1f} req/s")
+
+    before, after = results.values()
+    print(f"speedup: x{after / before:.1f} "
+          f"({args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.latency_ms:.1f} ms per round trip)")
+
+
+if __name__ == "__main__":
+    main()
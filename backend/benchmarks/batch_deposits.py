@@ -0,0 +1,126 @@
+"""
+Latency benchmark for splitting a deposit across several vaults.
+
+Drives the ASGI app (authentication included) against the SQLite backend,
+with a fixed latency added to every storage round trip to stand in for
+Firestore. Reports the latency of splitting one deposit across the vaults
+and the storage round trips it costs.
+
+- "individual, sequential": one `POST /vaults/{id}/deposit` per vault, one
+  after the other.
+- "individual, parallel": the same requests sent at once.
+- "batch": a single `POST /vaults/deposits:batch`.
+
+Usage:
+    python -m benchmarks.batch_deposits --vaults 5 --rounds 20 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, List
+
+import httpx
+
+from app.api import deps
+from app.main import app
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.storage import set_store
+from app.storage.sqlite import SQLiteStore
+
+USER_ID = "bench-user"
+
+
+class RemoteSQLiteStore(SQLiteStore):
+    """SQLite store paying a network round trip on every operation."""
+
+    def __init__(self, latency: float):
+        super().__init__(":memory:")
+        self.latency = latency
+        self.round_trips = 0
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+        return await super()._run(fn, *args)
+
+
+async def fake_verify_token(token: str) -> dict:
+    return {"uid": USER_ID, "email": "bench@flexsave.app"}
+
+
+async def timed(rounds: int, fn: Callable[[], Awaitable[None]]) -> List[float]:
+    """Run `fn` `rounds` times and return each latency in ms."""
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def run(vaults: int, rounds: int, latency: float) -> None:
+    store = RemoteSQLiteStore(latency)
+    set_store(store)
+    deps.verify_firebase_token = fake_verify_token
+    try:
+        await user_service.create("bench@flexsave.app", "Bench", USER_ID)
+        unlock = date.today() + timedelta(days=30)
+        ids = [
+            (await vault_service.create(USER_ID, f"Vault {i}", 10_000, unlock)).id
+            for i in range(vaults)
+        ]
+
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": "Bearer bench"}
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench/api/v1", headers=headers
+        ) as http:
+            async def deposit(vault_id: str) -> None:
+                response = await http.post(f"/vaults/{vault_id}/deposit", json={"amount": 10})
+                response.raise_for_status()
+
+            async def sequential() -> None:
+                for vault_id in ids:
+                    await deposit(vault_id)
+
+            async def parallel() -> None:
+                await asyncio.gather(*(deposit(vault_id) for vault_id in ids))
+
+            async def batch() -> None:
+                response = await http.post("/vaults/deposits:batch", json={
+                    "deposits": [{"vault_id": vault_id, "amount": 10} for vault_id in ids],
+                })
+                response.raise_for_status()
+
+            for label, fn in (
+                ("individual, sequential", sequential),
+                ("individual, parallel", parallel),
+                ("batch", batch),
+            ):
+                store.round_trips = 0
+                latencies = await timed(rounds, fn)
+                print(f"{label:<24} median {statistics.median(latencies):7.1f} ms  "
+                      f"max {max(latencies):7.1f} ms  "
+                      f"{store.round_trips / rounds:5.1f} round trips")
+    finally:
+        set_store(None)
+        await store.close()
+
+    print(f"({vaults} vaults, {rounds} rounds, {latency * 1000:.1f} ms per round trip)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vaults", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.vaults, args.rounds, args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Throughput benchmark for the email delivery pipeline.
+
+Queues emails in the SQLite backend and sends them to a local SMTP
+stand-in that delays its greeting to stand in for the TCP and TLS
+handshakes of a real server. Reports messages per second and SMTP
+connections opened.
+
+- "connection per email": what a naive sender does, one SMTP session per
+  email (`--workers` at once).
+- "pooled dispatcher": `EmailDispatcher` with `--workers` workers sharing
+  pooled connections, `--batch-size` emails per checkout.
+
+Usage:
+    python -m benchmarks.email_delivery --emails 1000 --workers 4 --handshake-ms 50
+"""
+
+import argparse
+import asyncio
+import smtplib
+import time
+
+from app.core.smtp import SMTPPool
+from app.repositories.email_queue import email_queue_repository
+from app.services.email_dispatcher import EmailDispatcher, build_message
+from app.services.email_service import email_service
+from app.storage import set_store
+from app.storage.sqlite import SQLiteStore
+from tests.smtp_server import LocalSMTPServer
+
+
+async def queue(emails: int) -> list:
+    return [
+        await email_service.queue(f"user{i}@flexsave.app", "welcome", {"user_name": f"User {i}"})
+        for i in range(emails)
+    ]
+
+
+async def connection_per_email(server: LocalSMTPServer, emails: list, workers: int) -> None:
+    slots = asyncio.Semaphore(workers)
+
+    def send(email) -> None:
+        with smtplib.SMTP("127.0.0.1", server.port) as connection:
+            connection.send_message(build_message(email))
+
+    async def bounded(email) -> None:
+        async with slots:
+            await asyncio.to_thread(send, email)
+
+    await asyncio.gather(*(bounded(email) for email in emails))
+
+
+async def pooled(server: LocalSMTPServer, workers: int, batch_size: int) -> None:
+    pool = SMTPPool("127.0.0.1", server.port, starttls=False, size=workers)
+    dispatcher = EmailDispatcher(pool, workers=workers, batch_size=batch_size, queue_size=250)
+    dispatcher.start()
+    while await email_queue_repository.list_pending(1):
+        if not await dispatcher.poll():
+            await asyncio.sleep(0.005)
+    await dispatcher.drain()
+    await dispatcher.stop()
+
+
+async def run(emails: int, workers: int, batch_size: int, handshake: float) -> None:
+    for label in ("connection per email", "pooled dispatcher"):
+        store = SQLiteStore(":memory:")
+        set_store(store)
+        server = await LocalSMTPServer(greeting_delay=handshake).start()
+        try:
+            queued = await queue(emails)
+            start = time.perf_counter()
+            if label == "pooled dispatcher":
+                await pooled(server, workers, batch_size)
+            else:
+                await connection_per_email(server, queued, workers)
+            elapsed = time.perf_counter() - start
+        finally:
+            await server.stop()
+            set_store(None)
+            await store.close()
+
+        assert len(server.messages) == emails
+        print(f"{label:<22} {emails / elapsed:8.0f} msg/s  "
+              f"{elapsed:6.2f} s  {server.connections:5d} connections")
+
+    print(f"({emails} emails, {workers} workers, batches of {batch_size}, "
+          f"{handshake * 1000:.0f} ms handshake)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--handshake-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.emails, args.workers, args.batch_size, args.handshake_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Micro-benchmark for email template rendering.
+
+Compares the compiled templates of `app.services.email_templates` with
+the f-string functions they replaced (kept below as the baseline), per
+email: render time (best of `--repeat` runs) and memory allocated while
+rendering (tracemalloc: allocated blocks and peak bytes).
+
+Usage:
+    python -m benchmarks.email_templates --emails 100000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from typing import Callable, Tuple
+
+from app.services.email_templates import get_template
+
+# Baseline: the pre-compilation templates, verbatim
+
+def legacy_deposit_email(user_name: str, vault_name: str, amount: float, new_total: float) -> tuple[str, str]:
+    """Deposit confirmation email."""
+    subject = f"Dépôt confirmé : {amount:.2f} € 💰"
+    
+    body = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: #10B981; padding: 30px; text-align: center; border-radius: 12px 12px 0 0; }}
+        .header h1 {{ color: white; margin: 0; font-size: 24px; }}
+        .content {{ background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; }}
+        .amount {{ font-size: 48px; font-weight: bold; color: #10B981; text-align: center; margin: 20px 0; }}
+        .info {{ background: #f0fdf4; padding: 20px; border-radius: 8px; margin: 20px 0; }}
+        .footer {{ text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>✅ Dépôt effectué</h1>
+        </div>
+        <div class="content">
+            <p>Bonjour {user_name},</p>
+            <p class="amount">+{amount:.2f} €</p>
+            <div class="info">
+                <p><strong>Coffre :</strong> {vault_name}</p>
+                <p><strong>Nouveau solde :</strong> {new_total:.2f} €</p>
+            </div>
+            <p>Bravo ! Chaque dépôt vous rapproche de vos objectifs. 🎯</p>
+        </div>
+        <div class="footer">
+            <p>© 2025 FlexSave</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+    return subject, body
+
+
+def legacy_vault_unlocked_email(user_name: str, vault_name: str, amount: float) -> tuple[str, str]:
+    """Vault unlocked email."""
+    subject = f"🎉 Coffre débloqué : {vault_name}"
+    
+    body = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f8fafc; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: linear-gradient(135deg, #8b5cf6, #6366f1); padding: 40px; text-align: center; border-radius: 12px 12px 0 0; }}
+        .header h1 {{ color: white; margin: 0; font-size: 28px; }}
+        .content {{ background: white; padding: 40px 30px; border-radius: 0 0 12px 12px; text-align: center; }}
+        .amount {{ font-size: 48px; font-weight: bold; color: #10B981; margin: 20px 0; }}
+        .button {{ display: inline-block; background: #10B981; color: white; padding: 14px 28px; text-decoration: none; border-radius: 8px; font-weight: 600; }}
+        .footer {{ text-align: center; padding: 20px; color: #9ca3af; font-size: 14px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🎉 Félicitations !</h1>
+        </div>
+        <div class="content">
+            <p style="font-size: 18px; color: #374151;">Bonjour {user_name},</p>
+            <p style="font-size: 20px; color: #6b7280;">Votre coffre <strong>{vault_name}</strong> est maintenant débloqué !</p>
+            <p class="amount">{amount:.2f} €</p>
+            <p style="color: #6b7280;">disponibles sans frais</p>
+            <p style="margin-top: 30px;">
+                <a href="https://flexsave.com/dashboard/vaults" class="button">Voir mon coffre</a>
+            </p>
+        </div>
+        <div class="footer">
+            <p>© 2025 FlexSave</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+    return subject, body
+
+
+CASES = {
+    "deposit": (
+        lambda: legacy_deposit_email("Awa Diallo", "Vacances", 25.0, 1250.5),
+        {"user_name": "Awa Diallo", "vault_name": "Vacances", "amount": 25.0, "new_total": 1250.5},
+    ),
+    "vault_unlocked": (
+        lambda: legacy_vault_unlocked_email("Awa Diallo", "Vacances", 1250.5),
+        {"user_name": "Awa Diallo", "vault_name": "Vacances", "amount": 1250.5},
+    ),
+}
+
+
+def per_email_us(fn: Callable[[], object], emails: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=emails, repeat=repeat)) / emails * 1e6
+
+
+def allocations(fn: Callable[[], object], emails: int) -> Tuple[float, int]:
+    """Blocks allocated per email and peak traced bytes while rendering."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    kept = [fn() for _ in range(emails)]
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return blocks / emails, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'template':<16}{'renderer':<10}{'µs/email':>10}{'blocks/email':>14}{'peak MB':>10}")
+    for name, (legacy, params) in CASES.items():
+        template = get_template(name)
+        compiled = lambda template=template, params=params: template.render(params)  # noqa: E731
+        assert legacy()[0] == compiled()[0]
+        for label, fn in (("f-string", legacy), ("compiled", compiled)):
+            micros = per_email_us(fn, args.emails, args.repeat)
+            blocks, peak = allocations(fn, min(args.emails, 10_000))
+            print(f"{name:<16}{label:<10}{micros:>10.2f}{blocks:>14.1f}{peak / 1e6:>10.1f}")
+    print(f"({args.emails} renders per run, allocations over {min(args.emails, 10_000)} kept emails)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+In-memory stand-in for the async Firestore client.
+
+Only the subset of the `google.cloud.firestore.AsyncClient` API used by the
+services is implemented. Every round trip waits `latency` seconds, either
+with `asyncio.sleep` (a real async client) or `time.sleep` (a synchronous
+client called from async code, i.e. the event loop is blocked).
+"""
+
+import asyncio
+import secrets
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class FakeSnapshot:
+    """Document snapshot."""
+
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[dict]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[dict]:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    """Document reference."""
+
+    def __init__(self, client: "FakeAsyncClient", collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def _docs(self) -> Dict[str, dict]:
+        return self._client.data.setdefault(self._collection, {})
+
+    async def get(self, **kwargs: Any) -> FakeSnapshot:
+        await self._client.round_trip()
+        return FakeSnapshot(self, self._docs.get(self.id))
+
+    async def set(self, data: dict, merge: bool = False) -> None:
+        await self._client.round_trip()
+        if merge and self.id in self._docs:
+            self._docs[self.id].update(data)
+        else:
+            self._docs[self.id] = dict(data)
+
+    async def update(self, data: dict) -> None:
+        await self._client.round_trip()
+        if self.id not in self._docs:
+            raise KeyError(f"No document to update: {self._collection}/{self.id}")
+        self._docs[self.id].update(data)
+
+
+class FakeQuery:
+    """Query supporting equality filters, a single order_by and limit."""
+
+    def __init__(
+        self,
+        client: "FakeAsyncClient",
+        collection: str,
+        filters: tuple = (),
+        order: Optional[tuple] = None,
+        limit_: Optional[int] = None,
+    ):
+        self._client = client
+        self._collection = collection
+        self._filters = filters
+        self._order = order
+        self._limit = limit_
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None,
+              value: Any = None, *, filter: Any = None) -> "FakeQuery":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string != "==":
+            raise NotImplementedError(op_string)
+        return FakeQuery(self._client, self._collection,
+                         self._filters + ((field_path, value),), self._order, self._limit)
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return FakeQuery(self._client, self._collection, self._filters,
+                         (field_path, direction == "DESCENDING"), self._limit)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return FakeQuery(self._client, self._collection, self._filters, self._order, count)
+
+    async def stream(self) -> AsyncIterator[FakeSnapshot]:
+        await self._client.round_trip()
+        docs = self._client.data.get(self._collection, {})
+        matches = [
+            (doc_id, data) for doc_id, data in docs.items()
+            if all(data.get(field) == value for field, value in self._filters)
+        ]
+        if self._order:
+            field, descending = self._order
+            matches.sort(key=lambda item: item[1].get(field), reverse=descending)
+        if self._limit is not None:
+            matches = matches[:self._limit]
+        for doc_id, data in matches:
+            ref = FakeDocumentReference(self._client, self._collection, doc_id)
+            yield FakeSnapshot(ref, data)
+
+
+class FakeCollectionReference(FakeQuery):
+    """Collection reference."""
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(
+            self._client, self._collection, document_id or secrets.token_hex(10)
+        )
+
+
+class FakeAsyncClient:
+    """Fake async Firestore client with a fixed per-round-trip latency."""
+
+    def __init__(self, latency: float = 0.005, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.round_trips = 0
+        self.data: Dict[str, Dict[str, dict]] = {}
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def seed(self, collection: str, doc_id: str, data: dict) -> None:
+        """Insert a document without paying latency."""
+        self.data.setdefault(collection, {})[doc_id] = dict(data)
+
+    def documents(self, collection: str) -> List[dict]:
+        return list(self.data.get(collection, {}).values())
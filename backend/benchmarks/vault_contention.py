@@ -0,0 +1,84 @@
+"""
+Contention benchmark for vault balance updates.
+
+Runs many concurrent deposits, then concurrent withdrawals, against one
+vault on the SQLite backend. Reports throughput, the final balance check
+and the transaction retry metrics.
+
+- "read-modify-write": the former deposit (read the vault, add in Python,
+  write the new balance), which loses concurrent deposits.
+- "increment": `VaultService.deposit`, a server-side increment.
+- "transaction": `WithdrawalService.create`, a transaction with retries.
+
+Usage:
+    python -m benchmarks.vault_contention --deposits 500 --withdrawals 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app.repositories.vaults import vault_repository
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.services.withdrawal_service import withdrawal_service
+from app.storage import set_store
+from app.storage.sqlite import SQLiteStore
+
+
+async def read_modify_write_deposit(vault_id: str, amount: float) -> None:
+    vault = await vault_repository.get(vault_id)
+    await vault_repository.update(vault_id, current_amount=vault.current_amount + amount)
+
+
+async def timed(label: str, calls: list) -> None:
+    start = time.perf_counter()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = sum(isinstance(r, Exception) for r in results)
+    print(f"{label:<20} {len(calls) / elapsed:8.0f} ops/s  ({errors} rejected)")
+
+
+async def run(deposits: int, withdrawals: int) -> None:
+    store = SQLiteStore(":memory:")
+    set_store(store)
+    try:
+        await user_service.create("bench@flexsave.app", "Bench", "bench-user")
+        unlock = date.today() - timedelta(days=1)
+
+        legacy = await vault_service.create("bench-user", "Legacy", 0, unlock)
+        await timed("read-modify-write", [
+            read_modify_write_deposit(legacy.id, 1) for _ in range(deposits)
+        ])
+        balance = (await vault_repository.get(legacy.id)).current_amount
+        print(f"{'':<20} balance {balance:g} / {deposits} expected")
+
+        vault = await vault_service.create("bench-user", "Bench", 0, unlock)
+        await timed("increment", [vault_service.deposit(vault, 1) for _ in range(deposits)])
+        balance = (await vault_repository.get(vault.id)).current_amount
+        print(f"{'':<20} balance {balance:g} / {deposits} expected")
+
+        # Deposits keep landing while withdrawals run, forcing transaction retries
+        calls = []
+        for _ in range(withdrawals):
+            calls += [withdrawal_service.create("bench-user", vault.id, 1), vault_service.deposit(vault, 1)]
+        await timed("transaction", calls)
+        balance = (await vault_repository.get(vault.id)).current_amount
+        print(f"{'':<20} balance {balance:g} / {deposits} expected")
+        print(f"transactions: {store.transaction_metrics.stats()}")
+    finally:
+        set_store(None)
+        await store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deposits", type=int, default=500)
+    parser.add_argument("--withdrawals", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.deposits, args.withdrawals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Load test for the Stripe webhook endpoint.
+
+Posts thousands of signed events (subscriptions created and cancelled,
+payments) spread over `--customers` customers, with a share of Stripe
+redeliveries, to a local instance served by uvicorn over HTTP. The
+instance runs on the SQLite backend with a fixed latency added to every
+storage round trip to stand in for Firestore. Reports acknowledgement
+latency, requests per second and how long the background workers take
+to process everything.
+
+- "inline processing": a benchmark-only route that applies each event
+  before replying, as the endpoint used to.
+- "fast ack": `POST /webhooks/stripe`, which only stores the event; the
+  `WebhookProcessor` of the instance applies it. The SQLite backend runs
+  transactions one at a time, so the processing time reported is an upper
+  bound of what Firestore achieves.
+
+With `--url`, only the fast ack phase is run, against a running instance
+(its STRIPE_WEBHOOK_SECRET must be passed with `--secret`); events for
+customers it does not know are stored and ignored.
+
+Usage:
+    python -m benchmarks.webhook_load --events 2000 --customers 200 --latency-ms 20
+    python -m benchmarks.webhook_load --url http://localhost:8000 --secret whsec_...
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import httpx
+import stripe
+import uvicorn
+from fastapi import Header, HTTPException, Request
+
+from app.core.config import settings
+from app.main import app
+from app.models.stripe_customer import StripeCustomer
+from app.models.user import User
+from app.repositories.stripe_customers import stripe_customer_repository
+from app.repositories.stripe_events import stripe_event_repository
+from app.repositories.users import user_repository
+from app.services.webhook_service import webhook_service
+from app.storage import set_store
+from benchmarks.batch_deposits import RemoteSQLiteStore
+from tests.stripe_events import sign, stripe_event
+
+SECRET = "whsec_bench"
+INLINE_PATH = "/bench/stripe-inline"
+
+
+@app.post(INLINE_PATH, include_in_schema=False)
+async def inline_webhook(request: Request, stripe_signature: str = Header(alias="Stripe-Signature")):
+    """Verify, store and apply an event before replying."""
+    payload = await request.body()
+    try:
+        stripe.Webhook.construct_event(payload, stripe_signature, settings.STRIPE_WEBHOOK_SECRET)
+    except (ValueError, stripe.error.SignatureVerificationError):
+        raise HTTPException(status_code=400, detail="Invalid signature")
+    event = json.loads(payload)
+    if not await webhook_service.receive(event):
+        return {"received": True, "duplicate": True}
+    await webhook_service.process(await stripe_event_repository.get(event["id"]))
+    return {"received": True}
+
+
+def build_events(events: int, customers: int, duplicates: float) -> List[dict]:
+    """A shuffled stream of events, with redeliveries of a `duplicates` share."""
+    now = int(time.time())
+    stream = []
+    for i in range(events):
+        n = i % customers
+        kind = random.choice(("sub", "sub", "pay"))
+        if kind == "sub":
+            event_type = random.choice(("customer.subscription.created", "customer.subscription.deleted"))
+            data = {"customer": f"cus_{n}"}
+        else:
+            event_type = "payment_intent.succeeded"
+            data = {"amount": random.randint(500, 5000), "metadata": {"user_id": f"user-{n}"}}
+        stream.append(stripe_event(event_type, data, created=now - events + i))
+    stream += random.sample(stream, int(events * duplicates))
+    random.shuffle(stream)
+    return stream
+
+
+async def post_all(
+    http: httpx.AsyncClient, path: str, stream: List[dict], secret: str, concurrency: int
+) -> Tuple[List[float], Counter, float]:
+    """Post the events `concurrency` at a time; return latencies (ms), replies and elapsed s."""
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    replies: Counter = Counter()
+
+    async def post(event: dict) -> None:
+        body, headers = sign(event, secret)
+        async with slots:
+            start = time.perf_counter()
+            response = await http.post(path, content=body, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        replies["duplicate" if response.json().get("duplicate") else "stored"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post(event) for event in stream))
+    return latencies, replies, time.perf_counter() - start
+
+
+def report(label: str, latencies: List[float], replies: Counter, elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{label:<18} {len(latencies) / elapsed:7.0f} req/s  "
+          f"p50 {quantiles[49]:7.1f} ms  p99 {quantiles[98]:7.1f} ms  "
+          f"max {max(latencies):7.1f} ms  ({replies['stored']} stored, {replies['duplicate']} duplicates)")
+
+
+async def wait_processed(timeout: float = 600.0) -> Optional[float]:
+    """Wait until no stored event is pending; return how long it took (s)."""
+    start = time.perf_counter()
+    while await stripe_event_repository.count([("status", "==", "pending")]):
+        if time.perf_counter() - start > timeout:
+            return None
+        await asyncio.sleep(0.05)
+    return time.perf_counter() - start
+
+
+async def local(events: int, customers: int, duplicates: float, concurrency: int, latency: float) -> None:
+    settings.STRIPE_WEBHOOK_SECRET = SECRET
+    settings.WEBHOOK_POLL_SECONDS = 0.05
+    stream = build_events(events, customers, duplicates)
+
+    for label, path in (("inline processing", INLINE_PATH), ("fast ack", "/api/v1/webhooks/stripe")):
+        store = RemoteSQLiteStore(latency)
+        set_store(store)
+        for n in range(customers):
+            await user_repository.save(User(id=f"user-{n}", email=f"user{n}@flexsave.app",
+                                            stripe_customer_id=f"cus_{n}"))
+            await stripe_customer_repository.save(StripeCustomer(id=f"cus_{n}", user_id=f"user-{n}"))
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        serving = asyncio.create_task(server.serve(sockets=[sock]))
+        while not server.started:
+            await asyncio.sleep(0.01)
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        try:
+            async with httpx.AsyncClient(base_url=url, timeout=60) as http:
+                report(label, *await post_all(http, path, stream, SECRET, concurrency))
+            processing = await wait_processed()
+            outcomes = Counter(e.outcome for e in await stripe_event_repository.find())
+        finally:
+            server.should_exit = True
+            await serving
+            set_store(None)
+
+        if label == "fast ack":
+            print(f"{'':<18} all processed {processing:.1f} s after the last ack: {dict(outcomes)}")
+
+    print(f"({len(stream)} requests, {events} events, {customers} customers, "
+          f"{concurrency} concurrent, {latency * 1000:.0f} ms per storage round trip)")
+
+
+async def remote(url: str, secret: str, events: int, customers: int, duplicates: float, concurrency: int) -> None:
+    stream = build_events(events, customers, duplicates)
+    async with httpx.AsyncClient(base_url=url, timeout=60) as http:
+        report("fast ack", *await post_all(http, "/api/v1/webhooks/stripe", stream, secret, concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of events redelivered")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--url", help="target a running instance instead")
+    parser.add_argument("--secret", default=SECRET, help="webhook secret of the --url instance")
+    args = parser.parse_args()
+    if args.url:
+        asyncio.run(remote(args.url, args.secret, args.events, args.customers, args.duplicates, args.concurrency))
+    else:
+        asyncio.run(local(args.events, args.customers, args.duplicates, args.concurrency,
+                          args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
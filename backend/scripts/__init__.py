@@ -0,0 +1 @@
+"""Operational commands for FlexSave backend."""
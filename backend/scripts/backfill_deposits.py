@@ -0,0 +1,83 @@
+"""
+Backfill the deposit ledger from the vault balances.
+
+Deposits made before the ledger existed left no record. For each vault,
+the money deposited is its balance plus everything withdrawn from it;
+whatever the existing deposit records do not account for is written as
+one `backfill` deposit dated at the vault's creation. Running it again
+only adds the difference, so it is safe to re-run.
+
+Usage:
+    python -m scripts.backfill_deposits [--dry-run]
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from typing import Dict
+
+from app.models.deposit import Deposit, DepositSource
+from app.repositories.deposits import deposit_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.storage import close_store, get_store
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+
+
+async def backfill(dry_run: bool) -> None:
+    try:
+        withdrawn: Dict[str, float] = defaultdict(float)
+        async for withdrawal in withdrawal_repository.stream():
+            withdrawn[withdrawal.vault_id] += withdrawal.amount
+
+        deposited: Dict[str, float] = defaultdict(float)
+        async for deposit in deposit_repository.stream():
+            deposited[deposit.vault_id] += deposit.amount
+
+        batch, pending, missing_total, count = get_store().batch(), 0, 0.0, 0
+        async for vault in vault_repository.stream():
+            missing = round(vault.current_amount + withdrawn[vault.id] - deposited[vault.id], 2)
+            if missing <= 0:
+                continue
+
+            count += 1
+            missing_total += missing
+            print(f"{vault.id:<24} {vault.user_id:<30} +{missing:g}")
+            if dry_run:
+                continue
+
+            await deposit_repository.add(
+                Deposit(
+                    user_id=vault.user_id,
+                    vault_id=vault.id,
+                    amount=missing,
+                    source=DepositSource.BACKFILL,
+                    created_at=vault.created_at,
+                ),
+                batch,
+            )
+            pending += 1
+            if pending == BATCH_SIZE:
+                await batch.commit()
+                batch, pending = get_store().batch(), 0
+
+        if pending:
+            await batch.commit()
+    finally:
+        await close_store()
+
+    verb = "to backfill" if dry_run else "backfilled"
+    print(f"{count} vault(s) {verb}, {missing_total:g} in total.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill the deposit ledger.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the changes")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Backfill `users.last_deposit_at`, the field the encouragement campaign pages through.
+
+Deposits maintain the field, and new users start with it at their signup.
+Users created before it have none and are invisible to the campaign. For
+each of them, this writes the latest of their deposit records and of the
+`updated_at` of their funded vaults (deposits made before the ledger left
+only that trace; a withdrawal moves it too, so a user may be encouraged a
+little late, never early), or their signup if they never deposited. Users
+who already have the field are left alone, so it is safe to re-run.
+
+Run `scripts.backfill_deposits` first so the ledger is complete.
+
+Usage:
+    python -m scripts.backfill_last_deposit_at [--dry-run]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Dict
+
+from app.repositories.deposits import deposit_repository
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.storage import close_store, get_store
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+
+
+def _later(latest: Dict[str, datetime], user_id: str, at: datetime) -> None:
+    if user_id not in latest or at > latest[user_id]:
+        latest[user_id] = at
+
+
+async def backfill(dry_run: bool) -> None:
+    try:
+        latest: Dict[str, datetime] = {}
+        async for deposit in deposit_repository.stream():
+            _later(latest, deposit.user_id, deposit.created_at)
+        async for vault in vault_repository.stream():
+            if vault.current_amount > 0 and vault.updated_at:
+                _later(latest, vault.user_id, vault.updated_at)
+
+        batch, pending, count, never = get_store().batch(), 0, 0, 0
+        async for user in user_repository.stream():
+            if user.last_deposit_at:
+                continue
+
+            last_deposit_at = latest.get(user.id)
+            if last_deposit_at is None:
+                # Never deposited: inactive since signup
+                last_deposit_at = user.created_at
+                never += 1
+            count += 1
+            print(f"{user.id:<30} {last_deposit_at.isoformat()}")
+            if dry_run:
+                continue
+
+            await user_repository.update(user.id, batch, last_deposit_at=last_deposit_at.isoformat())
+            pending += 1
+            if pending == BATCH_SIZE:
+                await batch.commit()
+                batch, pending = get_store().batch(), 0
+
+        if pending:
+            await batch.commit()
+    finally:
+        await close_store()
+
+    verb = "to backfill" if dry_run else "backfilled"
+    print(f"{count} user(s) {verb}, {never} of them from their signup.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill users.last_deposit_at.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the changes")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Backfill the `stripe_customers` mapping from `users.stripe_customer_id`.
+
+Webhooks find the user of a Stripe customer through `stripe_customers`,
+which is written whenever a customer is recorded on a user. Run this once
+for users whose customer was recorded before the mapping existed; it only
+writes the missing entries.
+
+Usage:
+    python -m scripts.backfill_stripe_customers [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from app.models.stripe_customer import StripeCustomer
+from app.repositories.stripe_customers import stripe_customer_repository
+from app.repositories.users import user_repository
+from app.storage import close_store, get_store
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+
+
+async def backfill(dry_run: bool) -> None:
+    try:
+        mapped = {customer.id async for customer in stripe_customer_repository.stream()}
+
+        batch, pending, missing = get_store().batch(), 0, 0
+        async for user in user_repository.stream():
+            if not user.stripe_customer_id or user.stripe_customer_id in mapped:
+                continue
+
+            missing += 1
+            print(f"{user.stripe_customer_id:<30} -> {user.id}")
+            if dry_run:
+                continue
+
+            await stripe_customer_repository.save(
+                StripeCustomer(id=user.stripe_customer_id, user_id=user.id), batch
+            )
+            pending += 1
+            if pending == BATCH_SIZE:
+                await batch.commit()
+                batch, pending = get_store().batch(), 0
+
+        if pending:
+            await batch.commit()
+    finally:
+        await close_store()
+
+    print(f"{missing} customer(s) {'to map' if dry_run else 'mapped'}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill the stripe_customers mapping.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the changes")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Backfill `users.total_saved` from the vault balances.
+
+Deposits and withdrawals keep `total_saved` up to date on each user. Run
+this once for users created before the field existed, or to repair drift.
+Run it while no deposits or withdrawals are in flight, since it overwrites
+the field with values computed from a single scan.
+
+Usage:
+    python -m scripts.backfill_total_saved [--dry-run]
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from typing import Dict
+
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.storage import close_store, get_store
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+
+
+async def backfill(dry_run: bool) -> None:
+    try:
+        totals: Dict[str, float] = defaultdict(float)
+        async for vault in vault_repository.stream():
+            totals[vault.user_id] += vault.current_amount
+
+        batch, pending, changed = get_store().batch(), 0, 0
+        async for user in user_repository.stream():
+            expected = round(totals.get(user.id, 0.0), 2)
+            if abs(user.total_saved - expected) < 0.005:
+                continue
+
+            changed += 1
+            print(f"{user.id:<30} {user.total_saved:>12g} -> {expected:g}")
+            if dry_run:
+                continue
+
+            await user_repository.update(user.id, batch, total_saved=expected)
+            pending += 1
+            if pending == BATCH_SIZE:
+                await batch.commit()
+                batch, pending = get_store().batch(), 0
+
+        if pending:
+            await batch.commit()
+    finally:
+        await close_store()
+
+    print(f"{changed} user(s) {'to update' if dry_run else 'updated'}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill users.total_saved.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the changes")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Backfill `vaults.unlock_notified_at` as null where the field is missing.
+
+The unlock sweep only reads vaults whose `unlock_notified_at` is null, and
+Firestore's `== null` filter does not match documents without the field.
+Run this once for vaults created before the field existed, before
+deploying the sweep that filters on it.
+
+Usage:
+    python -m scripts.backfill_unlock_notified [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from app.repositories.vaults import vault_repository
+from app.storage import close_store, get_store
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+
+
+async def backfill(dry_run: bool) -> None:
+    try:
+        store = get_store()
+        batch, pending, missing = store.batch(), 0, 0
+        async for doc in store.query(vault_repository.COLLECTION):
+            if "unlock_notified_at" in doc.data:
+                continue
+
+            missing += 1
+            if dry_run:
+                continue
+
+            await vault_repository.update(doc.id, batch, unlock_notified_at=None)
+            pending += 1
+            if pending == BATCH_SIZE:
+                await batch.commit()
+                batch, pending = store.batch(), 0
+
+        if pending:
+            await batch.commit()
+    finally:
+        await close_store()
+
+    print(f"{missing} vault(s) {'to update' if dry_run else 'updated'}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill vaults.unlock_notified_at.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the changes")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
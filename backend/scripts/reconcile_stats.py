@@ -0,0 +1,42 @@
+"""
+Rebuild the platform counters from the source collections.
+
+Compares the incrementally maintained counter shards with a full
+recomputation, then overwrites the shards with the recomputed totals.
+
+Usage:
+    python -m scripts.reconcile_stats [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from app.services.stats_service import COUNTERS, stats_service
+from app.storage import close_store
+
+
+async def reconcile(dry_run: bool) -> None:
+    try:
+        current = await stats_service.get_totals()
+        expected = await stats_service.compute() if dry_run else await stats_service.rebuild()
+    finally:
+        await close_store()
+
+    for name in COUNTERS:
+        drift = expected[name] - current[name]
+        marker = f"  (drift {drift:+g})" if drift else ""
+        print(f"{name:<22} {current[name]:>14g} -> {expected[name]:<14g}{marker}".rstrip())
+
+    if dry_run:
+        print("Dry run: counters left unchanged.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the platform counters.")
+    parser.add_argument("--dry-run", action="store_true", help="only report the drift")
+    args = parser.parse_args()
+    asyncio.run(reconcile(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Replay Stripe webhook events.
+
+- `--failed`: put the stored events that exhausted their attempts back in
+  the queue (e.g. after fixing the bug or outage that failed them).
+- `--event evt_...`: put given stored events back in the queue, even
+  processed ones: applying an event again notifies nobody twice.
+- `--since 2026-01-31`: fetch the events Stripe created since then from
+  the Stripe API and store those never received (e.g. while the endpoint
+  was down). Events already stored are skipped.
+
+Replayed events are processed by the API instances' `WebhookProcessor`.
+
+Usage:
+    python -m scripts.replay_stripe_events --failed
+    python -m scripts.replay_stripe_events --event evt_1 evt_2
+    python -m scripts.replay_stripe_events --since 2026-01-31 [--type customer.subscription.created]
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime
+from typing import List, Optional
+
+import stripe
+
+from app.core.config import settings
+from app.repositories.stripe_events import stripe_event_repository
+from app.services.webhook_service import webhook_service
+from app.storage import close_store
+
+
+async def requeue_failed() -> None:
+    requeued = 0
+    while failed := await stripe_event_repository.list_failed(500):
+        for event in failed:
+            requeued += await webhook_service.requeue(event.id)
+    print(f"{requeued} failed events requeued.")
+
+
+async def requeue(event_ids: List[str]) -> None:
+    for event_id in event_ids:
+        found = await webhook_service.requeue(event_id)
+        print(f"{event_id}: {'requeued' if found else 'not stored'}")
+
+
+async def fetch(since: date, types: Optional[List[str]]) -> None:
+    stripe.api_key = settings.STRIPE_API_KEY
+    params = {"created": {"gte": int(datetime.combine(since, datetime.min.time()).timestamp())}, "limit": 100}
+    if types:
+        params["types"] = types
+
+    stored = skipped = 0
+    for event in stripe.Event.list(**params).auto_paging_iter():
+        if await webhook_service.receive(event.to_dict()):
+            stored += 1
+        else:
+            skipped += 1
+    print(f"{stored} missed events stored, {skipped} already received.")
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        if args.failed:
+            await requeue_failed()
+        elif args.event:
+            await requeue(args.event)
+        else:
+            await fetch(args.since, args.type)
+    finally:
+        await close_store()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay Stripe webhook events.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--failed", action="store_true", help="requeue the failed events")
+    mode.add_argument("--event", nargs="+", help="requeue these stored events")
+    mode.add_argument("--since", type=date.fromisoformat, help="store the events missed since this day")
+    parser.add_argument("--type", action="append", help="with --since: only events of this type (repeatable)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Run (or resume) the day's encouragement campaign.
+
+The API instances already do this every `ENCOURAGEMENT_INTERVAL_SECONDS`;
+use this to run it from a cron job instead (with the interval set to 0) or
+to finish an interrupted run by hand. Safe to run alongside the instances:
+each user is encouraged at most once per run.
+
+Usage:
+    python -m scripts.run_campaign [--date 2026-01-31] [--page-size 500]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from app.services.campaign_service import campaign_service
+from app.storage import close_store
+
+
+async def run(today: date, page_size: int) -> None:
+    start = time.perf_counter()
+    try:
+        outcomes = await campaign_service.run_encouragement(today, page_size)
+    finally:
+        await close_store()
+
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+    print(f"{summary or 'Nothing to do'} in {elapsed:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the encouragement campaign.")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(),
+                        help="run of this day (default: today)")
+    parser.add_argument("--page-size", type=int, default=500, help="users read per page")
+    args = parser.parse_args()
+    asyncio.run(run(args.date, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
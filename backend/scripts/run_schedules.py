@@ -0,0 +1,42 @@
+"""
+Run the recurring deposits that are due.
+
+The API instances already do this every `SCHEDULER_INTERVAL_SECONDS`; use
+this to run them from a cron job instead (with the interval set to 0) or
+to catch up by hand. Safe to run alongside the instances: each schedule is
+run at most once per due date.
+
+Usage:
+    python -m scripts.run_schedules [--page-size 500] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.services.schedule_service import schedule_service
+from app.storage import close_store
+
+
+async def run(page_size: int, concurrency: int) -> None:
+    start = time.perf_counter()
+    try:
+        outcomes = await schedule_service.run_due(page_size=page_size, concurrency=concurrency)
+    finally:
+        await close_store()
+
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+    print(f"{summary or 'Nothing due'} in {elapsed:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the due recurring deposits.")
+    parser.add_argument("--page-size", type=int, default=500, help="schedules read per page")
+    parser.add_argument("--concurrency", type=int, default=20, help="deposits run at once")
+    args = parser.parse_args()
+    asyncio.run(run(args.page_size, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
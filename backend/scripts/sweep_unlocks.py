@@ -0,0 +1,44 @@
+"""
+Announce the vaults that have unlocked.
+
+The API instances already do this every `UNLOCK_SWEEP_INTERVAL_SECONDS`;
+use this to run the sweep from a cron job instead (with the interval set
+to 0) or to catch up by hand. Safe to run alongside the instances: each
+vault is announced at most once.
+
+Usage:
+    python -m scripts.sweep_unlocks [--date 2026-01-31] [--page-size 500]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from app.services.unlock_service import unlock_service
+from app.storage import close_store
+
+
+async def run(today: date, page_size: int) -> None:
+    start = time.perf_counter()
+    try:
+        outcomes = await unlock_service.sweep(today, page_size)
+    finally:
+        await close_store()
+
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+    print(f"{summary or 'Nothing unlocked'} in {elapsed:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Announce the unlocked vaults.")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(),
+                        help="sweep as of this day (default: today)")
+    parser.add_argument("--page-size", type=int, default=500, help="vaults read per page")
+    args = parser.parse_args()
+    asyncio.run(run(args.date, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Shared test fixtures.
+"""
+
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_current_active_user
+from app.main import app
+from app.services.idempotency_service import idempotency_service
+from app.services.user_service import user_service
+from app.storage import Document, Transaction, set_store
+from app.storage.sqlite import SQLiteStore
+
+
+class CountingTransaction(Transaction):
+    """Transaction wrapper counting document reads on its store."""
+
+    def __init__(self, transaction: Transaction, store: "CountingStore"):
+        self._transaction = transaction
+        self._store = store
+
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        self._store.reads[collection] += 1
+        return await self._transaction.get(collection, doc_id)
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False) -> None:
+        self._transaction.set(collection, doc_id, data, merge)
+
+    def create(self, collection: str, doc_id: str, data: dict) -> None:
+        self._transaction.create(collection, doc_id, data)
+
+    def update(self, collection: str, doc_id: str, fields: dict) -> None:
+        self._transaction.update(collection, doc_id, fields)
+
+    def delete(self, collection: str, doc_id: str) -> None:
+        self._transaction.delete(collection, doc_id)
+
+
+class CountingStore(SQLiteStore):
+    """
+    SQLite store counting document reads per collection, as Firestore bills
+    them: one per document fetched (found or not), at least one per query,
+    one per aggregation.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        super().__init__(path)
+        self.reads: Counter = Counter()
+
+    async def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        self.reads[collection] += 1
+        return await super().get(collection, doc_id)
+
+    async def get_many(self, collection: str, doc_ids: Iterable[str]) -> Dict[str, dict]:
+        doc_ids = list(dict.fromkeys(doc_ids))
+        self.reads[collection] += len(doc_ids)
+        return await super().get_many(collection, doc_ids)
+
+    async def query(self, collection: str, *args: Any, **kwargs: Any) -> AsyncIterator[Document]:
+        found = 0
+        async for doc in super().query(collection, *args, **kwargs):
+            found += 1
+            yield doc
+        self.reads[collection] += max(found, 1)
+
+    async def aggregate(self, collection: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.reads[collection] += 1
+        return await super().aggregate(collection, *args, **kwargs)
+
+    async def run_transaction(self, fn, *args: Any, **kwargs: Any) -> Any:
+        async def _counted(transaction: Transaction) -> Any:
+            return await fn(CountingTransaction(transaction, self))
+
+        return await super().run_transaction(_counted, *args, **kwargs)
+
+
+@pytest.fixture
+async def store():
+    """In-memory SQLite document store installed as the active backend."""
+    sqlite_store = CountingStore(":memory:")
+    set_store(sqlite_store)
+    user_service.clear_cache()
+    user_service._pending_logins.clear()
+    idempotency_service.clear_cache()
+    yield sqlite_store
+    set_store(None)
+    user_service.clear_cache()
+    idempotency_service.clear_cache()
+    await sqlite_store.close()
+
+
+@pytest.fixture
+async def client(store):
+    """API client authenticated as the user `u1` (created with the store)."""
+    user = await user_service.create("a@flexsave.app", "A", "u1")
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test/api/v1") as api:
+        yield api
+    app.dependency_overrides.clear()
@@ -0,0 +1,85 @@
+"""
+Local SMTP stand-in for the email delivery tests and benchmark.
+"""
+
+import asyncio
+from typing import Iterable, List, Optional
+
+
+class LocalSMTPServer:
+    """
+    Minimal SMTP server on localhost recording the messages it accepts.
+
+    Recipients in `refuse` get a permanent 550, those in `defer` a
+    temporary 451. `greeting_delay` stands in for the connection and TLS
+    handshake cost of a real server.
+    """
+
+    def __init__(
+        self,
+        refuse: Iterable[str] = (),
+        defer: Iterable[str] = (),
+        greeting_delay: float = 0.0,
+    ):
+        self.refuse = set(refuse)
+        self.defer = set(defer)
+        self.greeting_delay = greeting_delay
+        self.messages: List[bytes] = []
+        self.connections = 0
+        self.port = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "LocalSMTPServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.greeting_delay)
+
+        def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 localhost ESMTP")
+        recipients = 0
+        try:
+            while line := await reader.readline():
+                command = line[:4].upper()
+                if command in (b"EHLO", b"HELO"):
+                    reply("250 localhost")
+                elif command in (b"MAIL", b"RSET"):
+                    recipients = 0
+                    reply("250 OK")
+                elif command == b"RCPT":
+                    address = line.decode().split("<", 1)[1].split(">", 1)[0]
+                    if address in self.refuse:
+                        reply("550 No such user")
+                    elif address in self.defer:
+                        reply("451 Try again later")
+                    else:
+                        recipients += 1
+                        reply("250 OK")
+                elif command == b"DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = []
+                    while (chunk := await reader.readline()) != b".\r\n":
+                        data.append(chunk)
+                    self.messages.append(b"".join(data))
+                    reply("250 OK")
+                elif command == b"NOOP":
+                    reply("250 OK")
+                elif command == b"QUIT":
+                    reply("221 Bye")
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        finally:
+            writer.close()
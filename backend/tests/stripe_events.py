@@ -0,0 +1,37 @@
+"""
+Signed Stripe webhook events for the webhook tests and load test.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+
+def stripe_event(
+    event_type: str,
+    data: Dict[str, Any],
+    event_id: Optional[str] = None,
+    created: Optional[int] = None,
+) -> Dict[str, Any]:
+    """A Stripe event payload (the fields the webhook reads)."""
+    return {
+        "id": event_id or f"evt_{uuid.uuid4().hex}",
+        "object": "event",
+        "type": event_type,
+        "created": created or int(time.time()),
+        "data": {"object": data},
+    }
+
+
+def sign(event: Dict[str, Any], secret: str) -> Tuple[bytes, Dict[str, str]]:
+    """The body and headers of `event` signed as Stripe does (v1 scheme)."""
+    body = json.dumps(event).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return body, {
+        "Stripe-Signature": f"t={timestamp},v1={signature}",
+        "Content-Type": "application/json",
+    }
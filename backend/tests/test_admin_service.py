@@ -0,0 +1,145 @@
+"""
+Tests for admin service.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.models.user import User, UserRole
+from app.repositories.users import user_repository
+from app.services.admin_service import admin_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.services.withdrawal_service import withdrawal_service
+
+
+class TestGlobalStats:
+    """Test cases for AdminService.get_global_stats."""
+
+    async def test_empty_platform(self, store):
+        """Stats on an empty platform are all zero."""
+        stats = await admin_service.get_global_stats()
+
+        assert stats["total_users"] == 0
+        assert stats["total_saved"] == 0
+        assert stats["avg_discipline_score"] == 0
+
+    async def test_stats(self, store):
+        """Stats reflect users, vaults and withdrawals created through services."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        await user_service.create("b@flexsave.app", "B", "u2")
+        await user_service.update("u2", is_active=False, is_premium=True)
+        await user_service.update_discipline_score("u1", +10)
+
+        unlock = date.today() - timedelta(days=1)
+        vault = await vault_service.create("u1", "Trip", 1000, unlock)
+        await vault_service.deposit(vault, 150.5)
+        await withdrawal_service.create("u1", vault.id, 25)
+
+        stats = await admin_service.get_global_stats()
+
+        assert stats == {
+            "total_users": 2,
+            "active_users": 1,
+            "premium_users": 1,
+            "total_vaults": 1,
+            "active_vaults": 1,
+            "total_saved": 125.5,
+            "total_withdrawals": 1,
+            "total_withdrawn": 25,
+            "avg_discipline_score": 55.0,
+        }
+
+
+class TestListUsers:
+    """Test cases for AdminService.list_users."""
+
+    async def _seed(self):
+        # Two users share each timestamp so pages must break ties on the ID
+        for i in range(7):
+            user = User(
+                id=f"u{i}",
+                email=f"u{i}@flexsave.app",
+                role=UserRole.ADMIN if i == 3 else UserRole.USER,
+                created_at=datetime(2025, 1, 1 + i // 2),
+            )
+            await user_repository.save(user)
+
+    async def test_pages_with_cursor(self, store):
+        """Following next_cursor walks every user once, newest first."""
+        await self._seed()
+
+        seen = []
+        cursor = None
+        while True:
+            users, cursor = await admin_service.list_users(limit=3, cursor=cursor)
+            seen += [u.id for u in users]
+            if cursor is None:
+                break
+
+        assert seen == ["u6", "u5", "u4", "u3", "u2", "u1", "u0"]
+
+    async def test_filters_with_cursor(self, store):
+        """Filters are kept while paging and the last page has no cursor."""
+        await self._seed()
+
+        users, cursor = await admin_service.list_users(limit=2, role="user")
+        assert [u.id for u in users] == ["u6", "u5"]
+
+        users, cursor = await admin_service.list_users(limit=2, role="user", cursor=cursor)
+        assert [u.id for u in users] == ["u4", "u2"]
+
+        users, cursor = await admin_service.list_users(limit=2, role="user", cursor=cursor)
+        assert [u.id for u in users] == ["u1", "u0"]
+        assert cursor is None
+
+    async def test_invalid_cursor(self, store):
+        """Malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            await admin_service.list_users(cursor="not-a-cursor")
+        with pytest.raises(ValueError):
+            await admin_service.list_users(cursor=encode_cursor([1, {}]))
+
+
+class TestTopSavers:
+    """Test cases for AdminService.get_top_savers."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_snapshot(self):
+        admin_service._top_savers.clear()
+        yield
+        admin_service._top_savers.clear()
+
+    async def test_leaderboard(self, store):
+        """Savers are ranked by the total_saved kept up to date on each user."""
+        unlock = date.today() - timedelta(days=1)
+        for i, amount in enumerate((100, 300, 200)):
+            await user_service.create(f"u{i}@flexsave.app", f"User {i}", f"u{i}")
+            first = await vault_service.create(f"u{i}", "First", 1000, unlock)
+            second = await vault_service.create(f"u{i}", "Second", 1000, unlock)
+            await vault_service.deposit(first, amount)
+            await vault_service.deposit(second, amount)
+
+        await withdrawal_service.create("u2", second.id, 150)
+        await user_service.create("idle@flexsave.app", "Idle", "idle")
+
+        savers = await admin_service.get_top_savers(limit=2)
+
+        assert [(s["user_id"], s["total_saved"]) for s in savers] == [("u1", 600), ("u2", 250)]
+
+    async def test_snapshot_refresh(self, store, monkeypatch):
+        """The leaderboard is served from a snapshot until the refresh interval."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        vault = await vault_service.create("u1", "Trip", 1000, date.today())
+        await vault_service.deposit(vault, 50)
+
+        assert (await admin_service.get_top_savers())[0]["total_saved"] == 50
+
+        await vault_service.deposit(vault, 25)
+        assert (await admin_service.get_top_savers())[0]["total_saved"] == 50
+
+        monkeypatch.setattr(settings, "LEADERBOARD_REFRESH_SECONDS", 0)
+        assert (await admin_service.get_top_savers())[0]["total_saved"] == 75
@@ -0,0 +1,83 @@
+"""
+Tests for the verified ID token cache.
+"""
+
+import asyncio
+import time
+
+import pytest
+from firebase_admin import auth
+
+from app.core import firebase
+from app.core.config import settings
+
+
+@pytest.fixture
+def verify_calls(monkeypatch):
+    """Stub the Admin SDK verification and record the tokens it sees."""
+    calls = []
+
+    def verify_id_token(token, check_revoked=False):
+        calls.append(token)
+        if token == "bad":
+            raise auth.InvalidIdTokenError("invalid", cause=None, http_response=None)
+        lifetime = 3600 if token != "expiring" else 0.05
+        return {"uid": f"uid-{token}", "exp": time.time() + lifetime}
+
+    monkeypatch.setattr(firebase, "get_firebase_app", lambda: None)
+    monkeypatch.setattr(auth, "verify_id_token", verify_id_token)
+    firebase._token_cache.clear()
+    yield calls
+    firebase._token_cache.clear()
+
+
+class TestTokenCache:
+    """Test cases for verify_firebase_token caching."""
+
+    async def test_repeated_token_verified_once(self, verify_calls):
+        """A token is verified once, then served from the cache."""
+        for _ in range(5):
+            claims = await firebase.verify_firebase_token("t1")
+            assert claims["uid"] == "uid-t1"
+
+        assert verify_calls == ["t1"]
+
+    async def test_concurrent_requests_share_verification(self, verify_calls):
+        """Concurrent requests with the same token verify it once."""
+        results = await asyncio.gather(*(firebase.verify_firebase_token("t1") for _ in range(10)))
+
+        assert all(r["uid"] == "uid-t1" for r in results)
+        assert verify_calls == ["t1"]
+
+    async def test_invalid_token_not_cached(self, verify_calls):
+        """Rejected tokens return None and are verified again next time."""
+        assert await firebase.verify_firebase_token("bad") is None
+        assert await firebase.verify_firebase_token("bad") is None
+        assert verify_calls == ["bad", "bad"]
+
+    async def test_entry_expires_with_token(self, verify_calls):
+        """Cached claims are dropped at the token's exp."""
+        await firebase.verify_firebase_token("expiring")
+        await asyncio.sleep(0.1)
+        await firebase.verify_firebase_token("expiring")
+
+        assert verify_calls == ["expiring", "expiring"]
+
+    async def test_revocation_check_mode(self, verify_calls, monkeypatch):
+        """With revocation checks on, entries live at most the recheck interval."""
+        monkeypatch.setattr(settings, "AUTH_CHECK_REVOKED", True)
+        monkeypatch.setattr(settings, "AUTH_REVOCATION_CHECK_SECONDS", 0)
+
+        await firebase.verify_firebase_token("t1")
+        await firebase.verify_firebase_token("t1")
+
+        assert verify_calls == ["t1", "t1"]
+
+    async def test_lru_eviction(self, verify_calls, monkeypatch):
+        """The cache is bounded and evicts the least recently used token."""
+        monkeypatch.setattr(firebase._token_cache, "maxsize", 2)
+
+        for token in ("t1", "t2", "t1", "t3", "t1", "t2"):
+            await firebase.verify_firebase_token(token)
+
+        assert verify_calls == ["t1", "t2", "t3", "t2"]
@@ -0,0 +1,106 @@
+"""
+Tests for the encouragement campaign.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.repositories.campaigns import campaign_run_repository
+from app.repositories.notifications import notification_repository
+from app.repositories.users import user_repository
+from app.services import campaign_service as campaign_module
+from app.services.campaign_service import (
+    ENCOURAGED,
+    MUTED,
+    RATE_LIMITED,
+    campaign_service,
+)
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+
+TODAY = date.today()
+
+
+async def _user(uid: str, days_since_deposit: int, **fields):
+    await user_service.create(f"{uid}@flexsave.app", uid, uid)
+    last_deposit = datetime.utcnow() - timedelta(days=days_since_deposit)
+    await user_repository.update(uid, last_deposit_at=last_deposit.isoformat(), **fields)
+
+
+async def _notified(uid: str) -> int:
+    return len(await notification_repository.list_for_user(uid))
+
+
+class TestEncouragementCampaign:
+    """Test cases for the encouragement campaign."""
+
+    async def test_deposit_sets_last_deposit_at(self, store):
+        """Deposits maintain the indexed last_deposit_at field."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        vault = await vault_service.create("u1", "Trip", 1_000, TODAY + timedelta(days=30))
+
+        await vault_service.deposit(vault, 10)
+
+        assert (await user_repository.get("u1")).last_deposit_at is not None
+
+    async def test_never_deposited_counts_from_signup(self, store):
+        """Users who never deposited are encouraged once inactive since signup."""
+        user = await user_service.create("a@flexsave.app", "A", "u1")
+        assert (await user_repository.get("u1")).last_deposit_at == user.created_at
+
+        later = TODAY + timedelta(days=30)
+        assert await campaign_service.run_encouragement(later) == {ENCOURAGED: 1}
+
+    async def test_encourages_inactive_users_once(self, store):
+        """Inactive users are encouraged once per run, within their preferences."""
+        await _user("idle", 30)
+        await _user("recent", 2)
+        await _user("muted", 30, notification_enabled=False)
+        await _user("nagged", 30, last_encouraged_at=datetime.utcnow().isoformat())
+
+        outcomes = await campaign_service.run_encouragement(TODAY)
+
+        assert outcomes == {ENCOURAGED: 1, MUTED: 1, RATE_LIMITED: 1}
+        assert await _notified("idle") == 1
+        assert [await _notified(u) for u in ("recent", "muted", "nagged")] == [0, 0, 0]
+        assert await campaign_service.run_encouragement(TODAY) == {}
+        run = (await campaign_run_repository.find([]))[0]
+        assert run.finished_at is not None
+        assert (run.encouraged, run.muted, run.rate_limited) == (1, 1, 1)
+
+    async def test_resumes_after_interruption(self, store, monkeypatch):
+        """A run stopped mid-way resumes after its last committed batch."""
+        for i in range(7):
+            await _user(f"u{i}", 20 + i)
+        monkeypatch.setattr(campaign_module, "USERS_PER_BATCH", 2)
+
+        commit = campaign_module.CampaignService._commit
+        calls = 0
+
+        async def crash_after_two(self, *args):
+            nonlocal calls
+            calls += 1
+            if calls > 2:
+                raise RuntimeError("instance restarted")
+            return await commit(self, *args)
+
+        monkeypatch.setattr(campaign_module.CampaignService, "_commit", crash_after_two)
+        with pytest.raises(RuntimeError):
+            await campaign_service.run_encouragement(TODAY, page_size=3)
+        monkeypatch.setattr(campaign_module.CampaignService, "_commit", commit)
+
+        assert await campaign_service.run_encouragement(TODAY, page_size=3) == {ENCOURAGED: 4}
+        assert [await _notified(f"u{i}") for i in range(7)] == [1] * 7
+
+    async def test_concurrent_runs(self, store, monkeypatch):
+        """Instances racing on the same run encourage each user once."""
+        for i in range(9):
+            await _user(f"u{i}", 20 + i)
+        monkeypatch.setattr(campaign_module, "USERS_PER_BATCH", 2)
+
+        await asyncio.gather(*(campaign_service.run_encouragement(TODAY, page_size=4) for _ in range(3)))
+        await campaign_service.run_encouragement(TODAY, page_size=4)
+
+        assert [await _notified(f"u{i}") for i in range(9)] == [1] * 9
@@ -0,0 +1,143 @@
+"""
+Tests for the email delivery pipeline, against a local SMTP stand-in.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.smtp import SMTPPool
+from app.models.queued_email import EmailStatus
+from app.repositories.email_queue import (
+    email_dead_letter_repository,
+    email_queue_repository,
+)
+from app.services.email_dispatcher import EmailDispatcher
+from app.services.email_service import email_service
+from app.services.outbox_service import outbox_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from tests.smtp_server import LocalSMTPServer
+
+
+@pytest.fixture
+async def smtp():
+    server = await LocalSMTPServer(refuse={"gone@flexsave.app"}, defer={"busy@flexsave.app"}).start()
+    yield server
+    await server.stop()
+
+
+def _dispatcher(smtp: LocalSMTPServer, workers: int = 2) -> EmailDispatcher:
+    pool = SMTPPool("127.0.0.1", smtp.port, starttls=False, size=workers)
+    return EmailDispatcher(pool, workers=workers, batch_size=5)
+
+
+async def _send(*dispatchers: EmailDispatcher) -> None:
+    for dispatcher in dispatchers:
+        dispatcher.start()
+    await asyncio.gather(*(d.poll() for d in dispatchers))
+    for dispatcher in dispatchers:
+        await dispatcher.drain()
+        await dispatcher.stop()
+
+
+class TestEmailDispatcher:
+    """Test cases for sending queued emails."""
+
+    async def test_sends_over_pooled_connections(self, store, smtp):
+        """Queued emails are sent in batches over reused connections."""
+        for i in range(30):
+            await email_service.queue(f"u{i}@flexsave.app", "welcome", {"user_name": "Awa"})
+        dispatcher = _dispatcher(smtp)
+
+        await _send(dispatcher)
+
+        assert len(smtp.messages) == 30
+        assert smtp.connections <= 2
+        assert dispatcher.pool.stats()["reuses"] >= 4
+        assert await email_queue_repository.list_pending(50) == []
+        sent = await email_queue_repository.find([("status", "==", EmailStatus.SENT.value)])
+        assert len(sent) == 30
+
+    async def test_retry_and_dead_letter(self, store, smtp, monkeypatch):
+        """Deferred emails back off, refused ones are dead-lettered."""
+        monkeypatch.setattr("app.core.config.settings.EMAIL_MAX_ATTEMPTS", 2)
+        busy = await email_service.queue("busy@flexsave.app", "welcome", {"user_name": "Awa"})
+        gone = await email_service.queue("gone@flexsave.app", "welcome", {"user_name": "Awa"})
+
+        await _send(_dispatcher(smtp))
+
+        assert await email_queue_repository.get(gone.id) is None
+        assert (await email_dead_letter_repository.get(gone.id)).status == EmailStatus.FAILED
+        retry = await email_queue_repository.get(busy.id)
+        assert (retry.status, retry.attempts) == (EmailStatus.PENDING, 1)
+        assert retry.available_at > datetime.utcnow() + timedelta(seconds=20)
+        assert await _dispatcher(smtp).poll() == 0
+
+        await email_queue_repository.update(busy.id, available_at=datetime.utcnow().isoformat())
+        await _send(_dispatcher(smtp))
+
+        dead = await email_dead_letter_repository.get(busy.id)
+        assert dead.attempts == 2
+        assert "451" in dead.error
+        assert smtp.messages == []
+
+    async def test_unrenderable_dead_lettered(self, store, smtp):
+        """An email whose params do not fit its template fails alone, for good."""
+        broken = await email_service.queue("a@flexsave.app", "welcome", {})
+        fine = await email_service.queue("b@flexsave.app", "welcome", {"user_name": "Awa"})
+
+        await _send(_dispatcher(smtp))
+
+        dead = await email_dead_letter_repository.get(broken.id)
+        assert (dead.attempts, dead.error) == (1, "Rendering failed: KeyError('user_name')")
+        assert await email_queue_repository.get(broken.id) is None
+        assert (await email_queue_repository.get(fine.id)).status == EmailStatus.SENT
+        assert len(smtp.messages) == 1
+
+    async def test_email_removed_while_claiming(self, store, smtp, monkeypatch):
+        """An email removed from the queue before the claim is skipped."""
+        gone = await email_service.queue("a@flexsave.app", "welcome", {"user_name": "Awa"})
+        await email_service.queue("b@flexsave.app", "welcome", {"user_name": "Awa"})
+        list_pending = email_queue_repository.list_pending
+
+        async def list_pending_then_removed(limit, **kwargs):
+            available = await list_pending(limit, **kwargs)
+            if any(email.id == gone.id for email in available):
+                # Another instance dead-letters it meanwhile
+                await email_queue_repository.delete(gone.id)
+            return available
+        monkeypatch.setattr(email_queue_repository, "list_pending", list_pending_then_removed)
+
+        await _send(_dispatcher(smtp))
+
+        assert len(smtp.messages) == 1
+
+    async def test_concurrent_dispatchers(self, store, smtp):
+        """Instances polling the same queue send each email once."""
+        for i in range(40):
+            await email_service.queue(f"u{i}@flexsave.app", "welcome", {"user_name": "Awa"})
+
+        await _send(*(_dispatcher(smtp) for _ in range(3)))
+
+        assert len(smtp.messages) == 40
+
+    async def test_requests_only_enqueue(self, client, smtp):
+        """Signing up and depositing queue emails without touching SMTP."""
+        vault = await vault_service.create("u1", "Trip", 1_000, date.today() + timedelta(days=30))
+
+        response = await client.post(f"/vaults/{vault.id}/deposit", json={"amount": 25})
+        await outbox_service.drain()
+
+        assert response.status_code == 200
+        queued = await email_queue_repository.list_pending(10)
+        assert sorted(e.template for e in queued) == ["deposit", "welcome"]
+        assert smtp.connections == 0
+
+    async def test_welcome_queued_once(self, store):
+        """Concurrent first requests of a new user queue one welcome email."""
+        await asyncio.gather(*(user_service.create("a@flexsave.app", "A", "u1") for _ in range(5)))
+
+        queued = await email_queue_repository.list_pending(10)
+        assert [e.id for e in queued] == ["welcome-u1"]
@@ -0,0 +1,82 @@
+"""
+Tests for the compiled email templates.
+"""
+
+import html
+import types
+
+import pytest
+
+from app.services.email_templates import (
+    LOCALES,
+    TEMPLATES,
+    Fragment,
+    render,
+    render_many,
+)
+
+PARAMS = {
+    "welcome": {"user_name": "Awa"},
+    "deposit": {"user_name": "Awa", "vault_name": "Trip", "amount": 25, "new_total": 125.5},
+    "withdrawal": {"user_name": "Awa", "vault_name": "Trip", "amount": 100, "fee": 5, "is_early": True},
+    "vault_unlocked": {"user_name": "Awa", "vault_name": "Trip", "amount": 1000},
+}
+
+
+class TestEmailTemplates:
+    """Test cases for template rendering."""
+
+    @pytest.mark.parametrize("locale", LOCALES)
+    @pytest.mark.parametrize("name", sorted(TEMPLATES))
+    def test_every_variant_renders(self, name, locale):
+        """Every template renders in every locale with its slots filled."""
+        subject, body = render(name, PARAMS[name], locale)
+
+        assert subject and "{" not in subject
+        assert body.lstrip().startswith("<!DOCTYPE html>")
+        assert "Awa" in body
+        assert "font-family: 'Segoe UI'" in body
+        assert body.isascii()
+
+    def test_locales(self):
+        """Variants differ per locale; unknown locales fall back to French."""
+        assert render("deposit", PARAMS["deposit"], "fr")[0] == "Dépôt confirmé : 25.00 € 💰"
+        assert render("deposit", PARAMS["deposit"], "en")[0] == "Deposit confirmed: €25.00 💰"
+        assert render("deposit", PARAMS["deposit"], "de") == render("deposit", PARAMS["deposit"])
+
+    def test_text_is_escaped(self):
+        """User-supplied text cannot inject HTML."""
+        params = {**PARAMS["vault_unlocked"], "vault_name": "<script>x</script>"}
+
+        subject, body = render("vault_unlocked", params)
+
+        assert "<script>" not in body
+        assert "&lt;script&gt;x&lt;/script&gt;" in body
+        assert subject == "🎉 Coffre débloqué : <script>x</script>"
+
+    def test_withdrawal_fee_blocks(self):
+        """Fee lines only appear for withdrawals with a fee."""
+        subject, body = render("withdrawal", PARAMS["withdrawal"])
+        body = html.unescape(body)
+        assert subject == "Retrait confirmé : 95.00 €"
+        assert "Frais :</strong> 5.00 €" in body
+        assert "Retrait anticipé : frais de 5.00 € appliqués" in body
+
+        _, body = render("withdrawal", {**PARAMS["withdrawal"], "fee": 0, "is_early": False})
+        body = html.unescape(body)
+        assert "Frais" not in body
+        assert "anticipé" not in body
+
+    def test_render_many_is_lazy(self):
+        """Bulk rendering yields one message at a time."""
+        rows = ((name, PARAMS[name], "en") for name in ("deposit", "welcome"))
+
+        rendered = render_many(rows)
+
+        assert isinstance(rendered, types.GeneratorType)
+        assert [subject for subject, _ in rendered] == ["Deposit confirmed: €25.00 💰", "Welcome to FlexSave! 🎉"]
+
+    def test_missing_param(self):
+        """A missing slot param fails loudly."""
+        with pytest.raises(KeyError):
+            Fragment("Hello {name}").fill({})
@@ -0,0 +1,99 @@
+"""
+Tests for the unified transaction history.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.deposit import Deposit
+from app.models.vault import Vault
+from app.models.withdrawal import Withdrawal
+from app.repositories.deposits import deposit_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.services.history_service import history_service
+
+START = datetime(2025, 1, 1)
+TODAY = date(2025, 6, 1)
+
+
+async def _seed():
+    """Interleaved history for u1 (plus noise from u2); returns ids newest first."""
+    expected = []
+    for user_id in ("u1", "u2"):
+        vault = await vault_repository.add(Vault(
+            user_id=user_id, name="Trip", unlock_date=START.date(), created_at=START,
+        ))
+        closed = await vault_repository.add(Vault(
+            user_id=user_id, name="Old", unlock_date=date(2026, 1, 1), created_at=START,
+            is_active=False, closed_at=START + timedelta(minutes=3, seconds=30),
+        ))
+        if user_id == "u1":
+            expected += [(START, vault.id), (START, vault.id), (START, closed.id), (closed.closed_at, closed.id)]
+
+        for minute in range(1, 12):
+            created_at = START + timedelta(minutes=minute // 2)  # pairs share a timestamp
+            if minute % 3:
+                item = await deposit_repository.add(Deposit(
+                    user_id=user_id, vault_id=vault.id, amount=minute, created_at=created_at,
+                ))
+            else:
+                item = await withdrawal_repository.add(Withdrawal(
+                    user_id=user_id, vault_id=vault.id, amount=minute, created_at=created_at,
+                ))
+            if user_id == "u1":
+                expected.append((created_at, item.id))
+
+    return [item_id for _, item_id in sorted(expected, reverse=True)]
+
+
+class TestHistory:
+    """Test cases for HistoryService.get_history."""
+
+    async def test_pages_merge_sources(self, store):
+        """Following next_cursor yields the whole merged history once, newest first."""
+        expected = await _seed()
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page, cursor = await history_service.get_history("u1", limit=4, cursor=cursor, today=TODAY)
+            seen += [item.id for _, item in page]
+            pages += 1
+            if cursor is None:
+                break
+
+        assert seen == expected
+        assert pages == 4
+
+    async def test_entry_types(self, store):
+        """Entries are tagged with their source."""
+        await _seed()
+
+        page, _ = await history_service.get_history("u1", limit=100, today=TODAY)
+
+        kinds = [kind for kind, _ in page]
+        assert kinds.count("deposit") == 8
+        assert kinds.count("withdrawal") == 3
+        assert kinds.count("vault_created") == 2
+        assert kinds.count("vault_unlocked") == 1
+        assert kinds.count("vault_closed") == 1
+
+    async def test_reads_what_the_page_needs(self, store):
+        """A page reads little more than its own entries, however deep the history."""
+        await _seed()
+        store.reads.clear()
+
+        page, cursor = await history_service.get_history("u1", limit=10, today=TODAY)
+
+        assert len(page) == 10 and cursor
+        assert sum(store.reads.values()) <= 10 + 1 + 2 * 4
+
+    async def test_empty_history(self, store):
+        """A user without history gets an empty last page."""
+        assert await history_service.get_history("nobody") == ([], None)
+
+    async def test_invalid_cursor(self, store):
+        """Malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            await history_service.get_history("u1", cursor="bogus")
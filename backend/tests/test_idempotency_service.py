@@ -0,0 +1,148 @@
+"""
+Tests for Idempotency-Key replays of deposits and withdrawals.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.vault import Vault
+from app.models.withdrawal import Withdrawal
+from app.repositories.deposits import deposit_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.services.idempotency_service import (
+    COLLECTION,
+    IdempotencyKeyReusedError,
+    idempotency_service,
+)
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.services.withdrawal_service import withdrawal_service
+from app.storage import DocumentExistsError
+
+
+async def _vault():
+    await user_service.create("a@flexsave.app", "A", "u1")
+    return await vault_service.create("u1", "Trip", 10_000, date.today() - timedelta(days=1))
+
+
+class TestIdempotency:
+    """Test cases for idempotent requests."""
+
+    async def test_replay_returns_stored_result(self, store):
+        """A replayed deposit returns the first result without a vault read."""
+        vault = await _vault()
+        request = idempotency_service.request("u1", "key-1", "deposit", vault_id=vault.id, amount=40)
+
+        assert await idempotency_service.lookup(request, Vault) is None
+        deposited = await vault_service.deposit(vault, 40, idempotency=request)
+
+        # Served from the cache, then from the collection on a cold instance
+        assert (await idempotency_service.lookup(request, Vault)).current_amount == 40
+        idempotency_service.clear_cache()
+        replayed = await idempotency_service.lookup(request, Vault)
+
+        assert replayed.id == deposited.id
+        assert replayed.current_amount == 40
+        assert await store.get(COLLECTION, request.key_id) is not None
+
+    async def test_duplicate_commit_writes_nothing(self, store):
+        """A second commit with the same key fails and moves no money."""
+        vault = await _vault()
+        request = idempotency_service.request("u1", "key-1", "deposit", vault_id=vault.id, amount=40)
+
+        await vault_service.deposit(vault, 40, idempotency=request)
+        with pytest.raises(DocumentExistsError):
+            await vault_service.deposit(vault, 40, idempotency=request)
+
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 40
+        assert await deposit_repository.count() == 1
+
+    async def test_key_reused_with_other_parameters(self, store):
+        """A key sent with different parameters is rejected."""
+        vault = await _vault()
+        first = idempotency_service.request("u1", "key-1", "deposit", vault_id=vault.id, amount=40)
+        other = idempotency_service.request("u1", "key-1", "deposit", vault_id=vault.id, amount=50)
+        await vault_service.deposit(vault, 40, idempotency=first)
+
+        with pytest.raises(IdempotencyKeyReusedError):
+            await idempotency_service.lookup(other, Vault)
+
+    async def test_keys_scoped_per_user(self, store):
+        """The same key sent by two users is two different requests."""
+        mine = idempotency_service.request("u1", "key-1", "deposit", vault_id="v", amount=1)
+        theirs = idempotency_service.request("u2", "key-1", "deposit", vault_id="v", amount=1)
+
+        assert mine.key_id != theirs.key_id
+        assert idempotency_service.request("u1", None, "deposit") is None
+
+    async def test_withdrawal_replay(self, store):
+        """A withdrawal stores its record in the same transaction."""
+        vault = await _vault()
+        await vault_service.deposit(vault, 100)
+        request = idempotency_service.request("u1", "key-2", "withdrawal", vault_id=vault.id, amount=30)
+
+        withdrawal = await withdrawal_service.create("u1", vault.id, 30, idempotency=request)
+        with pytest.raises(DocumentExistsError):
+            await withdrawal_service.create("u1", vault.id, 30, idempotency=request)
+
+        idempotency_service.clear_cache()
+        replayed = await idempotency_service.lookup(request, Withdrawal)
+
+        assert replayed.id == withdrawal.id
+        assert replayed.net_amount == withdrawal.net_amount
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 70
+        assert await withdrawal_repository.count() == 1
+
+    @pytest.mark.parametrize("path", ["deposit", "withdrawal"])
+    async def test_concurrent_reuse_rejected(self, client, monkeypatch, path):
+        """A key committed meanwhile by a request with other parameters gets a 422."""
+        vault = await vault_service.create("u1", "Trip", 10_000, date.today() - timedelta(days=1))
+        await vault_service.deposit(vault, 100)
+        first = idempotency_service.request("u1", "key-1", "deposit", vault_id=vault.id, amount=40)
+        await vault_service.deposit(vault, 40, idempotency=first)
+        lookup = idempotency_service.lookup
+        calls = []
+
+        async def racing_lookup(request, model):
+            calls.append(request)
+            if len(calls) == 1:
+                return None  # The concurrent request had not committed yet
+            return await lookup(request, model)
+        monkeypatch.setattr(idempotency_service, "lookup", racing_lookup)
+
+        if path == "deposit":
+            response = await client.post(
+                f"/vaults/{vault.id}/deposit", json={"amount": 50}, headers={"Idempotency-Key": "key-1"}
+            )
+        else:
+            response = await client.post(
+                "/withdrawals/", json={"vault_id": vault.id, "amount": 50}, headers={"Idempotency-Key": "key-1"}
+            )
+
+        assert response.status_code == 422
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("path", ["deposit", "withdrawal"])
+    async def test_concurrent_request_in_progress(self, client, monkeypatch, path):
+        """A key committed meanwhile, whose record cannot be read yet, gets a 409."""
+        vault = await vault_service.create("u1", "Trip", 10_000, date.today() - timedelta(days=1))
+        await vault_service.deposit(vault, 100)
+        first = idempotency_service.request("u1", "key-1", "deposit", vault_id=vault.id, amount=40)
+        await vault_service.deposit(vault, 40, idempotency=first)
+
+        async def unreadable_lookup(request, model):
+            return None
+        monkeypatch.setattr(idempotency_service, "lookup", unreadable_lookup)
+
+        if path == "deposit":
+            response = await client.post(
+                f"/vaults/{vault.id}/deposit", json={"amount": 50}, headers={"Idempotency-Key": "key-1"}
+            )
+        else:
+            response = await client.post(
+                "/withdrawals/", json={"vault_id": vault.id, "amount": 50}, headers={"Idempotency-Key": "key-1"}
+            )
+
+        assert response.status_code == 409
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 140
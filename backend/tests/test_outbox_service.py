@@ -0,0 +1,137 @@
+"""
+Tests for the transactional outbox.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.models.outbox import OutboxEntry
+from app.repositories.email_queue import email_queue_repository
+from app.repositories.notifications import notification_repository
+from app.repositories.outbox import outbox_dead_letter_repository, outbox_repository
+from app.services.outbox_service import (
+    DEAD_LETTERED,
+    DEPOSIT,
+    DONE,
+    DUPLICATE,
+    RETRIED,
+    effect_id,
+    outbox_service,
+)
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.storage import get_store
+
+
+async def _vault():
+    return await vault_service.create("u1", "Trip", 1_000, date.today() + timedelta(days=30))
+
+
+async def _stage(entry_id: str = None, **payload):
+    payload = payload or {"score_delta": 1, "vault_name": "Trip", "amount": 25, "new_total": 25}
+    batch = get_store().batch()
+    entry = await outbox_service.stage(batch, DEPOSIT, "u1", entry_id, **payload)
+    await batch.commit()
+    return entry
+
+
+class TestOutbox:
+    """Test cases for staging and draining side effects."""
+
+    async def test_deposit_effects_run_in_background(self, client):
+        """A deposit commits its outbox entry; the drain carries it out."""
+        vault = await _vault()
+
+        response = await client.post(f"/vaults/{vault.id}/deposit", json={"amount": 25})
+
+        assert response.status_code == 200
+        [entry] = await outbox_repository.find()
+        assert await notification_repository.list_for_user("u1") == []
+        assert (await user_service.get_by_id("u1")).discipline_score == 50
+
+        assert await outbox_service.drain() == {DONE: 1}
+
+        assert await outbox_repository.find() == []
+        assert (await user_service.get_by_id("u1")).discipline_score == 51
+        assert (await notification_repository.get(effect_id(entry))).user_id == "u1"
+        assert (await email_queue_repository.get(effect_id(entry))).template == "deposit"
+        assert await stats_service.get_totals() == await stats_service.compute()
+
+    async def test_muted_user(self, client):
+        """Users without notifications are rewarded but not notified."""
+        await user_service.update("u1", notification_enabled=False)
+        await _stage()
+
+        await outbox_service.drain()
+
+        assert (await user_service.get_by_id("u1")).discipline_score == 51
+        assert await notification_repository.list_for_user("u1") == []
+
+    async def test_user_entries_in_one_transaction(self, client):
+        """A user's entries are applied together, the score written once."""
+        for _ in range(5):
+            await _stage()
+
+        assert await outbox_service.drain() == {DONE: 5}
+
+        assert (await user_service.get_by_id("u1")).discipline_score == 55
+        assert len(await notification_repository.list_for_user("u1")) == 5
+
+    async def test_expired_lease_carried_out_once(self, client):
+        """An entry whose lease expired is claimed again, and applied once."""
+        await _stage()
+        _, [stalled] = await outbox_service._claim(datetime.utcnow(), 10)
+        later = datetime.utcnow() + timedelta(hours=1)
+
+        results = await asyncio.gather(*(outbox_service.drain(now=later) for _ in range(3)))
+        assert sum(r.get(DONE, 0) for r in results) == 1
+
+        # The instance that first claimed it wakes up
+        assert await outbox_service._execute("u1", [stalled]) == [DUPLICATE]
+        assert (await user_service.get_by_id("u1")).discipline_score == 51
+        assert len(await notification_repository.list_for_user("u1")) == 1
+        assert await outbox_repository.find() == []
+
+    async def test_redelivered_entry(self, client):
+        """An entry staged again under the same ID is not carried out twice."""
+        await _stage("evt_1")
+        await outbox_service.drain()
+
+        await _stage("evt_1")
+
+        assert await outbox_service.drain() == {DUPLICATE: 1}
+        assert len(await notification_repository.list_for_user("u1")) == 1
+
+    async def test_failing_entry(self, client, monkeypatch):
+        """A failing entry backs off, then is dead-lettered; others go through."""
+        monkeypatch.setattr("app.core.config.settings.OUTBOX_MAX_ATTEMPTS", 2)
+        broken = await outbox_repository.add(OutboxEntry(kind=DEPOSIT, user_id="u1"))
+        await _stage()
+
+        assert await outbox_service.drain() == {RETRIED: 1, DONE: 1}
+        retry = await outbox_repository.get(broken.id)
+        assert retry.attempts == 1
+        assert "vault_name" in retry.error
+        assert retry.available_at > datetime.utcnow() + timedelta(seconds=20)
+
+        assert await outbox_service.drain(now=retry.available_at) == {DEAD_LETTERED: 1}
+        assert await outbox_repository.get(broken.id) is None
+        assert (await outbox_dead_letter_repository.get(broken.id)).attempts == 2
+
+    async def test_entry_carried_out_while_claiming(self, client, monkeypatch):
+        """An entry deleted by another instance before the claim is skipped."""
+        first = await _stage()
+        await _stage()
+        list_due = outbox_repository.list_due
+
+        async def list_due_then_carried_out(limit, now):
+            due = await list_due(limit, now)
+            if any(entry.id == first.id for entry in due):
+                # Another instance carries it out meanwhile
+                await outbox_repository.delete(first.id)
+            return due
+        monkeypatch.setattr(outbox_repository, "list_due", list_due_then_carried_out)
+
+        assert await outbox_service.drain() == {DONE: 1}
+        assert (await user_service.get_by_id("u1")).discipline_score == 51
@@ -0,0 +1,112 @@
+"""
+Document read budgets of the mutation endpoints.
+
+Each endpoint must read each document it touches once: the vault loaded
+for the ownership check is the one the service mutates.
+"""
+
+from datetime import date, timedelta
+
+from app.services.vault_service import vault_service
+
+
+async def _vault(store, unlock_in_days: int = -1, amount: float = 0):
+    vault = await vault_service.create("u1", "Trip", 1000, date.today() + timedelta(days=unlock_in_days))
+    if amount:
+        vault = await vault_service.deposit(vault, amount)
+    store.reads.clear()
+    return vault
+
+
+class TestReadBudget:
+    """Reads per request, by collection."""
+
+    async def test_deposit(self, client, store):
+        """A deposit reads the vault once."""
+        vault = await _vault(store)
+
+        response = await client.post(f"/vaults/{vault.id}/deposit", json={"amount": 40})
+
+        assert response.status_code == 200
+        assert response.json()["current_amount"] == 40
+        assert store.reads == {"vaults": 1}
+
+    async def test_deposit_replay(self, client, store):
+        """An idempotent deposit adds one key lookup; its replay reads nothing."""
+        vault = await _vault(store)
+        headers = {"Idempotency-Key": "key-1"}
+
+        first = await client.post(f"/vaults/{vault.id}/deposit", json={"amount": 40}, headers=headers)
+        assert store.reads == {"vaults": 1, "idempotency_keys": 1}
+
+        store.reads.clear()
+        replay = await client.post(f"/vaults/{vault.id}/deposit", json={"amount": 40}, headers=headers)
+
+        assert replay.json() == first.json()
+        assert store.reads == {}
+
+    async def test_withdrawal(self, client, store):
+        """A withdrawal reads the vault once, in its transaction."""
+        vault = await _vault(store, amount=100)
+
+        response = await client.post("/withdrawals/", json={"vault_id": vault.id, "amount": 30})
+
+        assert response.status_code == 201
+        assert store.reads == {"vaults": 1}
+
+    async def test_early_withdrawal(self, client, store):
+        """An early withdrawal reads the vault once too: the penalty goes through the outbox."""
+        vault = await _vault(store, unlock_in_days=30, amount=100)
+
+        response = await client.post(
+            "/withdrawals/",
+            json={"vault_id": vault.id, "amount": 5, "is_early_withdrawal": True},
+        )
+
+        assert response.status_code == 201
+        assert store.reads == {"vaults": 1}
+
+    async def test_withdrawal_errors(self, client, store):
+        """Missing and foreign vaults are rejected after a single read."""
+        await vault_service.create("u2", "Other", 1000, date.today())
+        foreign = (await vault_service.get_user_vaults("u2"))[0]
+        store.reads.clear()
+
+        missing = await client.post("/withdrawals/", json={"vault_id": "missing", "amount": 1})
+        forbidden = await client.post("/withdrawals/", json={"vault_id": foreign.id, "amount": 1})
+
+        assert (missing.status_code, forbidden.status_code) == (404, 403)
+        assert store.reads == {"vaults": 2}
+
+    async def test_preview(self, client, store):
+        """A preview reads the vault once."""
+        vault = await _vault(store, amount=100)
+
+        response = await client.post("/withdrawals/preview", json={"vault_id": vault.id, "amount": 30})
+
+        assert response.json()["can_withdraw"] is True
+        assert store.reads == {"vaults": 1}
+
+    async def test_close_vault(self, client, store):
+        """Closing a vault reads it once."""
+        vault = await _vault(store)
+
+        response = await client.delete(f"/vaults/{vault.id}")
+
+        assert response.status_code == 204
+        assert store.reads == {"vaults": 1}
+
+    async def test_batch_deposit(self, client, store):
+        """A batch deposit reads all its vaults in one batched read."""
+        first = await _vault(store)
+        second = await _vault(store)
+
+        response = await client.post("/vaults/deposits:batch", json={"deposits": [
+            {"vault_id": first.id, "amount": 100},
+            {"vault_id": second.id, "amount": 50},
+            {"vault_id": first.id, "amount": 25},
+        ]})
+
+        assert response.status_code == 200
+        assert [v["current_amount"] for v in response.json()] == [125, 50]
+        assert store.reads == {"vaults": 2}
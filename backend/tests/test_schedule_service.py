@@ -0,0 +1,102 @@
+"""
+Tests for the recurring deposit scheduler.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.deposit import DepositSource
+from app.models.schedule import DepositSchedule, ScheduleFrequency
+from app.repositories.deposits import deposit_repository
+from app.repositories.schedules import schedule_repository
+from app.repositories.vaults import vault_repository
+from app.services.schedule_service import CANCELLED, DEPOSITED, schedule_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+
+NOW = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=9)
+
+
+async def _vault():
+    await user_service.create("a@flexsave.app", "A", "u1")
+    return await vault_service.create("u1", "Trip", 10_000, date.today() + timedelta(days=90))
+
+
+class TestDepositSchedule:
+    """Test cases for schedule cadence."""
+
+    def test_monthly_keeps_day_of_month(self):
+        """A schedule on the 31st runs on each month's last day."""
+        schedule = DepositSchedule(day_of_month=31, next_run_at=datetime(2026, 1, 31))
+
+        schedule.next_run_at = schedule.next_run_after(datetime(2026, 1, 31))
+        assert schedule.next_run_at == datetime(2026, 2, 28)
+        schedule.next_run_at = schedule.next_run_after(datetime(2026, 2, 28))
+        assert schedule.next_run_at == datetime(2026, 3, 31)
+
+    def test_missed_runs_skipped(self):
+        """A weekly schedule three weeks late runs once, then resumes its cadence."""
+        schedule = DepositSchedule(
+            frequency=ScheduleFrequency.WEEKLY, next_run_at=datetime(2026, 1, 1)
+        )
+
+        assert schedule.next_run_after(datetime(2026, 1, 20)) == datetime(2026, 1, 22)
+
+
+class TestScheduler:
+    """Test cases for running due schedules."""
+
+    async def test_run_due(self, store):
+        """Due schedules deposit once and move to their next run."""
+        vault = await _vault()
+        due = await schedule_service.create(vault, 50, ScheduleFrequency.WEEKLY)
+        await schedule_service.create(vault, 20, ScheduleFrequency.MONTHLY, date.today() + timedelta(days=3))
+
+        assert await schedule_service.run_due(NOW) == {DEPOSITED: 1}
+        assert await schedule_service.run_due(NOW) == {}
+
+        deposits = await deposit_repository.list_for_user("u1")
+        assert [(d.amount, d.source) for d in deposits] == [(50, DepositSource.SCHEDULED)]
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 50
+        assert (await user_service.get_by_id("u1")).total_saved == 50
+        schedule = await schedule_repository.get(due.id)
+        assert (schedule.last_run_at, schedule.next_run_at) == (NOW, due.next_run_at + timedelta(weeks=1))
+
+    async def test_concurrent_runners_deposit_once(self, store):
+        """Instances running the scheduler together never deposit twice."""
+        vault = await _vault()
+        for _ in range(10):
+            await schedule_service.create(vault, 10, ScheduleFrequency.MONTHLY)
+
+        results = await asyncio.gather(*(schedule_service.run_due(NOW) for _ in range(3)))
+
+        assert sum(r.get(DEPOSITED, 0) for r in results) == 10
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 100
+        assert await deposit_repository.count() == 10
+
+    async def test_pages(self, store):
+        """Every due schedule is run when they span several pages."""
+        vault = await _vault()
+        for _ in range(25):
+            await schedule_service.create(vault, 1, ScheduleFrequency.WEEKLY)
+
+        assert await schedule_service.run_due(NOW, page_size=10, concurrency=4) == {DEPOSITED: 25}
+
+    async def test_closed_vault_cancels(self, store):
+        """A schedule whose vault was closed is deactivated without depositing."""
+        vault = await _vault()
+        schedule = await schedule_service.create(vault, 50, ScheduleFrequency.WEEKLY)
+        await vault_repository.update(vault.id, is_active=False)
+
+        assert await schedule_service.run_due(NOW) == {CANCELLED: 1}
+        assert (await schedule_repository.get(schedule.id)).is_active is False
+        assert await deposit_repository.count() == 0
+
+    async def test_past_start_rejected(self, store):
+        """Schedules cannot start in the past."""
+        vault = await _vault()
+
+        with pytest.raises(ValueError):
+            await schedule_service.create(vault, 50, ScheduleFrequency.WEEKLY, date.today() - timedelta(days=1))
@@ -0,0 +1,91 @@
+"""
+Tests for the sharded platform counters.
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.user import User
+from app.models.vault import Vault
+from app.repositories.platform_stats import platform_stats_repository
+from app.repositories.users import user_repository
+from app.repositories.vaults import vault_repository
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.services.withdrawal_service import withdrawal_service
+
+
+class TestPlatformStats:
+    """Test cases for PlatformStatsService."""
+
+    async def test_counters_follow_mutations(self, store):
+        """Incremental counters match a full recomputation."""
+        for i in range(5):
+            await user_service.create(f"u{i}@flexsave.app", f"User {i}", f"u{i}")
+        await user_service.update("u1", is_active=False)
+        await user_service.update("u1", is_active=True)
+        await user_service.update("u2", is_premium=True)
+        await user_service.update_discipline_score("u3", -2)
+
+        open_vault = await vault_service.create("u0", "Open", 500, date.today() - timedelta(days=1))
+        locked_vault = await vault_service.create("u0", "Locked", 500, date.today() + timedelta(days=30))
+        await vault_service.deposit(open_vault, 100)
+        await vault_service.deposit(locked_vault, 200)
+        await withdrawal_service.create("u0", open_vault.id, 100)
+        await withdrawal_service.create("u0", locked_vault.id, 10, is_early=True)
+        await vault_service.close_vault("u0", open_vault.id)
+
+        assert await stats_service.get_totals() == await stats_service.compute()
+
+    async def test_concurrent_first_logins(self, store):
+        """Concurrent creations of one user count it once."""
+        users = await asyncio.gather(
+            *(user_service.create("a@flexsave.app", "A", "u1") for _ in range(5))
+        )
+
+        assert {user.id for user in users} == {"u1"}
+        assert (await stats_service.get_totals())["total_users"] == 1
+
+    async def test_update_from_stale_cache(self, store):
+        """Counter deltas come from the stored user, not a stale cached copy."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        await user_service.get_by_id("u1")
+
+        # Another instance disables the user; this instance still caches it active
+        await user_repository.update("u1", is_active=False)
+        await stats_service.increment(active_users=-1)
+        await user_service.update("u1", is_active=False)
+
+        assert (await stats_service.get_totals())["active_users"] == 0
+        assert await stats_service.get_totals() == await stats_service.compute()
+
+    async def test_writes_are_spread_over_shards(self, store):
+        """Increments land on several shard documents."""
+        for _ in range(50):
+            await stats_service.increment(total_saved=1)
+
+        shards = await platform_stats_repository.list_shards()
+
+        assert 1 < len(shards) <= 10
+        assert (await stats_service.get_totals())["total_saved"] == 50
+
+    async def test_unknown_counter(self, store):
+        """Only declared counters can be incremented."""
+        with pytest.raises(ValueError):
+            await stats_service.increment(total_likes=1)
+
+    async def test_rebuild(self, store):
+        """Rebuilding replaces drifted counters with the recomputed totals."""
+        await user_repository.save(User(id="u1", discipline_score=70))
+        await vault_repository.add(Vault(user_id="u1", current_amount=42))
+        await stats_service.increment(total_users=99)
+
+        totals = await stats_service.rebuild()
+
+        assert totals["total_users"] == 1
+        assert totals["total_saved"] == 42
+        assert await stats_service.get_totals() == totals
+        assert len(await platform_stats_repository.list_shards()) == 10
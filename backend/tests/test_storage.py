@@ -0,0 +1,186 @@
+"""
+Tests for the SQLite storage backend and repositories.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.vault import Vault
+from app.repositories.vaults import vault_repository
+from app.storage import (
+    DESCENDING,
+    DocumentExistsError,
+    DocumentNotFoundError,
+    Increment,
+    TransactionConflictError,
+)
+
+
+class TestSQLiteStore:
+    """Test cases for SQLiteStore."""
+
+    async def test_set_get_update(self, store):
+        """Documents round-trip and update merges top-level fields."""
+        await store.set("users", "u1", {"email": "a@flexsave.app", "is_active": True})
+        await store.update("users", "u1", {"is_active": False})
+
+        assert await store.get("users", "u1") == {"email": "a@flexsave.app", "is_active": False}
+        assert await store.get("users", "missing") is None
+
+    async def test_update_missing_document(self, store):
+        """Updating a missing document raises DocumentNotFoundError."""
+        with pytest.raises(DocumentNotFoundError):
+            await store.update("users", "missing", {"is_active": False})
+
+    async def test_create_existing_document(self, store):
+        """A batch creating an existing document applies none of its writes."""
+        await store.set("idempotency_keys", "k1", {"result_id": "a"})
+
+        batch = store.batch()
+        batch.set("users", "u1", {"email": "a@flexsave.app"})
+        batch.create("idempotency_keys", "k1", {"result_id": "b"})
+        with pytest.raises(DocumentExistsError):
+            await batch.commit()
+
+        assert await store.get("users", "u1") is None
+        assert await store.get("idempotency_keys", "k1") == {"result_id": "a"}
+
+    async def test_set_merge(self, store):
+        """Merge keeps fields that are not overwritten."""
+        await store.set("users", "u1", {"email": "a@flexsave.app", "role": "user"})
+        await store.set("users", "u1", {"role": "admin"}, merge=True)
+
+        assert await store.get("users", "u1") == {"email": "a@flexsave.app", "role": "admin"}
+
+    async def test_query_filters_and_order(self, store):
+        """Queries filter on fields and order descending with a limit."""
+        for i in range(5):
+            await store.set("withdrawals", f"w{i}", {
+                "user_id": "u1" if i % 2 == 0 else "u2",
+                "amount": i * 10,
+                "created_at": f"2025-01-0{i + 1}T00:00:00",
+            })
+
+        docs = [
+            doc async for doc in store.query(
+                "withdrawals",
+                where=[("user_id", "==", "u1"), ("amount", ">=", 10)],
+                order_by=[("created_at", DESCENDING)],
+                limit=5,
+            )
+        ]
+
+        assert [doc.id for doc in docs] == ["w4", "w2"]
+
+    async def test_query_uses_index(self, store):
+        """A user's vault listing is served by the (user_id, created_at) index."""
+        plan = await store.explain(
+            "vaults",
+            where=[("user_id", "==", "u1")],
+            order_by=[("created_at", DESCENDING)],
+        )
+
+        assert any("ix_vaults_user_id_created_at" in step for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+    async def test_cursor_seeks_index(self, store):
+        """Paging with start_after seeks the index instead of skipping rows."""
+        plan = await store.explain(
+            "users",
+            where=[("role", "==", "user")],
+            order_by=[("created_at", DESCENDING)],
+            limit=50,
+            start_after=["2025-01-01T00:00:00", "u1"],
+        )
+
+        assert any("ix_users_role_created_at (<expr>=? AND <expr><?)" in step for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+    async def test_query_streams_pages(self, store, monkeypatch):
+        """A scan fetches a page at a time and sees each row once, even while writing."""
+        monkeypatch.setattr("app.storage.sqlite.FETCH_SIZE", 4)
+        for i in range(10):
+            await store.set("vaults", f"v{i}", {"is_active": True})
+
+        seen = []
+        async for doc in store.query("vaults"):
+            seen.append(doc.id)
+            await store.update("vaults", doc.id, {"unlock_notified_at": None})
+
+        assert sorted(seen) == [f"v{i}" for i in range(10)]
+        assert all("unlock_notified_at" in doc.data for doc in [d async for d in store.query("vaults")])
+
+    async def test_transaction_retries_on_conflict(self, store):
+        """A document changed between a transaction's read and commit forces a retry."""
+        await store.set("vaults", "v1", {"current_amount": 10})
+        attempts = 0
+
+        async def debit(transaction):
+            nonlocal attempts
+            attempts += 1
+            vault = await transaction.get("vaults", "v1")
+            if attempts == 1:
+                await store.update("vaults", "v1", {"current_amount": Increment(5)})
+            transaction.update("vaults", "v1", {"current_amount": vault["current_amount"] - 3})
+            return vault["current_amount"]
+
+        assert await store.run_transaction(debit) == 15
+        assert await store.get("vaults", "v1") == {"current_amount": 12}
+        assert store.transaction_metrics.stats()["retries"] == 1
+
+    async def test_transaction_conflict_exhausted(self, store):
+        """A transaction that always conflicts fails with TransactionConflictError."""
+        await store.set("vaults", "v1", {"current_amount": 0})
+
+        async def always_conflicting(transaction):
+            await transaction.get("vaults", "v1")
+            await store.update("vaults", "v1", {"current_amount": Increment(1)})
+            transaction.update("vaults", "v1", {"current_amount": -1})
+
+        with pytest.raises(TransactionConflictError):
+            await store.run_transaction(always_conflicting, max_attempts=3)
+
+        assert await store.get("vaults", "v1") == {"current_amount": 3}
+        assert store.transaction_metrics.conflicts == 1
+
+    async def test_invalid_identifier(self, store):
+        """Collection and field names are validated before reaching SQL."""
+        with pytest.raises(ValueError):
+            await store.get("users; DROP TABLE users", "u1")
+
+
+class TestRepositories:
+    """Test cases for repositories on the SQLite backend."""
+
+    async def test_vault_repository(self, store):
+        """Vaults are added with generated IDs and listed newest first."""
+        now = datetime.utcnow()
+        for days in (2, 1, 3):
+            await vault_repository.add(Vault(
+                user_id="u1",
+                name=f"Vault {days}",
+                unlock_date=date.today() + timedelta(days=30),
+                created_at=now - timedelta(days=days),
+            ))
+
+        vaults = await vault_repository.list_for_user("u1")
+
+        assert [v.name for v in vaults] == ["Vault 1", "Vault 2", "Vault 3"]
+        assert all(len(v.id) == 20 for v in vaults)
+        assert await vault_repository.get(vaults[0].id) == vaults[0]
+
+    async def test_get_many(self, store):
+        """Batched reads dedupe IDs and leave out missing documents."""
+        for name in ("A", "B"):
+            await vault_repository.save(Vault(
+                id=f"v{name}",
+                user_id="u1",
+                name=name,
+                unlock_date=date.today() + timedelta(days=30),
+            ))
+
+        vaults = await vault_repository.get_many(["vA", "vB", "vA", "missing", ""])
+
+        assert {doc_id: v.name for doc_id, v in vaults.items()} == {"vA": "A", "vB": "B"}
+        assert await vault_repository.get_many([]) == {}
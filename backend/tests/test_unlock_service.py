@@ -0,0 +1,90 @@
+"""
+Tests for the vault unlock announcements.
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+from app.repositories.email_queue import email_queue_repository
+from app.repositories.notifications import notification_repository
+from app.repositories.vaults import vault_repository
+from app.services.unlock_service import (
+    ANNOUNCED,
+    MUTED,
+    announcement_id,
+    unlock_service,
+)
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+
+TODAY = date.today()
+
+
+async def _unlock_emails():
+    return [e for e in await email_queue_repository.list_pending(50) if e.id.startswith("vault-unlocked-")]
+
+
+async def _vault(user_id: str, unlock_date: date, name: str = "Trip"):
+    vault = await vault_service.create(user_id, name, 1_000, TODAY + timedelta(days=30))
+    await vault_repository.update(vault.id, unlock_date=unlock_date.isoformat())
+    return vault
+
+
+class TestUnlockSweep:
+    """Test cases for announcing unlocked vaults."""
+
+    async def test_announces_once(self, store):
+        """An unlocked vault gets one notification and one email, once."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        vault = await _vault("u1", TODAY)
+        await _vault("u1", TODAY + timedelta(days=1), "Later")
+        await _vault("u1", TODAY - timedelta(days=30), "Long gone")
+
+        assert await unlock_service.sweep(TODAY) == {ANNOUNCED: 1}
+        store.reads.clear()
+        assert await unlock_service.sweep(TODAY) == {}
+        assert store.reads == {"vaults": 1}  # An empty query: announced vaults are not read
+
+        notification = await notification_repository.get(announcement_id(vault.id))
+        assert notification.user_id == "u1"
+        assert len(await notification_repository.list_for_user("u1")) == 1
+        email = await email_queue_repository.get(announcement_id(vault.id))
+        assert email.to == "a@flexsave.app"
+        assert (email.template, email.params["vault_name"]) == ("vault_unlocked", "Trip")
+        assert len(await _unlock_emails()) == 1
+        assert (await vault_repository.get(vault.id)).unlock_notified_at is not None
+
+    async def test_muted_user(self, store):
+        """Vaults of users without notifications are marked, not announced."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        await user_service.update("u1", notification_enabled=False)
+        vault = await _vault("u1", TODAY)
+
+        assert await unlock_service.sweep(TODAY) == {MUTED: 1}
+        assert await unlock_service.sweep(TODAY) == {}
+
+        assert await notification_repository.get(announcement_id(vault.id)) is None
+        assert (await vault_repository.get(vault.id)).unlock_notified_at is not None
+
+    async def test_pages(self, store):
+        """Pages smaller than the day's unlocks still cover every vault."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        for i in range(7):
+            await _vault("u1", TODAY - timedelta(days=i % 3), f"Vault {i}")
+
+        assert await unlock_service.sweep(TODAY, page_size=2) == {ANNOUNCED: 7}
+        assert len(await notification_repository.list_for_user("u1")) == 7
+
+    async def test_concurrent_sweeps(self, store):
+        """Sweeps racing on the same vaults announce each one once."""
+        for uid in ("u1", "u2"):
+            await user_service.create(f"{uid}@flexsave.app", uid, uid)
+        for i in range(10):
+            await _vault(f"u{i % 2 + 1}", TODAY, f"Vault {i}")
+
+        results = await asyncio.gather(*(unlock_service.sweep(TODAY, page_size=4) for _ in range(3)))
+
+        assert sum(r.get(ANNOUNCED, 0) for r in results) == 10
+        assert len(await notification_repository.list_for_user("u1")) == 5
+        assert len(await notification_repository.list_for_user("u2")) == 5
+        assert len(await _unlock_emails()) == 10
@@ -0,0 +1,143 @@
+"""
+Tests for the user service cache.
+"""
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.repositories.users import user_repository
+from app.services.stripe_service import stripe_service
+from app.services.user_service import user_service
+
+
+class TestUserCache:
+    """Test cases for UserService caching."""
+
+    async def test_reads_served_from_cache(self, store):
+        """Repeated reads hit the cache and return independent copies."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+
+        first = await user_service.get_by_id("u1")
+        first.full_name = "Changed"
+        second = await user_service.get_by_id("u1")
+
+        assert second.full_name == "A"
+        assert user_service.cache_stats()["hits"] >= 1
+
+    async def test_update_invalidates(self, store):
+        """Writes through the service are visible immediately."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        await user_service.get_by_id("u1")
+
+        await user_service.update("u1", is_active=False)
+        assert (await user_service.get_by_id("u1")).is_active is False
+
+        await user_service.update_discipline_score("u1", +5)
+        assert (await user_service.get_by_id("u1")).discipline_score == 55
+
+    async def test_external_write_bounded_staleness(self, store, monkeypatch):
+        """Writes from elsewhere show up once the cache TTL has elapsed."""
+        now = [1000.0]
+        monkeypatch.setattr(user_service._cache, "_clock", lambda: now[0])
+        await user_service.create("a@flexsave.app", "A", "u1")
+        await user_service.get_by_id("u1")
+
+        # Another instance disables the account
+        await user_repository.update("u1", is_active=False)
+        assert (await user_service.get_by_id("u1")).is_active is True
+
+        now[0] += settings.USER_CACHE_TTL_SECONDS
+        assert (await user_service.get_by_id("u1")).is_active is False
+
+    async def test_missing_user_not_cached(self, store):
+        """Unknown users are looked up again on the next request."""
+        assert await user_service.get_by_id("ghost") is None
+
+        await user_service.create("g@flexsave.app", "Ghost", "ghost")
+        assert (await user_service.get_by_id("ghost")).email == "g@flexsave.app"
+
+
+class TestLastLogin:
+    """Test cases for coalesced last_login writes."""
+
+    async def test_logins_coalesced(self, store):
+        """Requests within the granularity record at most one write."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+
+        for _ in range(5):
+            user_service.record_login(await user_service.get_by_id("u1"))
+
+        assert (await user_repository.get("u1")).last_login is None
+        assert await user_service.flush_logins() == 1
+        assert (await user_repository.get("u1")).last_login is not None
+
+        user_service.record_login(await user_service.get_by_id("u1"))
+        assert await user_service.flush_logins() == 0
+
+    async def test_login_after_granularity(self, store, monkeypatch):
+        """A login older than the granularity is written again."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        user_service.record_login(await user_service.get_by_id("u1"))
+        await user_service.flush_logins()
+
+        monkeypatch.setattr(settings, "LAST_LOGIN_GRANULARITY_SECONDS", 0)
+        user_service.record_login(await user_service.get_by_id("u1"))
+
+        assert await user_service.flush_logins() == 1
+
+    async def test_flush_skips_deleted_users(self, store):
+        """A deleted user does not prevent the other logins from being written."""
+        for uid in ("u1", "u2"):
+            await user_service.create(f"{uid}@flexsave.app", uid, uid)
+            user_service.record_login(await user_service.get_by_id(uid))
+        await user_repository.delete("u1")
+
+        await user_service.flush_logins()
+
+        assert await user_repository.get("u1") is None
+        assert (await user_repository.get("u2")).last_login is not None
+
+    async def test_shutdown_flushes(self, store):
+        """Stopping the background task writes pending logins."""
+        await user_service.create("a@flexsave.app", "A", "u1")
+        user_service.record_login(await user_service.get_by_id("u1"))
+
+        task = PeriodicTask("flush-logins", user_service.flush_logins, 3600)
+        task.start()
+        await task.stop()
+
+        assert (await user_repository.get("u1")).last_login is not None
+
+
+class TestStripeCustomers:
+    """Test cases for the Stripe customer -> user mapping."""
+
+    async def test_lookup_point_read(self, store):
+        """A customer's user is found with a point read, then from the cache."""
+        await user_service.create("a@flexsave.app", "A", "u1", stripe_customer_id="cus_1")
+        user_service.clear_cache()
+        store.reads.clear()
+
+        assert (await user_service.get_by_stripe_customer_id("cus_1")).id == "u1"
+        assert store.reads == {"stripe_customers": 1, "users": 1}
+
+        store.reads.clear()
+        assert (await user_service.get_by_stripe_customer_id("cus_1")).id == "u1"
+        assert await user_service.get_by_stripe_customer_id("cus_unknown") is None
+        assert store.reads == {"stripe_customers": 1}
+
+    async def test_customer_created_once(self, store, monkeypatch):
+        """The first checkout creates and records the customer; later ones reuse it."""
+        created = []
+
+        async def create_customer(email: str, name: str, user_id: str) -> str:
+            created.append(user_id)
+            return "cus_new"
+        monkeypatch.setattr(stripe_service, "create_customer", create_customer)
+        await user_service.create("a@flexsave.app", "A", "u1")
+
+        for _ in range(2):
+            user = await user_service.get_by_id("u1")
+            assert await user_service.get_or_create_stripe_customer(user) == "cus_new"
+
+        assert created == ["u1"]
+        assert (await user_service.get_by_stripe_customer_id("cus_new")).id == "u1"
@@ -0,0 +1,184 @@
+"""
+Concurrency tests for vault deposits and withdrawals.
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.deposit import DepositSource
+from app.repositories.deposits import deposit_repository
+from app.repositories.notifications import notification_repository
+from app.repositories.vaults import vault_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.services.outbox_service import outbox_service
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.services.withdrawal_service import withdrawal_service
+from app.storage import DocumentNotFoundError
+
+
+async def _vault(unlock_in_days: int = -1):
+    await user_service.create("a@flexsave.app", "A", "u1")
+    return await vault_service.create("u1", "Trip", 10_000, date.today() + timedelta(days=unlock_in_days))
+
+
+class TestDepositLedger:
+    """Test cases for the deposit ledger."""
+
+    async def test_deposit_recorded(self, store):
+        """Each deposit appends a ledger record with the balance change."""
+        vault = await _vault()
+        await vault_service.deposit(vault, 40)
+        await vault_service.deposit(vault, 2.5)
+
+        deposits = await vault_service.get_user_deposits("u1", vault.id)
+
+        assert sorted(d.amount for d in deposits) == [2.5, 40]
+        assert all(d.user_id == "u1" and d.source == DepositSource.MANUAL for d in deposits)
+
+    async def test_depositor_rewarded(self, store):
+        """A deposit made by its owner raises their discipline score (through the outbox)."""
+        vault = await _vault()
+        owner = await user_service.get_by_id("u1")
+
+        await vault_service.deposit(vault, 40, depositor=owner)
+        assert (await user_service.get_by_id("u1")).discipline_score == owner.discipline_score
+        await outbox_service.drain()
+
+        assert (await user_service.get_by_id("u1")).discipline_score == owner.discipline_score + 1
+        assert await stats_service.get_totals() == await stats_service.compute()
+
+    async def test_deposit_many(self, store):
+        """A batch deposit records every allocation, rewards once and notifies per vault."""
+        first = await _vault()
+        second = await vault_service.create("u1", "Car", 5000, date.today())
+        owner = await user_service.get_by_id("u1")
+
+        await vault_service.deposit_many([(first, 100), (second, 50), (first, 25)], depositor=owner)
+        await outbox_service.drain()
+
+        assert (await vault_service.get_by_id(first.id)).current_amount == 125
+        assert (await vault_service.get_by_id(second.id)).current_amount == 50
+        assert await deposit_repository.count() == 3
+        user = await user_service.get_by_id("u1")
+        assert (user.total_saved, user.discipline_score) == (175, owner.discipline_score + 1)
+        assert await stats_service.get_totals() == await stats_service.compute()
+        notifications = await notification_repository.list_for_user("u1")
+        assert sorted(n.body for n in notifications) == [
+            "125.00 € ajouté à votre coffre Trip",
+            "50.00 € ajouté à votre coffre Car",
+        ]
+
+    async def test_deposit_many_all_or_nothing(self, store):
+        """A batch including a vault deleted since it was loaded writes nothing."""
+        first = await _vault()
+        second = await vault_service.create("u1", "Car", 5000, date.today())
+        await vault_repository.delete(second.id)
+
+        with pytest.raises(DocumentNotFoundError):
+            await vault_service.deposit_many([(first, 100), (second, 50)])
+
+        assert (await vault_service.get_by_id(first.id)).current_amount == 0
+        assert await deposit_repository.count() == 0
+
+    async def test_missing_vault_records_nothing(self, store):
+        """A deposit to a vault deleted since it was loaded writes nothing."""
+        vault = await _vault()
+        await vault_repository.delete(vault.id)
+
+        with pytest.raises(DocumentNotFoundError):
+            await vault_service.deposit(vault, 10)
+
+        assert (await user_service.get_by_id("u1")).total_saved == 0
+
+        assert await deposit_repository.count() == 0
+
+
+class TestVaultConcurrency:
+    """Stress tests for concurrent balance updates."""
+
+    async def test_parallel_deposits(self, store):
+        """Hundreds of concurrent deposits to one vault lose no money."""
+        vault = await _vault()
+
+        await asyncio.gather(*(vault_service.deposit(vault, 1.5) for _ in range(300)))
+
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 450
+        assert (await user_service.get_by_id("u1")).total_saved == 450
+        assert await deposit_repository.count([("vault_id", "==", vault.id)]) == 300
+
+    async def test_parallel_withdrawals_never_overdraw(self, store):
+        """Concurrent withdrawals and deposits keep the balance consistent."""
+        vault = await _vault()
+        await vault_service.deposit(vault, 100)
+
+        async def withdraw():
+            try:
+                await withdrawal_service.create("u1", vault.id, 10)
+                return True
+            except ValueError:
+                return False
+
+        results = await asyncio.gather(
+            *(withdraw() for _ in range(20)),
+            *(vault_service.deposit(vault, 1) for _ in range(20)),
+        )
+        succeeded = sum(r is True for r in results[:20])
+
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 100 + 20 - 10 * succeeded
+        assert succeeded >= 10
+        assert store.transaction_metrics.committed == succeeded
+
+    async def test_withdrawal_retried_on_conflict(self, store, monkeypatch):
+        """A deposit landing between a withdrawal's read and commit forces a retry."""
+        vault = await _vault()
+        await vault_service.deposit(vault, 100)
+        add = withdrawal_repository.add
+        calls = 0
+
+        async def add_during_deposit(withdrawal, transaction):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                # Commits after the transaction read the vault
+                await vault_service.deposit(vault, 5)
+            return await add(withdrawal, transaction)
+        monkeypatch.setattr(withdrawal_repository, "add", add_during_deposit)
+
+        await withdrawal_service.create("u1", vault.id, 10)
+
+        assert calls == 2
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 95
+        assert await withdrawal_repository.count() == 1
+        assert store.transaction_metrics.stats()["retries"] == 1
+
+    async def test_flexibility_enforced_concurrently(self, store):
+        """Early withdrawals from a locked vault cannot exceed its flexibility together."""
+        vault = await _vault(unlock_in_days=30)
+        await vault_service.deposit(vault, 1000)  # 10% flexibility: 100
+
+        results = await asyncio.gather(
+            *(withdrawal_service.create("u1", vault.id, 30, is_early=True) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+        assert sum(not isinstance(r, Exception) for r in results) == 3
+        vault = await vault_service.get_by_id(vault.id)
+        assert vault.flexibility_used == 90
+        assert vault.current_amount == 910
+
+    async def test_vault_closed_once(self, store):
+        """Concurrent closes of a vault close (and count) it once."""
+        vault = await _vault()
+
+        results = await asyncio.gather(
+            *(vault_service.close_vault("u1", vault.id) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert sum(not isinstance(r, Exception) for r in results) == 1
+        assert not (await vault_service.get_by_id(vault.id)).is_active
+        assert (await stats_service.get_totals())["active_vaults"] == 0
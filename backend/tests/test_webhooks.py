@@ -0,0 +1,134 @@
+"""
+Tests for Stripe webhook ingestion and processing.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.stripe_event import StripeEvent, StripeEventStatus
+from app.repositories.notifications import notification_repository
+from app.repositories.stripe_events import stripe_event_repository
+from app.services.outbox_service import outbox_service
+from app.services.user_service import user_service
+from app.services.webhook_processor import FAILED, RETRIED, WebhookProcessor
+from app.services.webhook_service import APPLIED, STALE, webhook_service
+from tests.stripe_events import sign, stripe_event
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture
+async def stripe_customer(client, monkeypatch):
+    """The user u1 as the Stripe customer cus_1."""
+    monkeypatch.setattr("app.core.config.settings.STRIPE_WEBHOOK_SECRET", SECRET)
+    await user_service.set_stripe_customer("u1", "cus_1")
+
+
+async def _post(client, event):
+    body, headers = sign(event, SECRET)
+    return await client.post("/webhooks/stripe", content=body, headers=headers)
+
+
+async def _process_all() -> WebhookProcessor:
+    processor = WebhookProcessor(workers=2)
+    processor.start()
+    await processor.poll()
+    await processor.drain()
+    await processor.stop()
+    return processor
+
+
+class TestStripeWebhook:
+    """Test cases for receiving and processing events."""
+
+    async def test_fast_ack(self, client, store, stripe_customer):
+        """An event is stored and acknowledged without touching the user."""
+        store.reads.clear()
+        event = stripe_event("customer.subscription.created", {"customer": "cus_1"})
+
+        response = await _post(client, event)
+
+        assert response.json() == {"received": True}
+        assert store.reads == {}
+        stored = await stripe_event_repository.get(event["id"])
+        assert (stored.type, stored.status) == (event["type"], StripeEventStatus.PENDING)
+        assert not (await user_service.get_by_id("u1")).is_premium
+
+    async def test_duplicates_dropped(self, client, stripe_customer):
+        """Stripe's retries of a stored event are acknowledged, not stored again."""
+        event = stripe_event("customer.subscription.created", {"customer": "cus_1"})
+
+        await _post(client, event)
+        response = await _post(client, event)
+
+        assert response.json() == {"received": True, "duplicate": True}
+        assert await stripe_event_repository.count() == 1
+
+    async def test_bad_signature(self, client, stripe_customer):
+        """Unsigned or mis-signed events are rejected and not stored."""
+        body, headers = sign(stripe_event("payment_intent.succeeded", {}), "whsec_other")
+
+        response = await client.post("/webhooks/stripe", content=body, headers=headers)
+
+        assert response.status_code == 400
+        assert await stripe_event_repository.count() == 0
+
+    async def test_processed_in_order(self, client, stripe_customer):
+        """A customer's events are applied in the order Stripe created them."""
+        await _post(client, stripe_event("customer.subscription.deleted", {"customer": "cus_1"}, created=2000))
+        await _post(client, stripe_event("customer.subscription.created", {"customer": "cus_1"}, created=1000))
+        await _post(client, stripe_event("payment_intent.succeeded", {"amount": 999, "metadata": {"user_id": "u1"}}))
+
+        processor = await _process_all()
+        await outbox_service.drain()
+
+        assert processor.outcomes == {APPLIED: 3}
+        assert not (await user_service.get_by_id("u1")).is_premium
+        assert len(await notification_repository.list_for_user("u1")) == 3
+        assert await stripe_event_repository.list_pending(10) == []
+
+    async def test_event_deleted_while_claiming(self, client, stripe_customer, monkeypatch):
+        """An event deleted before the claim is skipped, the others processed."""
+        gone = stripe_event("customer.subscription.created", {"customer": "cus_1"}, created=1000)
+        await _post(client, gone)
+        await _post(client, stripe_event("payment_intent.succeeded", {"amount": 999, "metadata": {"user_id": "u1"}}))
+        list_pending = stripe_event_repository.list_pending
+
+        async def list_pending_then_deleted(limit, **kwargs):
+            pending = await list_pending(limit, **kwargs)
+            if any(event.id == gone["id"] for event in pending):
+                await stripe_event_repository.delete(gone["id"])
+            return pending
+        monkeypatch.setattr(stripe_event_repository, "list_pending", list_pending_then_deleted)
+
+        assert (await _process_all()).outcomes == {APPLIED: 1}
+
+    async def test_stale_event(self, client, stripe_customer):
+        """An event older than the last one applied does not undo it."""
+        newer = stripe_event("customer.subscription.created", {"customer": "cus_1"}, created=3000)
+        older = stripe_event("customer.subscription.deleted", {"customer": "cus_1"}, created=2000)
+        for event, outcome in ((newer, APPLIED), (older, STALE)):
+            await webhook_service.receive(event)
+            assert await webhook_service.process(await stripe_event_repository.get(event["id"])) == outcome
+
+        assert (await user_service.get_by_id("u1")).is_premium
+        assert (await stripe_event_repository.get(older["id"])).status == StripeEventStatus.PROCESSED
+
+    async def test_failures_retried(self, client, stripe_customer, monkeypatch):
+        """A failing event backs off, then is marked failed."""
+        monkeypatch.setattr("app.core.config.settings.WEBHOOK_MAX_ATTEMPTS", 2)
+        event = stripe_event("customer.subscription.created", {"customer": "cus_1"})
+        await webhook_service.receive(event)
+
+        async def broken(event: StripeEvent) -> str:
+            raise RuntimeError("Firestore unavailable")
+        monkeypatch.setattr(webhook_service, "process", broken)
+
+        assert (await _process_all()).outcomes == {RETRIED: 1}
+        stored = await stripe_event_repository.get(event["id"])
+        assert (stored.status, stored.attempts) == (StripeEventStatus.PENDING, 1)
+
+        await stripe_event_repository.update(event["id"], available_at=datetime.utcnow().isoformat())
+        assert (await _process_all()).outcomes == {FAILED: 1}
+        assert (await stripe_event_repository.list_failed(10))[0].error == "RuntimeError('Firestore unavailable')"
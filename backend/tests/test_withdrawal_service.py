@@ -0,0 +1,73 @@
+"""
+Tests for the withdrawal pipeline.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.repositories.users import user_repository
+from app.repositories.withdrawals import withdrawal_repository
+from app.services.outbox_service import outbox_service
+from app.services.stats_service import stats_service
+from app.services.user_service import user_service
+from app.services.vault_service import vault_service
+from app.services.withdrawal_service import withdrawal_service
+from app.storage import DocumentNotFoundError
+
+
+async def _funded_vault(unlock_in_days: int, amount: float = 1000):
+    await user_service.create("a@flexsave.app", "A", "u1")
+    await user_service.create("b@flexsave.app", "B", "u2")
+    vault = await vault_service.create("u1", "Trip", 5000, date.today() + timedelta(days=unlock_in_days))
+    await vault_service.deposit(vault, amount)
+    return vault
+
+
+class TestWithdrawalPipeline:
+    """Test cases for WithdrawalService.create."""
+
+    async def test_early_withdrawal(self, store):
+        """Vault debit, record and counters are applied together, then the penalty."""
+        vault = await _funded_vault(unlock_in_days=30)
+
+        withdrawal = await withdrawal_service.create("u1", vault.id, 50, is_early=True)
+        await outbox_service.drain()
+
+        assert (await withdrawal_repository.get(withdrawal.id)).fee == 0.5
+        vault = await vault_service.get_by_id(vault.id)
+        assert (vault.current_amount, vault.flexibility_used) == (950, 50)
+        user = await user_service.get_by_id("u1")
+        assert (user.discipline_score, user.total_saved) == (48, 950)
+        assert await stats_service.get_totals() == await stats_service.compute()
+
+    async def test_not_owner_moves_nothing(self, store):
+        """Another user's withdrawal is rejected before any money moves."""
+        vault = await _funded_vault(unlock_in_days=-1)
+
+        with pytest.raises(ValueError, match="Not authorized"):
+            await withdrawal_service.create("u2", vault.id, 50)
+
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 1000
+        assert await withdrawal_repository.count() == 0
+
+    async def test_insufficient_funds(self, store):
+        """A rejected withdrawal leaves no record."""
+        vault = await _funded_vault(unlock_in_days=-1, amount=10)
+
+        with pytest.raises(ValueError, match="Insufficient funds"):
+            await withdrawal_service.create("u1", vault.id, 50)
+
+        assert await withdrawal_repository.count() == 0
+        assert (await user_service.get_by_id("u1")).total_saved == 10
+
+    async def test_partial_failure_rolls_back(self, store):
+        """A write failing at commit leaves the vault untouched."""
+        vault = await _funded_vault(unlock_in_days=-1)
+        await user_repository.delete("u1")
+
+        with pytest.raises(DocumentNotFoundError):
+            await withdrawal_service.create("u1", vault.id, 50)
+
+        assert (await vault_service.get_by_id(vault.id)).current_amount == 1000
+        assert await withdrawal_repository.count() == 0
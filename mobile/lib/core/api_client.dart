@@ -93,10 +93,42 @@ class ApiClient {
     return response.data;
   }
 
+  Future<List<dynamic>> depositBatch(List<Map<String, dynamic>> deposits) async {
+    final response = await _dio.post('/vaults/deposits:batch', data: {
+      'deposits': deposits,
+    });
+    return response.data;
+  }
+
   Future<void> closeVault(String id) async {
     await _dio.delete('/vaults/$id');
   }
 
+  // Schedules
+  Future<List<dynamic>> getSchedules() async {
+    final response = await _dio.get('/schedules/');
+    return response.data;
+  }
+
+  Future<Map<String, dynamic>> createSchedule({
+    required String vaultId,
+    required double amount,
+    required String frequency,
+    String? startDate,
+  }) async {
+    final response = await _dio.post('/schedules/', data: {
+      'vault_id': vaultId,
+      'amount': amount,
+      'frequency': frequency,
+      if (startDate != null) 'start_date': startDate,
+    });
+    return response.data;
+  }
+
+  Future<void> cancelSchedule(String id) async {
+    await _dio.delete('/schedules/$id');
+  }
+
   // Withdrawals
   Future<Map<String, dynamic>> previewWithdrawal({
     required String vaultId,
@@ -68,7 +68,7 @@ class ApiClient {
         return this.request<any>('/users/me/stats');
     }
 
-    async updateUser(data: { full_name?: string; notification_enabled?: boolean }) {
+    async updateUser(data: { full_name?: string; notification_enabled?: boolean; locale?: 'fr' | 'en' }) {
         return this.request('/users/me', {
             method: 'PATCH',
             body: data,
@@ -103,10 +103,38 @@ class ApiClient {
         });
     }
 
+    async depositBatch(deposits: { vault_id: string; amount: number }[]) {
+        return this.request('/vaults/deposits:batch', {
+            method: 'POST',
+            body: { deposits },
+        });
+    }
+
     async closeVault(id: string) {
         return this.request(`/vaults/${id}`, { method: 'DELETE' });
     }
 
+    // Schedules
+    async getSchedules() {
+        return this.request<any[]>('/schedules/');
+    }
+
+    async createSchedule(data: {
+        vault_id: string;
+        amount: number;
+        frequency: 'weekly' | 'monthly';
+        start_date?: string;
+    }) {
+        return this.request('/schedules/', {
+            method: 'POST',
+            body: data,
+        });
+    }
+
+    async cancelSchedule(id: string) {
+        return this.request(`/schedules/${id}`, { method: 'DELETE' });
+    }
+
     // Withdrawals
     async previewWithdrawal(data: {
         vault_id: string;
@@ -140,15 +168,15 @@ class ApiClient {
         return this.request<any>('/admin/stats');
     }
 
-    async getUsers(params?: { skip?: number; limit?: number; role?: string; is_active?: boolean }) {
+    async getUsers(params?: { cursor?: string; limit?: number; role?: string; is_active?: boolean }) {
         const query = new URLSearchParams();
-        if (params?.skip !== undefined) query.set('skip', String(params.skip));
+        if (params?.cursor) query.set('cursor', params.cursor);
         if (params?.limit !== undefined) query.set('limit', String(params.limit));
         if (params?.role) query.set('role', params.role);
         if (params?.is_active !== undefined) query.set('is_active', String(params.is_active));
 
         const queryStr = query.toString();
-        return this.request<any[]>(`/admin/users${queryStr ? `?${queryStr}` : ''}`);
+        return this.request<{ items: any[]; next_cursor: string | null }>(`/admin/users${queryStr ? `?${queryStr}` : ''}`);
     }
 
     async updateUserAdmin(userId: string, data: { is_active?: boolean; is_premium?: boolean; role?: string }) {